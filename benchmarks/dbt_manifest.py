@@ -0,0 +1,124 @@
+"""
+Benchmark parsing a large synthetic manifest in memory vs. streamed, e.g.
+
+    python -m benchmarks.dbt_manifest --models 50000
+
+Each mode runs in a fresh process, so the peak RSS is measured separately.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Dict
+
+from metaphor.common.base_config import OutputConfig
+from metaphor.dbt.config import DbtRunConfig
+from metaphor.dbt.extractor import DbtExtractor
+
+TEMPLATE_MANIFEST = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "tests",
+    "dbt",
+    "data",
+    "jaffle_v12",
+    "manifest.json",
+)
+
+
+def _find_node(manifest: Dict, resource_type: str) -> Dict:
+    return next(
+        node
+        for node in manifest["nodes"].values()
+        if node["resource_type"] == resource_type
+    )
+
+
+def generate_manifest(path: str, models: int) -> None:
+    """Clone a model & a test from the template manifest into a large one"""
+    with open(TEMPLATE_MANIFEST) as f:
+        template = json.load(f)
+
+    model_template = _find_node(template, "model")
+    test_template = _find_node(template, "test")
+
+    nodes = {}
+    for i in range(models):
+        model_id = f"model.jaffle_shop.model_{i}"
+        model = copy.deepcopy(model_template)
+        model.update(unique_id=model_id, name=f"model_{i}", alias=f"model_{i}")
+        model["depends_on"] = {
+            "macros": [],
+            "nodes": [f"model.jaffle_shop.model_{i - 1}"] if i > 0 else [],
+        }
+        nodes[model_id] = model
+
+        test_id = f"test.jaffle_shop.not_null_model_{i}_id"
+        test = copy.deepcopy(test_template)
+        test.update(unique_id=test_id, name=f"not_null_model_{i}_id")
+        test["attached_node"] = model_id
+        test["depends_on"] = {"macros": [], "nodes": [model_id]}
+        nodes[test_id] = test
+
+    manifest = {**template, "nodes": nodes, "metrics": {}, "semantic_models": {}}
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+
+
+def _run(manifest: str, stream_manifest: bool, results: Dict) -> None:
+    config = DbtRunConfig(
+        output=OutputConfig(),
+        manifest=manifest,
+        stream_manifest=stream_manifest,
+    )
+
+    start = time.perf_counter()
+    entities = asyncio.run(DbtExtractor(config).extract())
+    results["seconds"] = time.perf_counter() - start
+    results["entities"] = len(entities)
+
+    # Linux reports in KB
+    results["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = os.path.join(directory, "manifest.json")
+        generate_manifest(manifest, args.models)
+        size_mb = os.path.getsize(manifest) / 1024 / 1024
+        print(f"manifest.json with {args.models} models: {size_mb:.0f} MB")
+
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            for stream_manifest in [False, True]:
+                results = manager.dict()
+                process = context.Process(
+                    target=_run, args=(manifest, stream_manifest, results)
+                )
+                process.start()
+                process.join()
+
+                mode = "streamed" if stream_manifest else "in memory"
+                if process.exitcode != 0:
+                    print(f"{mode:>10}: failed with exit code {process.exitcode}")
+                    continue
+
+                print(
+                    f"{mode:>10}: {results['seconds']:.1f}s, "
+                    f"peak RSS {results['max_rss_mb']:.0f} MB, "
+                    f"{results['entities']} entities"
+                )
+
+
+if __name__ == "__main__":
+    main()
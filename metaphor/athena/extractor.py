@@ -12,10 +12,8 @@ from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.entity_id import dataset_normalized_name
 from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.logger import get_logger, json_dump_to_debug_file
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
-from metaphor.common.sql.table_level_lineage.table_level_lineage import (
-    extract_table_level_lineage,
-)
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.query_log import PartialQueryLog, init_query_log
 from metaphor.common.utils import chunks, start_of_day, to_utc_time
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import (
@@ -228,26 +226,26 @@ class AthenaExtractor(BaseExtractor):
                 if start_time and start_time < lookback_start_time:
                     continue
 
-                tll = extract_table_level_lineage(
-                    sql=query,
-                    platform=DataPlatform.ATHENA,
-                    account=None,
+                analysis = analyze_query(
+                    query,
+                    DataPlatform.ATHENA,
+                    self._query_log_config.process_query,
                     default_database=database,
                     default_schema=schema,
                 )
 
-                query_log = process_and_init_query_log(
+                query_log = init_query_log(
                     query=query,
+                    processed_sql=analysis.sql,
                     platform=DataPlatform.ATHENA,
-                    process_query_config=self._query_log_config.process_query,
                     query_log=PartialQueryLog(
                         duration=(
                             query_execution.Statistics.TotalExecutionTimeInMillis
                             if query_execution.Statistics
                             else None
                         ),
-                        sources=tll.sources,
-                        targets=tll.targets,
+                        sources=analysis.lineage.sources,
+                        targets=analysis.lineage.targets,
                         start_time=start_time,
                     ),
                     query_id=query_execution.QueryExecutionId,
@@ -65,7 +65,8 @@ class BigQueryQueryLogConfig:
         default_factory=lambda: ProcessQueryConfig()
     )
 
-    # Maximum allowed requests per minute to the log entries API
+    # Maximum allowed requests per minute to the log entries API, shared by the
+    # query log and audit log lineage
     max_requests_per_minute: int = DEFAULT_MAX_REQUESTS_PER_MINUTE
 
 
@@ -74,6 +75,10 @@ class BigQueryLineageConfig:
     # Whether to enable parsing view query to find upstream of the view, default True
     enable_view_lineage: bool = True
 
+    # Number of worker processes used to parse the view queries, if 0, parse
+    # the view queries in the main process
+    view_parse_workers: int = 0
+
     # Whether to enable parsing audit log to find table lineage information, default True
     enable_lineage_from_log: bool = True
 
@@ -1,8 +1,19 @@
-import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Collection, Dict, Iterable, Iterator, List
+import os
+import pickle
+import tempfile
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Tuple
 
-from metaphor.bigquery.log_filter import build_list_entries_filter
+from metaphor.bigquery.log_reader import read_job_change_events
 from metaphor.bigquery.queries import Queries
 from metaphor.bigquery.table import TableExtractor
 from metaphor.common.sql.table_level_lineage import table_level_lineage
@@ -18,6 +29,7 @@ from google.cloud.bigquery.table import Table as BQTable
 
 from metaphor.bigquery.config import BigQueryRunConfig
 from metaphor.bigquery.job_change_event import JobChangeEvent
+from metaphor.bigquery.job_query_resolver import JobQueryResolver
 from metaphor.bigquery.utils import build_client, build_logging_client, get_credentials
 from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.entity_id import dataset_normalized_name, to_dataset_entity_id
@@ -25,6 +37,7 @@ from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.filter import DatasetFilter
 from metaphor.common.logger import get_logger
 from metaphor.common.models import to_dataset_statistics
+from metaphor.common.rate_limiter import TokenBucket
 from metaphor.common.tag_matcher import tag_datasets
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import (
@@ -40,6 +53,35 @@ from metaphor.models.metadata_change_event import (
 logger = get_logger()
 
 
+@dataclass
+class _FetchedDataset:
+    """The tables and DDLs fetched from a BigQuery dataset"""
+
+    dataset_ref: bigquery.DatasetReference
+    # Fetched tables by their index in the dataset
+    tables: Dict[int, BQTable] = field(default_factory=dict)
+    # (table name, DDL) of the tables
+    ddl: List[Tuple[str, str]] = field(default_factory=list)
+
+
+# Number of view queries sent to a worker process at a time
+VIEW_PARSE_CHUNK_SIZE = 100
+
+
+def _extract_view_sources(view_query: str) -> List[str]:
+    """Returns the entity IDs of the upstream tables of a view, may run in a worker process"""
+    try:
+        return [
+            queried_dataset_entity_id(source, None)
+            for source in table_level_lineage.extract_table_level_lineage(
+                view_query, DataPlatform.BIGQUERY, None
+            ).sources
+        ]
+    except Exception as ex:
+        logger.exception(ex)
+        return []
+
+
 class BigQueryExtractor(BaseExtractor):
     """BigQuery metadata extractor"""
 
@@ -57,9 +99,26 @@ class BigQueryExtractor(BaseExtractor):
         self._dataset_filter = config.filter.normalize()
         self._datasets: Dict[str, Dataset] = {}
 
+        # Shared by all the requests to the log entries API
+        self._rate_limiter = TokenBucket.per_minute(
+            config.query_log.max_requests_per_minute
+        )
+
+        # Query log events spooled while reading the audit log, keyed by project
+        self._query_log_spools: Dict[str, str] = {}
+
     async def extract(self) -> Collection[ENTITY_TYPES]:
-        for project_id in self._config.project_ids:
-            self._extract_project(project_id)
+        clients = {
+            project_id: build_client(project_id, self._credentials)
+            for project_id in self._config.project_ids
+        }
+
+        # All projects and datasets share the same concurrency budget
+        with ThreadPoolExecutor(max_workers=self._config.max_concurrency) as executor:
+            fetched = self._fetch_datasets(clients, executor)
+
+        for project_id, client in clients.items():
+            self._extract_project(project_id, client, fetched[project_id])
 
         return self._datasets.values()
 
@@ -67,44 +126,146 @@ class BigQueryExtractor(BaseExtractor):
         for project_id in self._config.project_ids:
             yield from self._fetch_query_logs(project_id)
 
-    def _extract_project(self, project_id: str) -> None:
-        logger.info(f"Fetching metadata from BigQuery project {project_id}")
+    def _should_share_audit_log(self) -> bool:
+        """
+        Whether to read the audit log once for both lineage and query logs.
+        Only when both of them use the same lookback window.
+        """
+        return (
+            self._config.lineage.enable_lineage_from_log
+            and self._config.query_log.lookback_days > 0
+            and self._config.query_log.lookback_days
+            == self._config.lineage.lookback_days
+        )
 
-        client = build_client(project_id, self._credentials)
+    def _fetch_datasets(
+        self, clients: Dict[str, bigquery.Client], executor: ThreadPoolExecutor
+    ) -> Dict[str, List[_FetchedDataset]]:
+        """
+        Fetch the tables and DDLs of all datasets in the projects. Listing the
+        datasets and tables, getting the tables and querying the DDLs are all
+        scheduled on the same executor, so they overlap across datasets and
+        projects. Returns the fetched datasets of each project.
+        """
+        fetched: Dict[str, List[_FetchedDataset]] = {
+            project_id: [] for project_id in clients
+        }
+        callbacks: Dict[Future, Callable[[Any], None]] = {}
+
+        def submit(callback: Callable[[Any], None], fn: Callable, *args) -> None:
+            callbacks[executor.submit(fn, *args)] = callback
+
+        def set_table(dataset: _FetchedDataset, index: int, table: BQTable) -> None:
+            dataset.tables[index] = table
+
+        def set_ddl(dataset: _FetchedDataset, ddl: List[Tuple[str, str]]) -> None:
+            dataset.ddl = ddl
+
+        def on_tables_listed(
+            client: bigquery.Client,
+            dataset: _FetchedDataset,
+            table_refs: List[bigquery.TableReference],
+        ) -> None:
+            for index, table_ref in enumerate(table_refs):
+                submit(
+                    partial(set_table, dataset, index),
+                    self._get_table,
+                    client,
+                    table_ref,
+                )
+
+            submit(
+                partial(set_ddl, dataset), self._fetch_ddl, client, dataset.dataset_ref
+            )
 
-        fetched_tables: List[Dataset] = []
-        for dataset_ref in BigQueryExtractor._list_datasets_with_filter(
-            client, self._dataset_filter
-        ):
-            logger.info(f"Fetching tables for {dataset_ref}")
-
-            with ThreadPoolExecutor(
-                max_workers=self._config.max_concurrency
-            ) as executor:
-
-                def table_ref_to_dataset(table: bigquery.TableReference) -> Dataset:
-                    logger.info(f"Getting table {table.table_id}")
-                    return self._parse_table(client.project, client.get_table(table))
-
-                # map of table name to Dataset
-                tables: Dict[str, Dataset] = {
-                    d.logical_id.name.split(".")[-1]: d
-                    for d in executor.map(
-                        table_ref_to_dataset,
-                        BigQueryExtractor._list_tables_with_filter(
-                            dataset_ref, client, self._dataset_filter
-                        ),
-                    )
-                    if d.logical_id and d.logical_id.name
-                }
+        def on_datasets_listed(
+            project_id: str,
+            client: bigquery.Client,
+            dataset_refs: List[bigquery.DatasetReference],
+        ) -> None:
+            for dataset_ref in dataset_refs:
+                dataset = _FetchedDataset(dataset_ref)
+                fetched[project_id].append(dataset)
+                submit(
+                    partial(on_tables_listed, client, dataset),
+                    self._list_tables,
+                    client,
+                    dataset_ref,
+                )
+
+        for project_id, client in clients.items():
+            logger.info(f"Fetching metadata from BigQuery project {project_id}")
+            submit(
+                partial(on_datasets_listed, project_id, client),
+                self._list_datasets,
+                client,
+            )
+
+        # Callbacks run in this thread, and may submit more tasks
+        while callbacks:
+            done, _ = wait(callbacks, return_when=FIRST_COMPLETED)
+            for future in done:
+                callbacks.pop(future)(future.result())
 
-            logger.info(f"Getting table DDL for {dataset_ref}")
-            table_ddl = client.query(
+        return fetched
+
+    def _list_datasets(
+        self, client: bigquery.Client
+    ) -> List[bigquery.DatasetReference]:
+        return list(
+            BigQueryExtractor._list_datasets_with_filter(client, self._dataset_filter)
+        )
+
+    def _list_tables(
+        self, client: bigquery.Client, dataset_ref: bigquery.DatasetReference
+    ) -> List[bigquery.TableReference]:
+        logger.info(f"Fetching tables for {dataset_ref}")
+        return list(
+            BigQueryExtractor._list_tables_with_filter(
+                dataset_ref, client, self._dataset_filter
+            )
+        )
+
+    @staticmethod
+    def _get_table(client: bigquery.Client, table: bigquery.TableReference) -> BQTable:
+        logger.info(f"Getting table {table.table_id}")
+        return client.get_table(table)
+
+    def _fetch_ddl(
+        self, client: bigquery.Client, dataset_ref: bigquery.DatasetReference
+    ) -> List[Tuple[str, str]]:
+        logger.info(f"Getting table DDL for {dataset_ref}")
+        return [
+            (table_name, ddl)
+            for table_name, ddl in client.query(
                 Queries.dll(db=dataset_ref.project, schema=dataset_ref.dataset_id),
                 project=self._config.job_project_id or self._credentials.project_id,
             ).result()
+        ]
 
-            for table_name, ddl in table_ddl:
+    def _extract_project(
+        self,
+        project_id: str,
+        client: bigquery.Client,
+        datasets: List[_FetchedDataset],
+    ) -> None:
+        fetched_tables: List[Dataset] = []
+        # (dataset ID, table ID, view query) of the views, for view lineage
+        views: List[Tuple[str, str, str]] = []
+        for fetched_dataset in datasets:
+            # map of table name to Dataset
+            tables: Dict[str, Dataset] = {}
+            for _, bq_table in sorted(fetched_dataset.tables.items()):
+                d = self._parse_table(client.project, bq_table)
+                if d.logical_id and d.logical_id.name:
+                    tables[d.logical_id.name.split(".")[-1]] = d
+
+                # Reuse the fetched table for view lineage
+                view_query = bq_table.view_query or bq_table.mview_query
+                if view_query and self._config.lineage.enable_view_lineage:
+                    views.append((bq_table.dataset_id, bq_table.table_id, view_query))
+
+            for table_name, ddl in fetched_dataset.ddl:
                 table = tables.get(str(table_name).lower())
                 if table is None:
                     logger.error(f"table {table_name} not found for DDL")
@@ -127,7 +288,7 @@ class BigQueryExtractor(BaseExtractor):
         )
 
         if self._config.lineage.enable_view_lineage:
-            self._fetch_view_upstream(client, project_id)
+            self._fetch_view_upstream(project_id, views)
 
         if self._config.lineage.enable_lineage_from_log:
             self._fetch_audit_log(project_id)
@@ -181,71 +342,89 @@ class BigQueryExtractor(BaseExtractor):
 
     def _fetch_query_logs(self, project_id: str) -> Iterator[QueryLog]:
         client = build_client(project_id, self._credentials)
-        logging_client = build_logging_client(project_id, self._credentials)
 
-        fetched, count = 0, 0
-        last_time = time.time()
+        resolver = JobQueryResolver(client, self._config.max_concurrency)
 
-        for entry in logging_client.list_entries(
-            page_size=self._config.query_log.fetch_size,
-            filter_=build_list_entries_filter("query_log", self._config),
-        ):
-            count += 1
+        fetched = 0
+        events = self._query_log_events(project_id)
+        while batch := list(islice(events, self._config.query_log.fetch_size)):
+            # Fetch the full SQL of the truncated queries in the batch at once
+            resolver.resolve(
+                job_change.job_name
+                for job_change in batch
+                if job_change.needs_job_query(self._config)
+            )
 
-            if job_change := JobChangeEvent.from_entry(entry):
-                if log := job_change.to_query_log(client, self._config):
+            for job_change in batch:
+                if log := job_change.to_query_log(client, self._config, resolver):
                     fetched += 1
                     yield log
 
-            if count % self._config.query_log.fetch_size == 0:
-                current_time = time.time()
-                elapsed_time = current_time - last_time
-                wait_time = (
-                    60 / self._config.query_log.max_requests_per_minute
-                ) - elapsed_time
-                last_time = current_time
-                if wait_time > 0:
-                    time.sleep(wait_time)
-
         logger.info(f"Number of query log entries fetched: {fetched}")
+        resolver.log_stats()
+
+    def _query_log_events(self, project_id: str) -> Iterator[JobChangeEvent]:
+        spool = self._query_log_spools.pop(project_id, None)
+        if spool is None:
+            logging_client = build_logging_client(project_id, self._credentials)
+            yield from read_job_change_events(
+                logging_client,
+                "query_log",
+                self._config,
+                self._config.query_log.fetch_size,
+                self._rate_limiter,
+            )
+            return
 
-    def _fetch_view_upstream(self, client: bigquery.Client, project_id: str) -> None:
-        logger.info("Fetching lineage info from BigQuery API")
+        # Already read along with the audit log
+        try:
+            with open(spool, "rb") as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        break
+        finally:
+            os.remove(spool)
+
+    def _is_query_log_event(self, job_change: JobChangeEvent) -> bool:
+        # Same as the service account filter of the query log entries
+        return not (
+            self._config.query_log.exclude_service_accounts
+            and "gserviceaccount.com" in job_change.user_email
+        )
 
-        for dataset_ref in self._list_datasets_with_filter(
-            client, self._dataset_filter
-        ):
-            logger.info(f"Found dataset {dataset_ref}")
-            for table_ref in self._list_tables_with_filter(
-                dataset_ref, client, self._dataset_filter
-            ):
-                logger.debug(f"Found table {table_ref}")
-                try:
-                    bq_table = client.get_table(table_ref)
-                    self._parse_view_lineage(project_id, bq_table)
-                except Exception as ex:
-                    logger.exception(ex)
+    def _fetch_view_upstream(
+        self, project_id: str, views: List[Tuple[str, str, str]]
+    ) -> None:
+        logger.info(f"Parsing lineage info from {len(views)} views")
+
+        view_queries = [view_query for _, _, view_query in views]
+        workers = self._config.lineage.view_parse_workers
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                view_sources = list(
+                    executor.map(
+                        _extract_view_sources,
+                        view_queries,
+                        chunksize=VIEW_PARSE_CHUNK_SIZE,
+                    )
+                )
+        else:
+            view_sources = [_extract_view_sources(query) for query in view_queries]
 
-    def _parse_view_lineage(self, project_id: str, bq_table: BQTable) -> None:
-        view_query = bq_table.view_query or bq_table.mview_query
-        if not view_query:
-            return
+        for (dataset_id, table_id, view_query), sources in zip(views, view_sources):
+            if not sources:
+                continue
 
-        view_name = dataset_normalized_name(
-            db=project_id, schema=bq_table.dataset_id, table=bq_table.table_id
-        )
-        logger.info(f"Found view {view_name}")
+            view_name = dataset_normalized_name(
+                db=project_id, schema=dataset_id, table=table_id
+            )
+            logger.info(f"Found view {view_name}")
 
-        sources = [
-            queried_dataset_entity_id(source, None)
-            for source in table_level_lineage.extract_table_level_lineage(
-                view_query, DataPlatform.BIGQUERY, None
-            ).sources
-        ]
-        if sources:
             dataset = self._init_dataset(view_name)
             dataset.entity_upstream = EntityUpstream(
-                source_entities=list(sources), transformation=view_query
+                source_entities=sources, transformation=view_query
             )
 
     def _init_dataset(self, table_name: str) -> Dataset:
@@ -263,21 +442,39 @@ class BigQueryExtractor(BaseExtractor):
 
         logging_client = build_logging_client(project_id, self._credentials)
 
+        share = self._should_share_audit_log()
+        spool = None
+        if share:
+            fd, path = tempfile.mkstemp(prefix="bigquery_query_logs_")
+            spool = os.fdopen(fd, "wb")
+            self._query_log_spools[project_id] = path
+
         fetched, parsed = 0, 0
-        for entry in logging_client.list_entries(
-            page_size=self._config.lineage.batch_size,
-            filter_=build_list_entries_filter("audit_log", self._config),
-        ):
-            fetched += 1
-            try:
-                if job_change := JobChangeEvent.from_entry(entry):
+        try:
+            for job_change in read_job_change_events(
+                logging_client,
+                "all" if share else "audit_log",
+                self._config,
+                self._config.lineage.batch_size,
+                self._rate_limiter,
+            ):
+                fetched += 1
+
+                # Spool before extracting the lineage, which may modify the event
+                if spool and self._is_query_log_event(job_change):
+                    pickle.dump(job_change, spool)
+
+                try:
                     self._extract_entity_upstream_from_job_change(job_change)
                     parsed += 1
-            except Exception as ex:
-                logger.exception(ex)
+                except Exception as ex:
+                    logger.exception(ex)
 
-            if fetched % 1000 == 0:
-                logger.info(f"Fetched {fetched} audit logs")
+                if fetched % 1000 == 0:
+                    logger.info(f"Fetched {fetched} audit logs")
+        finally:
+            if spool:
+                spool.close()
 
         logger.info(f"Fetched {fetched} jobChange log entries, parsed {parsed}")
 
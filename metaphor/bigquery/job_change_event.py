@@ -1,5 +1,4 @@
 import logging
-import re
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
@@ -8,6 +7,7 @@ from google.cloud import bigquery
 from google.cloud._helpers import _rfc3339_nanos_to_datetime
 
 from metaphor.bigquery.config import BigQueryRunConfig
+from metaphor.bigquery.job_query_resolver import JobQueryResolver, fetch_job_query
 from metaphor.bigquery.log_type import query_type_to_log_type
 from metaphor.bigquery.utils import BigQueryResource, LogEntry
 from metaphor.common.entity_id import dataset_normalized_name, to_dataset_entity_id
@@ -180,10 +180,14 @@ class JobChangeEvent:
             return None if is_service_account else self.user_email
 
     def to_query_log(
-        self, client: bigquery.Client, config: BigQueryRunConfig
+        self,
+        client: bigquery.Client,
+        config: BigQueryRunConfig,
+        job_query_resolver: Optional[JobQueryResolver] = None,
     ) -> Optional[QueryLog]:
         """
-        Converts this JobChangeEvent to a QueryLog.
+        Converts this JobChangeEvent to a QueryLog. If set, `job_query_resolver`
+        is used to look up the full SQL of a truncated query.
         """
         if self.query is None:
             return None
@@ -206,12 +210,13 @@ class JobChangeEvent:
 
         query = self.query
         # if query SQL is truncated, fetch full SQL from job API
-        if (
-            self.job_type == "QUERY"
-            and self.query_truncated
-            and config.query_log.fetch_job_query_if_truncated
-        ):
-            query = self._fetch_job_query(client, self.job_name) or query
+        if self.needs_job_query(config):
+            full_query = (
+                job_query_resolver.get(self.job_name)
+                if job_query_resolver
+                else self._fetch_job_query(client, self.job_name)
+            )
+            query = full_query or query
 
         elapsed_time = (
             (self.end_time - self.start_time).total_seconds()
@@ -242,21 +247,15 @@ class JobChangeEvent:
 
     @staticmethod
     def _fetch_job_query(client: bigquery.Client, job_name: str) -> Optional[str]:
-        logger.info(f"Query {job_name}")
-        if match := re.match(r"^projects/([^/]+)/jobs/([^/]+)$", job_name):
-            project = match.group(1)
-            job_id = match.group(2)
-
-            try:
-                job = client.get_job(job_id, project)
-            except Exception as e:
-                logger.warning(f"Failed to get job information: {e}")
-                return None
+        return fetch_job_query(client, job_name)
 
-            if isinstance(job, bigquery.QueryJob):
-                return job.query
-
-        return None
+    def needs_job_query(self, config: BigQueryRunConfig) -> bool:
+        """Whether the full SQL should be fetched from the job API"""
+        return bool(
+            self.job_type == "QUERY"
+            and self.query_truncated
+            and config.query_log.fetch_job_query_if_truncated
+        )
 
     @staticmethod
     def _convert_resource_to_queried_dataset(
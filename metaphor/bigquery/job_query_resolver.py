@@ -0,0 +1,81 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from google.cloud import bigquery
+
+from metaphor.common.logger import get_logger
+from metaphor.common.utils import unique_list
+
+logger = get_logger()
+
+# Format: projects/<projectId>/jobs/<jobId>
+_JOB_NAME_PATTERN = re.compile(r"^projects/([^/]+)/jobs/([^/]+)$")
+
+
+def fetch_job_query(client: bigquery.Client, job_name: str) -> Optional[str]:
+    """Fetch the full SQL of a query job from the job API"""
+    logger.info(f"Query {job_name}")
+    if match := _JOB_NAME_PATTERN.match(job_name):
+        project = match.group(1)
+        job_id = match.group(2)
+
+        try:
+            job = client.get_job(job_id, project)
+        except Exception as e:
+            logger.warning(f"Failed to get job information: {e}")
+            return None
+
+        if isinstance(job, bigquery.QueryJob):
+            return job.query
+
+    return None
+
+
+class JobQueryResolver:
+    """
+    Resolves the full SQL of the jobs whose query is truncated in the audit
+    log. Jobs are fetched concurrently in batches, and cached by job name.
+    """
+
+    def __init__(self, client: bigquery.Client, max_workers: int) -> None:
+        self._client = client
+        self._max_workers = max_workers
+        self._queries: Dict[str, Optional[str]] = {}
+
+        # Number of jobs resolved to the full SQL, or left truncated
+        self.resolved = 0
+        self.truncated = 0
+
+    def resolve(self, job_names: Iterable[str]) -> None:
+        """Fetch the SQL of the jobs concurrently, skipping the cached ones"""
+        pending = [name for name in unique_list(job_names) if name not in self._queries]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for job_name, query in zip(
+                pending,
+                executor.map(lambda name: fetch_job_query(self._client, name), pending),
+            ):
+                self._set(job_name, query)
+
+    def get(self, job_name: str) -> Optional[str]:
+        """Returns the full SQL of the job, fetching it if it's not resolved yet"""
+        if job_name not in self._queries:
+            self._set(job_name, fetch_job_query(self._client, job_name))
+        return self._queries[job_name]
+
+    def _set(self, job_name: str, query: Optional[str]) -> None:
+        self._queries[job_name] = query
+        if query is None:
+            self.truncated += 1
+        else:
+            self.resolved += 1
+
+    def log_stats(self) -> None:
+        if self.resolved or self.truncated:
+            logger.info(
+                f"Truncated queries: {self.resolved} resolved, "
+                f"{self.truncated} left truncated"
+            )
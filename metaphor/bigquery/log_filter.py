@@ -1,23 +1,40 @@
-from typing import Literal
+from datetime import datetime
+from typing import Literal, Optional
 
 from metaphor.bigquery.config import BigQueryRunConfig
 from metaphor.bigquery.queries import Queries
 from metaphor.common.utils import start_of_day
 
+LogTarget = Literal["audit_log", "query_log", "all"]
+
+
+def lookback_start_time(target: LogTarget, config: BigQueryRunConfig) -> datetime:
+    """
+    Returns the start of the lookback window of the target. For "all", it's
+    the earliest of the query log and audit log windows.
+    """
+    if target == "query_log":
+        return start_of_day(config.query_log.lookback_days)
+    if target == "audit_log":
+        return start_of_day(config.lineage.lookback_days)
+    return start_of_day(
+        max(config.query_log.lookback_days, config.lineage.lookback_days)
+    )
+
 
 def build_list_entries_filter(
-    target: Literal["audit_log", "query_log"],
+    target: LogTarget,
     config: BigQueryRunConfig,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
 ) -> str:
     """
-    Builds the filter for a list entries query.
+    Builds the filter for a list entries query. The time range defaults to the
+    lookback window of the target. The "all" target includes the entries of
+    both the query log and audit log.
     """
-    start_time = start_of_day(
-        config.query_log.lookback_days
-        if target == "query_log"
-        else config.lineage.lookback_days
-    ).isoformat()
-    end_time = start_of_day().isoformat()
+    start_time = start_time or lookback_start_time(target, config)
+    end_time = end_time or start_of_day()
 
     # Filter for service account
     service_account_filter = (
@@ -34,5 +51,8 @@ def build_list_entries_filter(
     )
 
     return Queries.log_query_filter(
-        service_account_filter, destination_table_filter, start_time, end_time
+        service_account_filter,
+        destination_table_filter,
+        start_time.isoformat(),
+        end_time.isoformat(),
     )
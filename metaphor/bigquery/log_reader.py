@@ -0,0 +1,95 @@
+import math
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Deque, Iterator, List, Optional
+
+from google.cloud import logging_v2
+
+from metaphor.bigquery.config import BigQueryRunConfig
+from metaphor.bigquery.job_change_event import JobChangeEvent
+from metaphor.bigquery.log_filter import (
+    LogTarget,
+    build_list_entries_filter,
+    lookback_start_time,
+)
+from metaphor.common.logger import get_logger
+from metaphor.common.rate_limiter import TokenBucket
+from metaphor.common.utils import start_of_day, time_slices
+
+logger = get_logger()
+
+# The lookback window is split into slices of this duration, fetched concurrently
+LOG_SLICE_DURATION = timedelta(hours=1)
+
+
+def _fetch_slice(
+    logging_client: logging_v2.Client,
+    filter_: str,
+    page_size: int,
+    rate_limiter: TokenBucket,
+) -> List[JobChangeEvent]:
+    events: List[JobChangeEvent] = []
+
+    # Each page of entries is a separate request to the log entries API
+    rate_limiter.acquire()
+    for count, entry in enumerate(
+        logging_client.list_entries(page_size=page_size, filter_=filter_), start=1
+    ):
+        try:
+            if job_change := JobChangeEvent.from_entry(entry):
+                events.append(job_change)
+        except Exception as ex:
+            logger.exception(ex)
+
+        if count % page_size == 0:
+            rate_limiter.acquire()
+
+    return events
+
+
+def read_job_change_events(
+    logging_client: logging_v2.Client,
+    target: LogTarget,
+    config: BigQueryRunConfig,
+    page_size: int,
+    rate_limiter: TokenBucket,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Iterator[JobChangeEvent]:
+    """
+    Reads the JobChangeEvents of the target from Cloud Logging. The time range
+    (default to the lookback window of the target) is split into slices, which
+    are fetched concurrently by up to `config.max_concurrency` workers, and the
+    events are yielded in the order of the slices.
+    """
+    start_time = start_time or lookback_start_time(target, config)
+    end_time = end_time or start_of_day()
+    if start_time >= end_time:
+        return
+
+    slices = time_slices(
+        start_time,
+        end_time,
+        math.ceil((end_time - start_time) / LOG_SLICE_DURATION),
+    )
+    logger.info(f"Fetching {target} entries in {len(slices)} time slices")
+
+    with ThreadPoolExecutor(max_workers=config.max_concurrency) as executor:
+        # Only keep a bounded number of slices in memory
+        pending: Deque[Future] = deque()
+        for slice_start, slice_end in slices:
+            pending.append(
+                executor.submit(
+                    _fetch_slice,
+                    logging_client,
+                    build_list_entries_filter(target, config, slice_start, slice_end),
+                    page_size,
+                    rate_limiter,
+                )
+            )
+            if len(pending) >= config.max_concurrency:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
@@ -1,7 +1,7 @@
 import asyncio
 import traceback
 from abc import ABC, abstractmethod
-from typing import Collection, Iterator, Optional
+from typing import AsyncGenerator, Collection, Iterator, Optional
 
 from metaphor.common.base_config import BaseConfig
 from metaphor.common.event_util import ENTITY_TYPES
@@ -38,6 +38,34 @@ class BaseExtractor(ABC):
     def run_async(self) -> Collection[ENTITY_TYPES]:
         return asyncio.run(self.extract())
 
+    async def extract_stream(self) -> AsyncGenerator[ENTITY_TYPES, None]:
+        """
+        Extract metadata as a stream of entities. By default yields the
+        entities returned by `extract`, crawler class can override this
+        method to yield entities as soon as they are built, so that they
+        don't need to be held in memory all at once.
+        """
+        for entity in await self.extract():
+            yield entity
+
+    def run_stream(self) -> Iterator[ENTITY_TYPES]:
+        """
+        Drive `extract_stream` on a dedicated event loop and expose it as a
+        synchronous iterator.
+        """
+        loop = asyncio.new_event_loop()
+        stream = self.extract_stream()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
     def collect_query_logs(self) -> Iterator[QueryLog]:
         """
         Collects only the query logs. By default collects nothing,
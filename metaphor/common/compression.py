@@ -0,0 +1,95 @@
+import gzip
+import zlib
+from enum import Enum
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+
+class Compression(Enum):
+    """Compression applied to the output files"""
+
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+COMPRESSION_SUFFIXES = {
+    Compression.GZIP: ".gz",
+    Compression.ZSTD: ".zst",
+}
+
+
+def check_compression_available(compression: Optional[Compression]) -> None:
+    """Raise if the package needed for the compression isn't installed"""
+    if compression is Compression.ZSTD and zstandard is None:
+        raise ImportError(
+            "Please install metaphor-connectors[zstd] extra to use zstd compression"
+        )
+
+
+def file_suffix(compression: Optional[Compression]) -> str:
+    """Returns the extra file name suffix for the compression, if any"""
+    return COMPRESSION_SUFFIXES[compression] if compression else ""
+
+
+class CompressedWriter:
+    """
+    Write bytes to a binary file object through a streaming encoder, so the
+    uncompressed content never has to be held in memory. Closing the writer
+    flushes the encoder but leaves the underlying file object open.
+    """
+
+    def __init__(self, fileobj: BinaryIO, compression: Optional[Compression]):
+        self._fileobj = fileobj
+        self._encoder: Optional[BinaryIO] = None
+        self._compression = compression
+
+        check_compression_available(compression)
+        if compression is Compression.GZIP:
+            self._encoder = gzip.GzipFile(fileobj=fileobj, mode="wb")  # type: ignore
+        elif compression is Compression.ZSTD:
+            self._encoder = zstandard.ZstdCompressor().stream_writer(
+                fileobj, closefd=False
+            )
+
+        self.raw_bytes = 0
+
+        # Uncompressed bytes written since the encoder was last flushed
+        self._unflushed_bytes = 0
+
+    def compressed_bytes(self, limit: Optional[int] = None) -> int:
+        """
+        Number of compressed bytes written so far. The encoder buffers what's
+        written, so it's flushed to get the exact number. As flushing hurts the
+        compression ratio, if the upper bound (assuming the buffered content
+        doesn't compress at all) is below `limit`, that's returned instead.
+        """
+        estimate = self._fileobj.tell() + self._unflushed_bytes
+        if self._unflushed_bytes == 0 or (limit is not None and estimate < limit):
+            return estimate
+
+        self._flush()
+        return self._fileobj.tell()
+
+    def _flush(self) -> None:
+        if self._compression is Compression.GZIP:
+            self._encoder.flush(zlib.Z_SYNC_FLUSH)  # type: ignore
+        elif self._compression is Compression.ZSTD:
+            self._encoder.flush(zstandard.FLUSH_BLOCK)  # type: ignore
+        self._unflushed_bytes = 0
+
+    def write(self, data: bytes) -> None:
+        if self._encoder is None:
+            self._fileobj.write(data)
+        else:
+            self._encoder.write(data)
+            self._unflushed_bytes += len(data)
+        self.raw_bytes += len(data)
+
+    def close(self) -> None:
+        if self._encoder is not None:
+            self._encoder.close()
+            self._unflushed_bytes = 0
@@ -1,9 +1,14 @@
 import json
 import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
 from importlib import resources
-from typing import Optional, Union
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Union
 
 from jsonschema import ValidationError
+from jsonschema.protocols import Validator
 from jsonschema.validators import validator_for
 
 from metaphor import models  # type: ignore
@@ -42,16 +47,41 @@ ENTITY_TYPES = Union[
 ]
 
 
+# Validate records in chunks when using a process pool to amortize the IPC cost
+VALIDATION_CHUNK_SIZE = 100
+
+
+@lru_cache(maxsize=None)
+def get_mce_validator() -> Validator:
+    """
+    Load & check the MCE JSON schema, then build a validator for it. The result
+    is cached so the schema is only processed once per process.
+    """
+    with resources.open_text(models, "metadata_change_event.json") as f:
+        mce_schema = json.load(f)
+
+    validator_class = validator_for(mce_schema)
+    validator_class.check_schema(mce_schema)
+    return validator_class(mce_schema)
+
+
+def _is_valid_message(message: dict) -> bool:
+    """
+    Module-level entry point so it can be pickled into worker processes. Only
+    returns whether the message is valid, so the message isn't sent back.
+    """
+    return EventUtil().validate_message(message) is not None
+
+
+def _are_valid_messages(messages: List[dict]) -> List[bool]:
+    return [_is_valid_message(message) for message in messages]
+
+
 class EventUtil:
     """Event utilities"""
 
     def __init__(self):
-        with resources.open_text(models, "metadata_change_event.json") as f:
-            mce_schema = json.load(f)
-
-        validator_class = validator_for(mce_schema)
-        validator_class.check_schema(mce_schema)
-        self._validator = validator_class(mce_schema)
+        self._validator = get_mce_validator()
 
     @staticmethod
     def _build_event(**kwargs) -> MetadataChangeEvent:
@@ -97,6 +127,65 @@ class EventUtil:
             return None
         return message
 
+    def validate_messages(
+        self, messages: Iterable[dict], max_workers: int = 0
+    ) -> List[dict]:
+        """
+        Validate messages against json schema and return only the valid ones.
+
+        Validation is CPU bound, so it runs in the current thread by default.
+        Set max_workers to a positive number to validate in a process pool.
+        """
+        if max_workers <= 0:
+            return [m for m in map(self.validate_message, messages) if m is not None]
+
+        messages = list(messages)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return [
+                m
+                for m, valid in zip(
+                    messages,
+                    executor.map(
+                        _is_valid_message, messages, chunksize=VALIDATION_CHUNK_SIZE
+                    ),
+                )
+                if valid
+            ]
+
+    def validate_message_stream(
+        self, messages: Iterable[dict], max_workers: int = 0
+    ) -> Iterator[dict]:
+        """
+        Validate a stream of messages lazily and yield only the valid ones, in
+        the same order. With a positive max_workers, the messages are validated
+        in a process pool in chunks, with a bounded number of chunks in flight.
+        """
+        if max_workers <= 0:
+            for message in messages:
+                if self.validate_message(message) is not None:
+                    yield message
+            return
+
+        iterator = iter(messages)
+        pending: Deque[Tuple[List[dict], Future]] = deque()
+        max_pending = max_workers * 2
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                while len(pending) < max_pending:
+                    chunk = list(islice(iterator, VALIDATION_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    pending.append((chunk, executor.submit(_are_valid_messages, chunk)))
+
+                if not pending:
+                    break
+
+                chunk, future = pending.popleft()
+                for message, valid in zip(chunk, future.result()):
+                    if valid:
+                        yield message
+
     @staticmethod
     def clean_nones(value):
         """
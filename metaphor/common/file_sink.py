@@ -1,14 +1,27 @@
+import io
 import json
 import logging
 import tempfile
 from dataclasses import field
 from datetime import datetime, timezone
 from os import path
-from typing import List, Optional
+from typing import Any, BinaryIO, Iterator, List, Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
+from pydantic import field_validator
 from pydantic.dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+from metaphor.common.compression import (
+    CompressedWriter,
+    Compression,
+    check_compression_available,
+    file_suffix,
+)
 from metaphor.common.dataclass import ConnectorConfig
 from metaphor.common.event_util import EventUtil
 from metaphor.common.logger import LOG_FILE, debug_files, get_logger
@@ -16,17 +29,80 @@ from metaphor.common.query_history import DEFAULT_QUERY_LOG_BATCH_SIZE_COUNT
 from metaphor.common.sink import Sink
 from metaphor.common.storage import (
     BaseStorage,
+    ConcurrentFileWriter,
     LocalStorage,
     S3Storage,
     S3StorageConfig,
 )
 from metaphor.common.utils import chunk_by_size
 from metaphor.models.crawler_run_metadata import CrawlerRunMetadata
-from metaphor.models.metadata_change_event import QueryLog, QueryLogs
+from metaphor.models.metadata_change_event import QueryLog
 
 logger = get_logger()
 
 
+# Separator between serialized items in a JSON array
+JSON_SEPARATOR = b","
+
+
+def to_json_bytes(value: Any) -> bytes:
+    """
+    Serialize a value to compact JSON bytes, using orjson if it's installed.
+    The json module is set up to produce the same output, so the files and
+    their batching don't depend on whether orjson is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def join_json_array(items: List[bytes]) -> bytes:
+    """Join already serialized items into the bytes of a JSON array"""
+    return b"[" + JSON_SEPARATOR.join(items) + b"]"
+
+
+def json_array_item_size(item: bytes) -> int:
+    """
+    Number of bytes an already serialized item takes in a JSON array, so that
+    the sizes of all items add up to the array size (minus the brackets).
+    """
+    return len(item) + len(JSON_SEPARATOR)
+
+
+class JsonArrayWriter:
+    """
+    Stream already serialized items into a binary file object as a JSON array,
+    optionally compressed
+    """
+
+    def __init__(self, fileobj: BinaryIO, compression: Optional[Compression]):
+        self.fileobj = fileobj
+        self._writer = CompressedWriter(fileobj, compression)
+        self._writer.write(b"[")
+
+        self.count = 0
+
+        self.items_size = 0
+        """
+        Sum of json_array_item_size of the items written, same as how
+        chunk_by_size measures a chunk.
+        """
+
+    def compressed_bytes(self, limit: Optional[int] = None) -> int:
+        return self._writer.compressed_bytes(limit)
+
+    def write(self, item: bytes) -> None:
+        if self.count:
+            self._writer.write(JSON_SEPARATOR)
+        self._writer.write(item)
+        self.count += 1
+        self.items_size += json_array_item_size(item)
+
+    def close(self) -> None:
+        self._writer.write(b"]")
+        self._writer.close()
+
+
 @dataclass(config=ConnectorConfig)
 class FileSinkConfig:
     # Location of the sink directory, where the MCE file and logs will be output to.
@@ -51,6 +127,35 @@ class FileSinkConfig:
     # Max number of query logs to store in one batch file. Default is 100.
     query_log_batch_size_count: int = DEFAULT_QUERY_LOG_BATCH_SIZE_COUNT
 
+    # Max number of files to upload concurrently. Default is 1, i.e. sequentially
+    upload_concurrency: int = 1
+
+    # Part size for S3 multipart uploads. Default to smart_open's 50 MB
+    s3_multipart_part_size_bytes: Optional[int] = None
+
+    # Number of processes used to validate MCE records. Default is 0, i.e.
+    # validate in the current process
+    validation_processes: int = 0
+
+    # Build, validate & write MCE files incrementally as entities are extracted,
+    # instead of holding all of them in memory. Only connectors that override
+    # extract_stream yield entities while crawling, the rest extract them all first.
+    stream_events: bool = False
+
+    # Compress the output MCE & query log files
+    compression: Optional[Compression] = None
+
+    # Apply batch_size_bytes to the compressed instead of the raw file size
+    compressed_batch_size: bool = False
+
+    @field_validator("compression")
+    @classmethod
+    def _check_compression(
+        cls, compression: Optional[Compression]
+    ) -> Optional[Compression]:
+        check_compression_available(compression)
+        return compression
+
 
 class QueryLogSink:
     def __init__(
@@ -60,11 +165,17 @@ class QueryLogSink:
         batch_size_count: int,
         batch_size_bytes: int,
         logs_per_mce: int,
+        upload_concurrency: int = 1,
+        compression: Optional[Compression] = None,
+        compressed_batch_size: bool = False,
     ) -> None:
         self.path = path
         self.storage = storage
+        self.upload_concurrency = upload_concurrency
+        self.compression = compression
+        self.compressed_batch_size = compressed_batch_size
         self.mces_per_batch = batch_size_count
-        self.bytes_per_batch = batch_size_bytes  # FIXME our logic for handling this isn't that precise, but should be close enough
+        self.bytes_per_batch = batch_size_bytes
 
         self.completed_batches = 0
         self.total_mces_wrote: int = 0
@@ -73,24 +184,33 @@ class QueryLogSink:
         """
 
         # INTERNALS
-        self._logs: List[QueryLog] = []
-        self._mces: List[dict] = []
+        # Each query log & MCE is serialized exactly once, as soon as it's added,
+        # then MCEs are streamed into the (optionally compressed) batch buffer
+        self._logs: List[bytes] = []
+        self._logs_bytes: int = 0
+        self._batch_buffer = io.BytesIO()
+        self._mces = JsonArrayWriter(self._batch_buffer, self.compression)
         self._logs_count: int = 0
         self._mces_count: int = 0
         self.logs_per_mce = logs_per_mce
         self._entered = False
+        self._writer = ConcurrentFileWriter(self.storage, self.upload_concurrency)
 
         self.batch_bytes = 0
 
     def __enter__(self):
         self._entered = True
+        self._writer.__enter__()
         return self
 
     def __exit__(self, _exception_type, _exception_value, _traceback):
-        if self._logs:
-            self._finalize_current_mce()
-        if self._mces:
-            self._finalize_current_batch()
+        try:
+            if self._logs:
+                self._finalize_current_mce()
+            if self._mces_count:
+                self._finalize_current_batch()
+        finally:
+            self._writer.__exit__(_exception_type, _exception_value, _traceback)
 
         self._entered = False
         if self.completed_batches:
@@ -99,23 +219,38 @@ class QueryLogSink:
             )
 
     def _finalize_current_mce(self) -> None:
-        self._mces.append(EventUtil.build_then_trim(QueryLogs(logs=self._logs)))
+        # Equivalent to serializing EventUtil.build_then_trim(QueryLogs(logs=...))
+        mce = b'{"queryLogs":{"logs":' + join_json_array(self._logs) + b"}}"
+        self._mces.write(mce)
         self._logs_count = 0
+        self._logs_bytes = 0
         self._logs.clear()
         self._mces_count += 1
         self.total_mces_wrote += 1
 
     def _finalize_current_batch(self) -> None:
         # No need to validate mce
-        self.storage.write_file(
-            f"{self.path}/query_logs-{self.completed_batches}.json",
-            json.dumps(self._mces),
+        self._mces.close()
+        self._writer.write_file(
+            f"{self.path}/query_logs-{self.completed_batches}.json{file_suffix(self.compression)}",
+            self._batch_buffer.getvalue(),
+            True,
         )
         self.completed_batches += 1
         self._mces_count = 0
-        self._mces.clear()
+        self._batch_buffer = io.BytesIO()
+        self._mces = JsonArrayWriter(self._batch_buffer, self.compression)
         self.batch_bytes = 0
 
+    def _current_batch_bytes(self) -> int:
+        if self.compressed_batch_size:
+            # Logs not yet finalized into an MCE are still uncompressed
+            return (
+                self._mces.compressed_bytes(self.bytes_per_batch - self._logs_bytes)
+                + self._logs_bytes
+            )
+        return self.batch_bytes
+
     def write_query_log(self, query_log: QueryLog) -> None:
         if not self._entered:
             raise ValueError(
@@ -123,17 +258,19 @@ class QueryLogSink:
             )
         if (
             self._logs_count >= self.logs_per_mce
-            or self.batch_bytes >= self.bytes_per_batch
+            or self._current_batch_bytes() >= self.bytes_per_batch
         ):
             self._finalize_current_mce()
         if (
             self._mces_count >= self.mces_per_batch
-            or self.batch_bytes >= self.bytes_per_batch
+            or self._current_batch_bytes() >= self.bytes_per_batch
         ):
             self._finalize_current_batch()
-        self._logs.append(query_log)
+        log = to_json_bytes(EventUtil.trim_event(query_log))
+        self._logs.append(log)
         self._logs_count += 1
-        self.batch_bytes += len(json.dumps(query_log.to_dict()))
+        self._logs_bytes += json_array_item_size(log)
+        self.batch_bytes += json_array_item_size(log)
 
 
 class FileSink(Sink):
@@ -145,11 +282,17 @@ class FileSink(Sink):
         self.batch_size_count = config.batch_size_count
         self.batch_size_bytes = config.batch_size_bytes
         self.query_log_batch_size_count = config.query_log_batch_size_count
+        self.validation_processes = config.validation_processes
+        self.upload_concurrency = config.upload_concurrency
+        self.compression = config.compression
+        self.compressed_batch_size = config.compressed_batch_size
         logger.info(f"Write files to {self.path}")
 
         if config.directory.startswith("s3://"):
             self._storage: BaseStorage = S3Storage(
-                config.assume_role_arn, config.s3_auth_config
+                config.assume_role_arn,
+                config.s3_auth_config,
+                config.s3_multipart_part_size_bytes,
             )
         else:
             self._storage = LocalStorage()
@@ -157,26 +300,98 @@ class FileSink(Sink):
     def _sink(self, messages: List[dict]) -> bool:
         """Write records to file with auto-splitting"""
 
+        if self.compression is not None:
+            # Compress through the streaming path to avoid extra in-memory copies
+            return self._sink_stream(iter(messages)) > 0
+
+        # Serialize each record only once, then chunk on the exact byte sizes
+        records = [to_json_bytes(message) for message in messages]
+
         logger.info("Split MCE records into chunks")
         slices = chunk_by_size(
-            messages,
+            records,
             self.batch_size_count,
             self.batch_size_bytes,
-            lambda item: len(json.dumps(item)),
+            json_array_item_size,
         )
 
-        for part, slice in enumerate(slices):
-            file_name = f"{part+1}-of-{len(slices)}.json"
-            logger.info(f"Writing {file_name} ({slice.stop - slice.start} records)")
-            self._storage.write_file(
-                f"{self.path}/{file_name}",
-                json.dumps(messages[slice]),
-            )
+        with ConcurrentFileWriter(self._storage, self.upload_concurrency) as writer:
+            for part, slice in enumerate(slices):
+                file_name = f"{part+1}-of-{len(slices)}.json"
+                logger.info(f"Writing {file_name} ({slice.stop - slice.start} records)")
+                writer.write_file(
+                    f"{self.path}/{file_name}",
+                    join_json_array(records[slice]),
+                    True,
+                )
 
         logger.info(f"Written {len(slices)} MCE files")
 
         return True
 
+    def _sink_stream(self, messages: Iterator[dict]) -> int:
+        """Write a stream of records to file with auto-splitting
+
+        Records are streamed into a local spool file per chunk, optionally
+        compressed, so that no chunk is held in memory as a whole. The spooled
+        chunks are then written out as "N-of-M.json" once the total number is
+        known.
+        """
+
+        with tempfile.TemporaryDirectory() as spool_dir:
+            num_records = 0
+            num_chunks = 0
+            chunk: Optional[JsonArrayWriter] = None
+
+            for record in (to_json_bytes(message) for message in messages):
+                if chunk is not None and self._is_chunk_full(chunk, record):
+                    chunk.close()
+                    chunk.fileobj.close()
+                    logger.info(
+                        f"Spooled MCE chunk {num_chunks} ({chunk.count} records)"
+                    )
+                    chunk = None
+
+                if chunk is None:
+                    num_chunks += 1
+                    chunk = JsonArrayWriter(
+                        open(path.join(spool_dir, str(num_chunks)), "wb"),
+                        self.compression,
+                    )
+
+                chunk.write(record)
+                num_records += 1
+
+            if chunk is not None:
+                chunk.close()
+                chunk.fileobj.close()
+                logger.info(f"Spooled MCE chunk {num_chunks} ({chunk.count} records)")
+
+            suffix = file_suffix(self.compression)
+            with ConcurrentFileWriter(self._storage, self.upload_concurrency) as writer:
+                for part in range(1, num_chunks + 1):
+                    file_name = f"{part}-of-{num_chunks}.json{suffix}"
+                    logger.info(f"Writing {file_name}")
+                    with open(path.join(spool_dir, str(part)), "rb") as fp:
+                        writer.write_file(f"{self.path}/{file_name}", fp.read(), True)
+
+        logger.info(f"Written {num_chunks} MCE files")
+
+        return num_records
+
+    def _is_chunk_full(self, chunk: JsonArrayWriter, record: bytes) -> bool:
+        """Whether the record would push the chunk over the batch size limits"""
+        if chunk.count >= self.batch_size_count:
+            return True
+
+        record_size = json_array_item_size(record)
+        size = (
+            chunk.compressed_bytes(self.batch_size_bytes - record_size + 1)
+            if self.compressed_batch_size
+            else chunk.items_size
+        )
+        return size + record_size > self.batch_size_bytes
+
     def write_execution_logs(self):
         if not self.write_logs:
             logger.info("Skip writing logs")
@@ -236,4 +451,7 @@ class FileSink(Sink):
             self.batch_size_count,
             self.batch_size_bytes,
             self.query_log_batch_size_count,
+            self.upload_concurrency,
+            self.compression,
+            self.compressed_batch_size,
         )
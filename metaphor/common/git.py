@@ -1,15 +1,20 @@
 import os
+import shutil
 import tempfile
+from contextlib import contextmanager
 from typing import Optional
 from urllib.parse import quote, urlparse
 
-from git import Repo
+from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
 from pydantic import model_validator
 from pydantic.dataclasses import dataclass
 
 from metaphor.common.dataclass import ConnectorConfig
+from metaphor.common.logger import get_logger
 from metaphor.common.utils import must_set_exactly_one
 
+logger = get_logger()
+
 
 @dataclass(config=ConnectorConfig)
 class GitRepoConfig:
@@ -28,6 +33,19 @@ class GitRepoConfig:
     # relative path to the project, default to the root of the repo
     project_path: str = ""
 
+    # branch to check out, default to the default branch of the repo
+    branch: Optional[str] = None
+
+    # number of commits to fetch from the tip of the branch, None for the full history
+    depth: Optional[int] = 1
+
+    # only check out project_path instead of the whole repo
+    sparse_checkout: bool = True
+
+    # local directory to keep the repo between runs, it's fetched & updated to the
+    # latest commit instead of cloned again on each run
+    cache_dir: Optional[str] = None
+
     @model_validator(mode="after")
     def have_token_or_password(self) -> "GitRepoConfig":
         must_set_exactly_one(self.__dict__, ["access_token", "password"])
@@ -37,20 +55,108 @@ class GitRepoConfig:
 def clone_repo(config: GitRepoConfig, local_dir: Optional[str] = None) -> str:
     """
     Clone a git repo to local storage and return the path to the project
-    If local directory not provided, use generated temp directory
+    If local directory not provided, use the cache directory from the config if
+    set, or a generated temp directory otherwise. An existing clone of the same
+    repo in the directory is updated instead of cloned again.
     """
     if local_dir is None:
-        local_dir = tempfile.mkdtemp()
+        local_dir = config.cache_dir or tempfile.mkdtemp()
+
+    repo = _open_cached_repo(config, local_dir)
+    if repo is not None:
+        try:
+            _update_repo(config, repo)
+            return os.path.join(local_dir, config.project_path)
+        except GitCommandError:
+            logger.exception(f"Failed to update {local_dir}, cloning again")
+            shutil.rmtree(local_dir)
+
+    _clone_repo(config, local_dir)
+    return os.path.join(local_dir, config.project_path)
 
-    git_url = _generate_git_url(config)
 
-    Repo.clone_from(git_url, local_dir)
-    return os.path.join(local_dir, config.project_path)
+def _is_sparse(config: GitRepoConfig) -> bool:
+    return config.sparse_checkout and config.project_path.strip("/") != ""
+
+
+def _open_cached_repo(config: GitRepoConfig, local_dir: str) -> Optional[Repo]:
+    """Open the repo previously cloned to local_dir, if any"""
+    try:
+        repo = Repo(local_dir)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        return None
+
+    if not any(
+        remote.name == "origin" and remote.url == config.git_url
+        for remote in repo.remotes
+    ):
+        raise ValueError(f"{local_dir} is not a clone of {config.git_url}")
+
+    return repo
+
+
+@contextmanager
+def _authenticated_origin(config: GitRepoConfig, repo: Repo):
+    """
+    Use the URL with credentials for origin only while talking to the remote,
+    so they're not kept in the local repo's config
+    """
+    origin = repo.remotes.origin
+    origin.set_url(_generate_git_url(config))
+    try:
+        yield
+    finally:
+        origin.set_url(config.git_url)
+
+
+def _set_sparse_checkout(config: GitRepoConfig, repo: Repo) -> None:
+    if _is_sparse(config):
+        repo.git.sparse_checkout("set", "--cone", config.project_path.strip("/"))
+    else:
+        repo.git.sparse_checkout("disable")
+
+
+def _clone_repo(config: GitRepoConfig, local_dir: str) -> None:
+    logger.info(f"Cloning {config.git_url} to {local_dir}")
+
+    sparse = _is_sparse(config)
+    repo = Repo.clone_from(
+        _generate_git_url(config),
+        local_dir,
+        branch=config.branch,
+        depth=config.depth,
+        single_branch=True,
+        # Skip checking out the whole tree & fetch only the blobs needed for
+        # the sparse checkout
+        sparse=sparse,
+        filter="blob:none" if sparse else None,
+    )
+
+    try:
+        if sparse:
+            _set_sparse_checkout(config, repo)
+    finally:
+        repo.remotes.origin.set_url(config.git_url)
+
+
+def _update_repo(config: GitRepoConfig, repo: Repo) -> None:
+    logger.info(f"Updating {config.git_url} in {repo.working_tree_dir}")
+
+    with _authenticated_origin(config, repo):
+        repo.git.fetch("origin", config.branch or "HEAD", depth=config.depth)
+
+        # Move to the fetched commit, dropping any local changes
+        repo.git.checkout("--detach", "--force", "FETCH_HEAD")
+        repo.git.clean("-ffdx")
+        _set_sparse_checkout(config, repo)
 
 
 def _generate_git_url(config: GitRepoConfig) -> str:
     """Generate a git URL containing authentication"""
     parsed_url = urlparse(config.git_url)
+    if parsed_url.scheme == "file":
+        # Local repos don't need authentication
+        return config.git_url
 
     auth = f"{quote(config.username)}:{config.access_token or config.password}"
     host = (parsed_url.hostname or parsed_url.netloc) + (
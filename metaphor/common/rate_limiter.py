@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter. Tokens are refilled continuously at
+    `rate` tokens per second, up to `capacity` tokens.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        assert rate > 0, "rate must be positive"
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def per_minute(requests: float, capacity: float = 1.0) -> "TokenBucket":
+        return TokenBucket(requests / 60, capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until the tokens are available, then take them"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self._rate
+
+            time.sleep(wait_time)
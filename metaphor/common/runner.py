@@ -7,6 +7,7 @@ from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.event_util import EventUtil
 from metaphor.common.file_sink import FileSink, FileSinkConfig, S3StorageConfig
 from metaphor.common.logger import get_logger
+from metaphor.common.sql.cache import log_query_cache_stats
 from metaphor.models.crawler_run_metadata import CrawlerRunMetadata, Platform, RunStatus
 from metaphor.models.metadata_change_event import MetadataChangeEvent
 
@@ -38,7 +39,8 @@ def run_connector(
     Returns
     -------
     list
-        a list of MetadataChangeEvent written to the file sink
+        a list of MetadataChangeEvent written to the file sink. Always empty if
+        `file_sink_config.stream_events` is set, as events are not kept in memory
     """
     start_time = datetime.now()
     logger.info(f"Starting running {name} at {start_time}")
@@ -55,16 +57,23 @@ def run_connector(
     stacktrace = None
 
     events: List[MetadataChangeEvent] = []
+    streamed_event_count = 0
     connector: Optional[BaseExtractor] = None
     try:
         connector = make_connector()
-        entities = connector.run_async()
-        events = [EventUtil.build_event(entity) for entity in entities]
-        file_sink.write_events(events)
+        if file_sink_config.stream_events:
+            streamed_event_count = file_sink.write_event_stream(
+                EventUtil.build_event(entity) for entity in connector.run_stream()
+            )
+        else:
+            entities = connector.run_async()
+            events = [EventUtil.build_event(entity) for entity in entities]
+            file_sink.write_events(events)
 
         with query_log_sink:
             for query_log in connector.collect_query_logs():
                 query_log_sink.write_query_log(query_log)
+        log_query_cache_stats()
 
         if connector.status is RunStatus.FAILURE:
             logger.warning(f"Some of {name}'s entities cannot be parsed!")
@@ -77,7 +86,7 @@ def run_connector(
         stacktrace = traceback.format_exc()
         logger.exception(ex)
 
-    entity_count = len(events) + query_log_sink.total_mces_wrote
+    entity_count = len(events) + streamed_event_count + query_log_sink.total_mces_wrote
     end_time = datetime.now()
     logger.info(
         f"Ended running with {run_status} at {end_time}, "
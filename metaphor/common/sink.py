@@ -1,7 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
-from typing import Generator, List
+from typing import Generator, Iterable, Iterator, List
 
 from metaphor.models.metadata_change_event import MetadataChangeEvent
 
@@ -14,18 +13,16 @@ logger.setLevel(logging.INFO)
 class Sink(ABC):
     """Base class for metadata sinks"""
 
+    # Number of processes used to validate MCE records, 0 means no process pool
+    validation_processes: int = 0
+
     def write_events(self, events: List[MetadataChangeEvent]) -> bool:
         """Sink MCE messages to the destination"""
         event_util = EventUtil()
         records = [event_util.trim_event(e) for e in events]
 
         logger.info("validating MCE records")
-        with ThreadPoolExecutor() as tpe:
-            valid_records = [
-                r
-                for r in tpe.map(event_util.validate_message, records)
-                if r is not None
-            ]
+        valid_records = event_util.validate_messages(records, self.validation_processes)
 
         if len(valid_records) == 0:
             logger.info("No valid MCE records to write")
@@ -33,6 +30,23 @@ class Sink(ABC):
 
         return self._sink(valid_records)
 
+    def write_event_stream(self, events: Iterable[MetadataChangeEvent]) -> int:
+        """Trim, validate & sink MCE messages one by one as they arrive
+
+        Returns the number of valid MCE records written to the destination
+        """
+        event_util = EventUtil()
+        valid_records = event_util.validate_message_stream(
+            (event_util.trim_event(event) for event in events),
+            self.validation_processes,
+        )
+
+        count = self._sink_stream(valid_records)
+        if count == 0:
+            logger.info("No valid MCE records to write")
+
+        return count
+
     @staticmethod
     def _chunks(records: List, n: int) -> Generator[List, None, None]:
         """Yield successive n-sized chunks from list."""
@@ -42,3 +56,14 @@ class Sink(ABC):
     @abstractmethod
     def _sink(self, messages: List[dict]) -> bool:
         """Sink metadata records to the destination, should be overridden"""
+
+    def _sink_stream(self, messages: Iterator[dict]) -> int:
+        """
+        Sink a stream of metadata records to the destination. By default
+        materializes the stream and falls back to `_sink`, subclasses should
+        override this to write records incrementally.
+        """
+        records = list(messages)
+        if records and self._sink(records):
+            return len(records)
+        return 0
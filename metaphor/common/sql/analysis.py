@@ -0,0 +1,234 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlglot import Expression
+from sqlglot.errors import SqlglotError
+
+from metaphor.common.logger import get_logger
+from metaphor.common.sql.cache import QueryCache, get_query_cache
+from metaphor.common.sql.dialect import PLATFORM_TO_DIALECT
+from metaphor.common.sql.parse import (
+    PARSE_TIMEOUT_SECONDS,
+    ParseTimeoutError,
+    check_parse_limits,
+    parse_query,
+)
+from metaphor.common.sql.process_query.bad_queries import is_bad_query_pattern
+from metaphor.common.sql.process_query.config import ProcessQueryConfig
+from metaphor.common.sql.process_query.preprocess import preprocess
+from metaphor.common.sql.process_query.process_query import process_parsed_query
+from metaphor.common.sql.table_level_lineage.result import Result
+from metaphor.common.sql.table_level_lineage.table_level_lineage import (
+    extract_table_level_lineage_from_expression,
+    has_table_level_lineage,
+    is_truncated_insert_into_with_values,
+)
+from metaphor.common.utils import md5_digest
+from metaphor.models.metadata_change_event import DataPlatform, QueriedDataset
+
+logger = get_logger()
+
+PARSE_TIMEOUT_ERROR = "parser timeout"
+
+
+@dataclass
+class QueryAnalysis:
+    """The result of analyzing a SQL query"""
+
+    sql: Optional[str]
+    """
+    The processed SQL query, or `None` if the query should be skipped.
+    """
+
+    lineage: Result = field(default_factory=Result)
+    """
+    The table level lineage of the query.
+    """
+
+    statement_type: Optional[str] = None
+    """
+    Type of the parsed statement, e.g. `insert`, or `None` if it's not parsed.
+    """
+
+    error: Optional[str] = None
+    """
+    The reason why the query cannot be parsed, if any.
+    """
+
+    def to_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "targets": [dataset.to_dict() for dataset in self.lineage.targets],
+            "sources": [dataset.to_dict() for dataset in self.lineage.sources],
+            "statement_type": self.statement_type,
+            "error": self.error,
+        }
+
+    @staticmethod
+    def from_dict(obj: dict) -> "QueryAnalysis":
+        return QueryAnalysis(
+            sql=obj["sql"],
+            lineage=Result(
+                targets=[QueriedDataset.from_dict(d) for d in obj["targets"]],
+                sources=[QueriedDataset.from_dict(d) for d in obj["sources"]],
+            ),
+            statement_type=obj["statement_type"],
+            error=obj["error"],
+        )
+
+
+def analyze_query(
+    sql: str,
+    platform: DataPlatform,
+    config: ProcessQueryConfig,
+    extract_lineage: bool = True,
+    account: Optional[str] = None,
+    statement_type: Optional[str] = None,
+    query_id: Optional[str] = None,
+    default_database: Optional[str] = None,
+    default_schema: Optional[str] = None,
+) -> QueryAnalysis:
+    """
+    Processes a crawled SQL query and extracts its table level lineage, while
+    parsing the query at most once. The results are cached according to
+    `config.cache`, so repeated queries are not parsed again.
+
+    Parameters
+    ----------
+    sql : str
+        The SQL query to analyze.
+
+    platform : DataPlatform
+        The data platform.
+
+    config : ProcessQueryConfig
+        Config for controlling how the query is processed, see `process_query`.
+
+    extract_lineage : bool
+        Whether to extract table level lineage from the query.
+
+    account, default_database, default_schema : Optional[str]
+        Used to resolve the tables in the lineage.
+
+    statement_type : Optional[str]
+        The statement type reported by the data platform. If it's known to
+        have no lineage, lineage will not be extracted.
+
+    query_id : Optional[str]
+        The ID of the SQL query, for logging.
+
+    Returns
+    -------
+    The `QueryAnalysis` of the query.
+    """
+    should_process = config.should_process and not is_bad_query_pattern(sql)
+    should_extract_lineage = extract_lineage and has_table_level_lineage(statement_type)
+
+    if not should_process and not should_extract_lineage:
+        return QueryAnalysis(sql=sql)
+
+    cache = get_query_cache(config.cache)
+    if cache is None:
+        return _analyze_query(
+            sql,
+            platform,
+            config,
+            should_process,
+            should_extract_lineage,
+            account,
+            query_id,
+            default_database,
+            default_schema,
+        )
+
+    dialect = PLATFORM_TO_DIALECT.get(platform)
+    key = QueryCache.make_key(
+        platform.value,
+        dialect,
+        md5_digest(sql.encode("utf-8")),
+        config.fingerprint,
+        str(should_process),
+        str(should_extract_lineage),
+        account,
+        default_database,
+        default_schema,
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        return QueryAnalysis.from_dict(cached)
+
+    analysis = _analyze_query(
+        sql,
+        platform,
+        config,
+        should_process,
+        should_extract_lineage,
+        account,
+        query_id,
+        default_database,
+        default_schema,
+    )
+
+    # Timeouts depend on the load of the machine, retry them next time
+    if analysis.error != PARSE_TIMEOUT_ERROR:
+        cache.put(key, analysis.to_dict())
+
+    return analysis
+
+
+def _analyze_query(
+    sql: str,
+    platform: DataPlatform,
+    config: ProcessQueryConfig,
+    should_process: bool,
+    should_extract_lineage: bool,
+    account: Optional[str],
+    query_id: Optional[str],
+    default_database: Optional[str],
+    default_schema: Optional[str],
+) -> QueryAnalysis:
+    updated = preprocess(sql, platform)
+
+    error = check_parse_limits(updated, config.parse_limits)
+    if error is None:
+        try:
+            expression: Expression = parse_query(
+                updated, PLATFORM_TO_DIALECT.get(platform), PARSE_TIMEOUT_SECONDS
+            )
+        except SqlglotError as e:
+            error = str(e)
+        except RecursionError:
+            error = "maximum recursion depth exceeded"
+        except ParseTimeoutError:
+            error = PARSE_TIMEOUT_ERROR
+
+    if error is not None:
+        if query_id and not is_truncated_insert_into_with_values(sql):
+            logger.warning(f"Cannot parse sql with query_id = {query_id}: {error}")
+
+        unparsable_sql = (
+            None if should_process and config.skip_unparsable_queries else sql
+        )
+        return QueryAnalysis(sql=unparsable_sql, error=error)
+
+    return QueryAnalysis(
+        sql=(
+            process_parsed_query(expression, updated, platform, config)
+            if should_process
+            else sql
+        ),
+        lineage=(
+            extract_table_level_lineage_from_expression(
+                expression,
+                platform,
+                account,
+                query_id,
+                default_database,
+                default_schema,
+            )
+            if should_extract_lineage
+            else Result()
+        ),
+        statement_type=expression.key,
+    )
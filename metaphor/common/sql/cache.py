@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, Optional, Tuple
+
+import sqlglot
+from pydantic.dataclasses import dataclass
+
+from metaphor.common.base_config import ConnectorConfig
+from metaphor.common.logger import get_logger
+from metaphor.common.utils import md5_digest
+
+logger = get_logger()
+
+# Commit the on-disk cache after this many writes
+DISK_CACHE_COMMIT_INTERVAL = 500
+
+
+def _package_version() -> str:
+    try:
+        return version("metaphor-connectors")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+# Results depend on the parser and on our own processing code, so the cached
+# entries are invalidated whenever either is upgraded
+CACHE_VERSION = f"{_package_version()}/{sqlglot.__version__}"
+
+
+@dataclass(config=ConnectorConfig)
+class QueryCacheConfig:
+    """
+    Config for caching the analysis results of SQL queries, so repeated
+    queries are only parsed once.
+    """
+
+    enabled: bool = True
+
+    max_entries: int = 10_000
+    """
+    Max number of results to keep in memory.
+    """
+
+    directory: Optional[str] = None
+    """
+    If set, the results are also persisted to a SQLite database in this
+    directory, so they can be reused across runs.
+    """
+
+
+class QueryCache:
+    """
+    LRU cache of query analysis results, backed by an optional SQLite database.
+    Values are JSON-serializable dicts.
+    """
+
+    def __init__(self, max_entries: int, directory: Optional[str] = None) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._directory = directory
+
+        # SQLite connections can't be shared across processes
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._pending_writes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        return md5_digest(
+            "\x1f".join(part or "" for part in (CACHE_VERSION, *parts)).encode("utf-8")
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        else:
+            value = self._get_from_disk(key)
+            if value is not None:
+                self._put_in_memory(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        self._put_in_memory(key, value)
+
+        db = self._get_db()
+        if db is not None:
+            db.execute(
+                "INSERT OR REPLACE INTO query_cache (key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= DISK_CACHE_COMMIT_INTERVAL:
+                self.flush()
+
+    def flush(self) -> None:
+        """Commit pending writes to the on-disk cache"""
+        if self._db is not None and self._db_pid == os.getpid():
+            self._db.commit()
+        self._pending_writes = 0
+
+    def _put_in_memory(self, key: str, value: dict) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_from_disk(self, key: str) -> Optional[dict]:
+        db = self._get_db()
+        if db is None:
+            return None
+
+        row = db.execute(
+            "SELECT value FROM query_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        if self._directory is None:
+            return None
+
+        if self._db is None or self._db_pid != os.getpid():
+            os.makedirs(os.path.expanduser(self._directory), exist_ok=True)
+            db_path = os.path.join(os.path.expanduser(self._directory), "queries.db")
+            self._db = sqlite3.connect(db_path, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_cache (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._db_pid = os.getpid()
+            self._pending_writes = 0
+
+        return self._db
+
+
+_caches: Dict[Tuple[int, Optional[str]], QueryCache] = {}
+
+
+def get_query_cache(config: QueryCacheConfig) -> Optional[QueryCache]:
+    """Returns the process-wide cache for the config, or None if it's disabled"""
+    if not config.enabled:
+        return None
+
+    key = (config.max_entries, config.directory)
+    if key not in _caches:
+        _caches[key] = QueryCache(config.max_entries, config.directory)
+    return _caches[key]
+
+
+def log_query_cache_stats() -> None:
+    """Flush the on-disk caches and log the hit/miss counters"""
+    for cache in _caches.values():
+        cache.flush()
+        if cache.hits or cache.misses:
+            logger.info(
+                f"Query cache: {cache.hits} hits, {cache.misses} misses, "
+                f"{cache.hits / (cache.hits + cache.misses):.1%} hit rate"
+            )
@@ -0,0 +1,159 @@
+import ctypes
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic.dataclasses import dataclass
+from sqlglot import Expression, maybe_parse
+
+from metaphor.common.base_config import ConnectorConfig
+
+# Max number of seconds to spend on parsing a single query
+PARSE_TIMEOUT_SECONDS = 10
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_LEADING_COMMENTS_PATTERN = re.compile(r"^(\s*(/\*.*?\*/|--[^\n]*))*\s*", re.DOTALL)
+_INSERT_VALUES_PATTERN = re.compile(
+    r"insert\s+(into\s+)?[^\s(]+\s*(\([^)]*\)\s*)?values\s*\(", re.IGNORECASE
+)
+_VALUES_ROW_SEPARATOR_PATTERN = re.compile(r"\)\s*,\s*\(")
+
+
+@dataclass(config=ConnectorConfig)
+class ParseLimitsConfig:
+    """
+    Limits for skipping pathological queries without parsing them. A limit of 0
+    means no limit.
+    """
+
+    max_length: int = 1_000_000
+    """
+    Max number of characters in a query.
+    """
+
+    max_tokens: int = 100_000
+    """
+    Max number of (approximate) tokens in a query.
+    """
+
+    max_insert_values_rows: int = 1_000
+    """
+    Max number of rows in an `INSERT ... VALUES` query.
+    """
+
+
+def check_parse_limits(sql: str, limits: ParseLimitsConfig) -> Optional[str]:
+    """
+    Returns the reason if the query exceeds any of the limits, or `None` if
+    it should be parsed.
+    """
+    if limits.max_length and len(sql) > limits.max_length:
+        return f"query too long ({len(sql)} characters)"
+
+    if limits.max_tokens:
+        tokens = _TOKEN_PATTERN.finditer(sql)
+        if next(itertools.islice(tokens, limits.max_tokens, None), None):
+            return f"query has more than {limits.max_tokens} tokens"
+
+    if limits.max_insert_values_rows:
+        start = _LEADING_COMMENTS_PATTERN.match(sql)
+        if _INSERT_VALUES_PATTERN.match(sql, start.end() if start else 0):
+            rows = _VALUES_ROW_SEPARATOR_PATTERN.finditer(sql)
+            if next(
+                itertools.islice(rows, limits.max_insert_values_rows - 1, None), None
+            ):
+                return f"INSERT ... VALUES with more than {limits.max_insert_values_rows} rows"
+
+    return None
+
+
+class ParseTimeoutError(BaseException):
+    """
+    Raised in the parsing thread when it runs out of time. Not an `Exception`
+    so it's not swallowed by the error handling in the parser.
+    """
+
+
+class _Watchdog:
+    """
+    A single daemon thread that interrupts the threads running past their
+    deadlines, by raising `ParseTimeoutError` asynchronously in them. Unlike
+    spawning a thread per call, the work stays in the calling thread and is
+    unwound on timeout, so no runaway thread is left behind.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._deadlines: Dict[int, float] = {}
+        self._heap: List[Tuple[float, int]] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="parse-watchdog", daemon=True
+                )
+                self._thread.start()
+
+            self._deadlines[thread_id] = deadline
+            heapq.heappush(self._heap, (deadline, thread_id))
+            self._condition.notify()
+
+    def cancel(self, thread_id: int) -> None:
+        with self._condition:
+            if self._deadlines.pop(thread_id, None) is not None:
+                if not self._deadlines:
+                    self._heap.clear()
+                return
+
+        # Already fired, clear the exception in case it's not raised yet
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+    def _run(self) -> None:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, thread_id = heapq.heappop(self._heap)
+                    # Skip the deadlines that are cancelled or replaced
+                    if self._deadlines.get(thread_id) == deadline:
+                        del self._deadlines[thread_id]
+                        ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                            ctypes.c_ulong(thread_id),
+                            ctypes.py_object(ParseTimeoutError),
+                        )
+
+                self._condition.wait(self._heap[0][0] - now if self._heap else None)
+
+
+_watchdog = _Watchdog()
+
+
+def _reset_watchdog() -> None:
+    # The watchdog thread doesn't survive a fork, and may hold its lock
+    global _watchdog
+    _watchdog = _Watchdog()
+
+
+os.register_at_fork(after_in_child=_reset_watchdog)
+
+
+def parse_query(
+    sql: str, dialect: Optional[str], timeout: float = PARSE_TIMEOUT_SECONDS
+) -> Expression:
+    """
+    Parse a SQL query with sqlglot, raises `ParseTimeoutError` if it takes
+    longer than `timeout` seconds.
+    """
+    thread_id = threading.get_ident()
+    _watchdog.start(thread_id, timeout)
+    try:
+        return maybe_parse(sql, dialect=dialect)
+    finally:
+        _watchdog.cancel(thread_id)
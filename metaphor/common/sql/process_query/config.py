@@ -1,3 +1,4 @@
+import json
 from dataclasses import field
 
 from pydantic import Field, ValidationInfo, field_validator
@@ -5,6 +6,9 @@ from pydantic.dataclasses import dataclass
 
 from metaphor.common.base_config import ConnectorConfig
 from metaphor.common.logger import get_logger
+from metaphor.common.sql.cache import QueryCacheConfig
+from metaphor.common.sql.parse import ParseLimitsConfig
+from metaphor.common.utils import md5_digest
 
 logger = get_logger()
 
@@ -70,6 +74,50 @@ class ProcessQueryConfig:
     Skip commands that interact with databases, such as: create user
     """
 
+    max_workers: int = 0
+    """
+    Number of worker processes used to parse the queries. If this is set to 0,
+    the queries are processed in the main process.
+    """
+
+    batch_size: int = 500
+    """
+    Number of queries sent to a worker process at a time.
+    """
+
+    parse_limits: ParseLimitsConfig = field(default_factory=lambda: ParseLimitsConfig())
+    """
+    Skip parsing the queries that are too large, as they are slow to parse
+    and unlikely to yield useful results.
+    """
+
+    cache: QueryCacheConfig = field(default_factory=lambda: QueryCacheConfig())
+    """
+    Cache the results of analyzing queries, so repeated queries are only
+    parsed once.
+    """
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Digest of the settings that affect the processed queries, used to
+        invalidate the cached results when the config changes.
+        """
+        return md5_digest(
+            json.dumps(
+                [
+                    self.redact_literals.enabled,
+                    self.redact_literals.placeholder_literal,
+                    self.ignore_insert_values_into,
+                    self.skip_unparsable_queries,
+                    self.ignore_command_statement,
+                    self.parse_limits.max_length,
+                    self.parse_limits.max_tokens,
+                    self.parse_limits.max_insert_values_rows,
+                ]
+            ).encode("utf-8")
+        )
+
     @property
     def should_process(self) -> bool:
         """
@@ -1,13 +1,14 @@
 import typing as t
 from typing import Optional
 
-from sqlglot import Expression, exp, maybe_parse
+from sqlglot import Expression, exp
 from sqlglot.dialects.dialect import Dialect
 from sqlglot.errors import SqlglotError
 from sqlglot.generator import Generator
 
 from metaphor.common.logger import get_logger
 from metaphor.common.sql.dialect import PLATFORM_TO_DIALECT
+from metaphor.common.sql.parse import ParseTimeoutError, check_parse_limits, parse_query
 from metaphor.common.sql.process_query.bad_queries import is_bad_query_pattern
 from metaphor.common.sql.process_query.config import ProcessQueryConfig
 from metaphor.common.sql.process_query.preprocess import preprocess
@@ -73,14 +74,53 @@ def process_query(
 
     try:
         updated = preprocess(sql, data_platform)
-        expression: Expression = maybe_parse(updated, dialect=dialect)
+        reason = check_parse_limits(updated, config.parse_limits)
+        if reason is not None:
+            logger.debug(f"{sqlglot_error_message}: {reason}")
+            return None if config.skip_unparsable_queries else sql
+
+        expression: Expression = parse_query(updated, dialect)
     except SqlglotError as e:
         logger.debug(f"{sqlglot_error_message}: {e}")
         return None if config.skip_unparsable_queries else sql
     except RecursionError:
         logger.debug(f"{sqlglot_error_message}: maximum recursion depth exceeded")
         return None if config.skip_unparsable_queries else sql
+    except ParseTimeoutError:
+        logger.debug(f"{sqlglot_error_message}: parser timeout")
+        return None if config.skip_unparsable_queries else sql
+
+    return process_parsed_query(expression, updated, data_platform, config)
+
+
+def process_parsed_query(
+    expression: Expression,
+    sql: str,
+    data_platform: DataPlatform,
+    config: ProcessQueryConfig,
+) -> Optional[str]:
+    """
+    Processes an already parsed SQL query, see `process_query`.
 
+    Parameters
+    ----------
+    expression : Expression
+        The parsed SQL query.
+
+    sql : str
+        The preprocessed SQL query `expression` is parsed from.
+
+    data_platform : DataPlatform
+        The data platform.
+
+    config : ProcessQueryConfig
+        Config for controlling what to do.
+
+    Returns
+    -------
+    The processed SQL query as a `str`, or `None` if the SQL query does not
+    include any lineage.
+    """
     if config.ignore_insert_values_into and _is_insert_values_into(expression):
         return None
 
@@ -91,8 +131,9 @@ def process_query(
         return None
 
     if not config.redact_literals.enabled:
-        return updated
+        return sql
 
+    dialect = PLATFORM_TO_DIALECT.get(data_platform)
     DialectClass: t.Type[Dialect]
     if dialect is None:
         DialectClass = Dialect
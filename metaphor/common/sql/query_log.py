@@ -1,11 +1,19 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Optional
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
 
+from metaphor.common.logger import get_logger
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.cache import get_query_cache
 from metaphor.common.sql.process_query.config import ProcessQueryConfig
 from metaphor.common.sql.process_query.process_query import process_query
 from metaphor.common.utils import md5_digest
 from metaphor.models.metadata_change_event import DataPlatform, QueryLog
 
+logger = get_logger()
+
 
 @dataclass
 class PartialQueryLog(QueryLog):
@@ -25,7 +33,6 @@ def process_and_init_query_log(
     query_hash: Optional[str] = None,
 ) -> Optional[QueryLog]:
     sql_hash = query_hash or md5_digest(query.encode("utf-8"))
-    query_id = query_id or sql_hash
 
     sql = process_query(
         query,
@@ -34,14 +41,146 @@ def process_and_init_query_log(
         sql_hash,
     )
 
-    if sql:
+    return init_query_log(query, sql, platform, query_log, query_id, sql_hash)
+
+
+def init_query_log(
+    query: str,
+    processed_sql: Optional[str],
+    platform: DataPlatform,
+    query_log: PartialQueryLog,
+    query_id: Optional[str] = None,
+    query_hash: Optional[str] = None,
+) -> Optional[QueryLog]:
+    """
+    Build a QueryLog from the processed version of a raw query, e.g. the `sql`
+    of a `QueryAnalysis`. Returns `None` if the processed query is empty.
+    """
+    sql_hash = query_hash or md5_digest(query.encode("utf-8"))
+    query_id = query_id or sql_hash
+
+    if processed_sql:
         return QueryLog(
             **query_log.__dict__,
             id=f"{platform.name}:{query_id}",
-            sql=sql,
+            sql=processed_sql,
             query_id=query_id,
             sql_hash=sql_hash,
             platform=platform,
         )
 
     return None
+
+
+@dataclass
+class QueryLogTask:
+    """A raw query to be processed into a QueryLog"""
+
+    query: str
+    query_log: PartialQueryLog
+    query_id: Optional[str] = None
+    query_hash: Optional[str] = None
+
+    extract_lineage: bool = False
+    """
+    Whether to extract table level lineage from the query as the sources &
+    targets of the query log. The account & default database / schema of the
+    partial query log are used to resolve the table names.
+    """
+
+
+def _process_task(
+    task: QueryLogTask, platform: DataPlatform, config: ProcessQueryConfig
+) -> Optional[QueryLog]:
+    try:
+        analysis = analyze_query(
+            task.query,
+            platform,
+            config,
+            extract_lineage=task.extract_lineage,
+            account=task.query_log.account,
+            query_id=task.query_id,
+            default_database=task.query_log.default_database,
+            default_schema=task.query_log.default_schema,
+        )
+        if task.extract_lineage:
+            task.query_log.sources = analysis.lineage.sources
+            task.query_log.targets = analysis.lineage.targets
+
+        return init_query_log(
+            task.query,
+            analysis.sql,
+            platform,
+            task.query_log,
+            task.query_id,
+            task.query_hash,
+        )
+    except Exception:
+        logger.exception(f"query log processing error, query id: {task.query_id}")
+        return None
+
+
+def _process_tasks(
+    tasks: List[QueryLogTask], platform: DataPlatform, config: ProcessQueryConfig
+) -> Tuple[List[Optional[QueryLog]], int, int]:
+    """
+    Process a batch of tasks, runs in a worker process. Also returns the number
+    of cache hits & misses in the batch, so they can be reported by the main
+    process.
+    """
+    cache = get_query_cache(config.cache)
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+
+    query_logs = [_process_task(task, platform, config) for task in tasks]
+
+    if cache is None:
+        return query_logs, 0, 0
+
+    cache.flush()
+    return query_logs, cache.hits - hits, cache.misses - misses
+
+
+def process_query_logs(
+    tasks: Iterable[QueryLogTask],
+    platform: DataPlatform,
+    config: ProcessQueryConfig,
+) -> Iterator[QueryLog]:
+    """
+    Process raw queries into QueryLogs, skipping the ones that are filtered out.
+
+    If `config.max_workers` is positive, the queries are sent in batches to a
+    pool of worker processes, as parsing is CPU bound. The tasks are consumed
+    lazily with a bounded number of batches in flight, and the query logs are
+    yielded in the same order as the tasks.
+    """
+    if config.max_workers <= 0:
+        for task in tasks:
+            query_log = _process_task(task, platform, config)
+            if query_log:
+                yield query_log
+        return
+
+    iterator = iter(tasks)
+    pending: Deque[Future] = deque()
+    max_pending = config.max_workers * 2
+    cache = get_query_cache(config.cache)
+
+    with ProcessPoolExecutor(max_workers=config.max_workers) as executor:
+        while True:
+            while len(pending) < max_pending:
+                batch = list(islice(iterator, config.batch_size))
+                if not batch:
+                    break
+                pending.append(executor.submit(_process_tasks, batch, platform, config))
+
+            if not pending:
+                break
+
+            query_logs, hits, misses = pending.popleft().result()
+            if cache:
+                cache.hits += hits
+                cache.misses += misses
+
+            for query_log in query_logs:
+                if query_log:
+                    yield query_log
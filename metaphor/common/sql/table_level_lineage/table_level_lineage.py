@@ -5,12 +5,17 @@ from typing import Dict, Optional, Set
 
 import sqlglot
 import sqlglot.errors
-from func_timeout import FunctionTimedOut, func_timeout
-from sqlglot import Expression, exp, maybe_parse
+from sqlglot import Expression, exp
 from sqlglot.optimizer.scope import build_scope
 
 from metaphor.common.logger import get_logger
 from metaphor.common.sql.dialect import PLATFORM_TO_DIALECT
+from metaphor.common.sql.parse import (
+    ParseLimitsConfig,
+    ParseTimeoutError,
+    check_parse_limits,
+    parse_query,
+)
 from metaphor.common.sql.table_level_lineage.helpers.expression_handlers import (
     expression_handlers,
     find_target_in_select_into,
@@ -33,7 +38,7 @@ class IgnoreSQLGlotUnsupportedSyntax(logging.Filter):
         )
 
 
-def _is_truncated_insert_into_with_values(sql: str):
+def is_truncated_insert_into_with_values(sql: str):
     sql = re.sub(r"/\*.*?\*/\s*", "", sql, flags=re.DOTALL)
     match = re.match(r"^insert\s+into[^\(]+\([^\)]+\)\s+values", sql, re.IGNORECASE)
     return match is not None and sql.endswith("...")
@@ -129,6 +134,11 @@ def _find_sources(expression: Expression) -> Set[Table]:
     return sources
 
 
+def has_table_level_lineage(statement_type: Optional[str]) -> bool:
+    """Whether a statement of the given type can have table level lineage"""
+    return not statement_type or statement_type.upper() in _VALID_STATEMENT_TYPES
+
+
 def extract_table_level_lineage(
     sql: str,
     platform: DataPlatform,
@@ -138,21 +148,20 @@ def extract_table_level_lineage(
     default_database: Optional[str] = None,
     default_schema: Optional[str] = None,
 ) -> Result:
-    if statement_type and statement_type.upper() not in _VALID_STATEMENT_TYPES:
+    if not has_table_level_lineage(statement_type):
         # No target, no TLL possible
         return Result()
 
+    reason = check_parse_limits(sql, ParseLimitsConfig())
+    if reason is not None:
+        if query_id:
+            logger.warning(f"Skip parsing sql with query_id = {query_id}: {reason}")
+        return Result()
+
     try:
-        expression: Expression = func_timeout(
-            10,
-            maybe_parse,
-            kwargs={
-                "sql_or_expression": sql,
-                "dialect": PLATFORM_TO_DIALECT.get(platform),
-            },
-        )  # type: ignore
+        expression: Expression = parse_query(sql, PLATFORM_TO_DIALECT.get(platform))
     except (sqlglot.errors.ParseError, sqlglot.errors.TokenError):
-        if not _is_truncated_insert_into_with_values(sql) and query_id:
+        if not is_truncated_insert_into_with_values(sql) and query_id:
             logger.warning(f"Cannot parse sql with query_id = {query_id}")
         return Result()
     except RecursionError:
@@ -161,11 +170,25 @@ def extract_table_level_lineage(
                 f"Cannot parse sql with SQLGlot (max recursion level exceeded), query_id = {query_id}"
             )
         return Result()
-    except FunctionTimedOut:
+    except ParseTimeoutError:
         if query_id:
             logger.warning(f"Parser timeout, query_id = {query_id}")
         return Result()
 
+    return extract_table_level_lineage_from_expression(
+        expression, platform, account, query_id, default_database, default_schema
+    )
+
+
+def extract_table_level_lineage_from_expression(
+    expression: Expression,
+    platform: DataPlatform,
+    account: Optional[str],
+    query_id: Optional[str] = None,
+    default_database: Optional[str] = None,
+    default_schema: Optional[str] = None,
+) -> Result:
+    """Extract table level lineage from an already parsed SQL expression"""
     try:
         return Result(
             targets=[
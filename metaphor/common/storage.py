@@ -1,6 +1,8 @@
 import os
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Union
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
 import boto3
@@ -22,6 +24,10 @@ OWNER_FULL_CONTROL_ACL = {
     }
 }
 
+# Max number of keys allowed in a single DeleteObjects request
+# See https://docs.aws.amazon.com/AmazonS3/latest/API/API_DeleteObjects.html
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
 
 class BaseStorage(ABC):
     """Base class for file storage"""
@@ -50,7 +56,8 @@ class LocalStorage(BaseStorage):
         os.makedirs(os.path.expanduser(os.path.dirname(path)), exist_ok=True)
 
         mode = "wb" if binary_mode else "w"
-        with open(path, mode) as fp:
+        # Payload is written as is, even if the file extension implies compression
+        with open(path, mode, compression="disable") as fp:
             fp.write(payload)
 
     def list_files(self, path: str, suffix: Optional[str]) -> List[str]:
@@ -84,6 +91,7 @@ class S3Storage(BaseStorage):
         self,
         assume_role_arn: Optional[str] = None,
         config: S3StorageConfig = S3StorageConfig(),
+        multipart_part_size: Optional[int] = None,
     ):
         session = boto3.Session(
             aws_access_key_id=config.aws_access_key_id,
@@ -99,6 +107,7 @@ class S3Storage(BaseStorage):
             self._session = session
 
         self._client = self._session.client("s3")
+        self._multipart_part_size = multipart_part_size
         logger.info("Created S3 client")
 
     def write_file(
@@ -110,9 +119,13 @@ class S3Storage(BaseStorage):
             # See https://github.com/RaRe-Technologies/smart_open#s3-credentials
             "client": self._client,
         }
+        if self._multipart_part_size is not None:
+            transport_params["min_part_size"] = self._multipart_part_size
 
         mode = "wb" if binary_mode else "w"
-        with open(path, mode, transport_params=transport_params) as fp:
+        with open(
+            path, mode, compression="disable", transport_params=transport_params
+        ) as fp:
             fp.write(payload)
 
     def list_files(self, path: str, suffix: Optional[str]) -> List[str]:
@@ -139,12 +152,27 @@ class S3Storage(BaseStorage):
         ]
 
     def delete_files(self, paths: List[str]) -> None:
+        keys_by_bucket: Dict[str, List[str]] = defaultdict(list)
         for path in paths:
             bucket, key = S3Storage.parse_s3_uri(path)
-            self._client.delete_object(
-                Bucket=bucket,
-                Key=key,
-            )
+            keys_by_bucket[bucket].append(key)
+
+        for bucket, keys in keys_by_bucket.items():
+            for i in range(0, len(keys), S3_DELETE_OBJECTS_MAX_KEYS):
+                resp = self._client.delete_objects(
+                    Bucket=bucket,
+                    Delete={
+                        "Objects": [
+                            {"Key": key}
+                            for key in keys[i : i + S3_DELETE_OBJECTS_MAX_KEYS]
+                        ],
+                        "Quiet": True,
+                    },
+                )
+                for error in resp.get("Errors", []):
+                    logger.error(
+                        f"Failed to delete s3://{bucket}/{error.get('Key')}: {error.get('Message')}"
+                    )
 
     @staticmethod
     def parse_s3_uri(uri: str) -> Tuple[str, str]:
@@ -155,3 +183,56 @@ class S3Storage(BaseStorage):
             raise ValueError(f"invalid S3 URI {uri}")
 
         return result.netloc, result.path.strip("/")
+
+
+class ConcurrentFileWriter:
+    """
+    Write files to a storage using a pool of threads, with at most max_workers
+    files in flight at any time. Writes synchronously if max_workers <= 1.
+
+    Must be used as a context manager, which waits for all pending writes on
+    exit and re-raises the first error encountered.
+    """
+
+    def __init__(self, storage: BaseStorage, max_workers: int) -> None:
+        self._storage = storage
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[Future] = set()
+
+    def __enter__(self) -> "ConcurrentFileWriter":
+        if self._max_workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        return self
+
+    def __exit__(self, _exception_type, _exception_value, _traceback) -> None:
+        try:
+            self._wait(len(self._pending))
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def write_file(
+        self, path: str, payload: Union[str, bytes], binary_mode=False
+    ) -> None:
+        if self._executor is None:
+            self._storage.write_file(path, payload, binary_mode)
+            return
+
+        # Bound the number of payloads held by in-flight writes
+        if len(self._pending) >= self._max_workers:
+            self._wait(1)
+
+        self._pending.add(
+            self._executor.submit(self._storage.write_file, path, payload, binary_mode)
+        )
+
+    def _wait(self, count: int) -> None:
+        """Wait for at least `count` pending writes to complete"""
+        completed = 0
+        while self._pending and completed < count:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            completed += len(done)
+            for future in done:
+                future.result()
@@ -1,7 +1,7 @@
 import math
 from datetime import datetime, time, timedelta, timezone
 from hashlib import md5
-from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 
 from dateutil.parser import isoparse
 from pydantic import validate_email
@@ -18,6 +18,19 @@ def start_of_day(daysAgo=0) -> datetime:
     ) - timedelta(days=daysAgo)
 
 
+def time_slices(
+    start: datetime, end: datetime, slices: int
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Split the time range into the given number of contiguous slices of equal
+    width. The end of each slice is the start of the next one.
+    """
+    slices = max(slices, 1)
+    width = (end - start) / slices
+    bounds = [start + width * i for i in range(slices)] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
 T = TypeVar("T")
 
 
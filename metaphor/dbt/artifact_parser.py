@@ -1,13 +1,30 @@
 import json
-from copy import deepcopy
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+)
+
+from pydantic import TypeAdapter
 
 from metaphor.common.entity_id import EntityId
 from metaphor.common.logger import get_logger
 from metaphor.common.snowflake import normalize_snowflake_account
 from metaphor.common.utils import filter_none, unique_list
 from metaphor.dbt.config import DbtRunConfig
+from metaphor.dbt.manifest_reader import iter_manifest, read_manifest_metadata
 from metaphor.dbt.util import (
     add_data_quality_monitor,
     build_metric_docs_url,
@@ -255,6 +272,17 @@ DEPENDS_ON_TYPE = Union[
     DependsOnV12,
 ]
 
+MACRO_TYPE = Union[
+    ParsedMacroV5,
+    ParsedMacroV6,
+    ParsedMacroV7,
+    MacroV8,
+    MacroV9,
+    MacroV10,
+    MacroV11,
+    MacroV12,
+]
+
 MACRO_MAP = Union[
     Dict[str, ParsedMacroV5],
     Dict[str, ParsedMacroV6],
@@ -326,6 +354,99 @@ dbt_run_result_output_data_monitor_status_map: Dict[str, DataMonitorStatus] = {
 }
 """Maps a `RunResultOutput.status` to `DataMonitorStatus`."""
 
+PARSED_NODE_RESOURCE_TYPES = {"model", "snapshot", "test"}
+"""The types of nodes in the manifest that are actually parsed."""
+
+UNUSED_MANIFEST_SECTIONS = [
+    "child_map",
+    "disabled",
+    "docs",
+    "exposures",
+    "group_map",
+    "groups",
+    "parent_map",
+    "saved_queries",
+    "selectors",
+    "semantic_models",
+    "unit_tests",
+]
+"""The top-level sections of the manifest that are not parsed."""
+
+STREAMED_MANIFEST_SECTIONS = ["nodes", "sources", "macros", "metrics"]
+"""The sections of the manifest that are streamed one entry at a time."""
+
+
+@dataclass
+class ModelReference:
+    """The fields of a model needed to attach the results of its tests"""
+
+    unique_id: str
+    name: str
+    schema_: str
+    database: Optional[str]
+    alias: Optional[str]
+    has_config: bool
+
+    @staticmethod
+    def from_node(node: MODEL_NODE_TYPE) -> "ModelReference":
+        return ModelReference(
+            unique_id=node.unique_id,
+            name=node.name,
+            schema_=node.schema_,
+            database=node.database,
+            alias=node.alias,
+            has_config=node.config is not None,
+        )
+
+    @staticmethod
+    def from_json(node: Dict) -> "ModelReference":
+        return ModelReference(
+            unique_id=node["unique_id"],
+            name=node["name"],
+            schema_=node["schema"],
+            database=node.get("database"),
+            alias=node.get("alias"),
+            has_config=node.get("config") is not None,
+        )
+
+
+@dataclass
+class _ManifestIndex:
+    """What's collected from the first pass over a streamed manifest"""
+
+    source_map: Dict[str, EntityId] = dataclass_field(default_factory=dict)
+    macro_map: Dict[str, DbtMacro] = dataclass_field(default_factory=dict)
+    metrics: List[METRIC_TYPE] = dataclass_field(default_factory=list)
+    models: Dict[str, ModelReference] = dataclass_field(default_factory=dict)
+    snapshots: List[str] = dataclass_field(default_factory=list)
+
+
+def get_schema_version(metadata: Dict) -> str:
+    """Extract the schema version (e.g. "v12") from the artifact's metadata"""
+    return metadata.get("dbt_schema_version", "").rsplit("/", 1)[-1].split(".")[0]
+
+
+@lru_cache(maxsize=None)
+def _section_entry_adapter(
+    dbt_manifest_class: MANIFEST_CLASS_TYPE, section: str
+) -> TypeAdapter:
+    """Validator for a single entry in a section (e.g. "nodes") of the manifest"""
+    # Every streamed section is annotated as Dict[str, <entry type>]
+    _, entry_type = get_args(dbt_manifest_class.model_fields[section].annotation)
+    return TypeAdapter(entry_type)
+
+
+def _validate_manifest_entry(
+    dbt_manifest_class: MANIFEST_CLASS_TYPE, section: str, key: str, value: Dict
+) -> Any:
+    try:
+        return _section_entry_adapter(dbt_manifest_class, section).validate_python(
+            value
+        )
+    except Exception as e:
+        logger.error(f"Parse manifest json error in {key}: {e}")
+        raise e
+
 
 class ArtifactParser:
     def __init__(
@@ -354,7 +475,7 @@ class ArtifactParser:
 
     @staticmethod
     def sanitize_manifest(manifest_json: Dict, schema_version: str) -> Dict:
-        manifest_json = deepcopy(manifest_json)
+        # Sanitized in place, as the manifest can be huge
 
         # It's possible for dbt to generate "docs block" in the manifest that doesn't
         # conform to the JSON schema. Specifically, the "name" field can be None in
@@ -363,26 +484,54 @@ class ArtifactParser:
         if manifest_json.get("docs") is not None:
             manifest_json["docs"] = {}
 
-        # dbt can erroneously generate null for test's "depends_on"
-        # Filter these out for now
         nodes = manifest_json.get("nodes", {})
         for key, node in nodes.items():
-            if key.startswith("test."):
-                depends_on = node.get("depends_on", {})
-                depends_on["macros"] = filter_none(depends_on.get("macros", []))
-                depends_on["nodes"] = filter_none(depends_on.get("nodes", []))
+            ArtifactParser._sanitize_node(key, node)
 
-        # dbt can erroneously set null for metrics' "type_params.conversion_type_params"
-        # Filter these out for now
         metrics = manifest_json.get("metrics", {})
         for node in metrics.values():
-            node.get("type_params", {}).pop("conversion_type_params", None)
+            ArtifactParser._sanitize_metric(node)
+
+        return manifest_json
+
+    @staticmethod
+    def _sanitize_node(key: str, node: Dict) -> None:
+        # dbt can erroneously generate null for test's "depends_on"
+        # Filter these out for now
+        if key.startswith("test."):
+            depends_on = node.get("depends_on", {})
+            depends_on["macros"] = filter_none(depends_on.get("macros", []))
+            depends_on["nodes"] = filter_none(depends_on.get("nodes", []))
+
+    @staticmethod
+    def _sanitize_metric(node: Dict) -> None:
+        # dbt can erroneously set null for metrics' "type_params.conversion_type_params"
+        # Filter these out for now
+        node.get("type_params", {}).pop("conversion_type_params", None)
+
+    @staticmethod
+    def prune_manifest(manifest_json: Dict) -> Dict:
+        """
+        Drop the nodes & sections that are never parsed, in place, so they're
+        not validated into the (memory hungry) generated models.
+        """
+        for section in UNUSED_MANIFEST_SECTIONS:
+            if isinstance(manifest_json.get(section), dict):
+                manifest_json[section] = {}
+
+        nodes = manifest_json.get("nodes", {})
+        for key in [
+            key
+            for key, node in nodes.items()
+            if node.get("resource_type", "model") not in PARSED_NODE_RESOURCE_TYPES
+        ]:
+            del nodes[key]
 
         return manifest_json
 
     @staticmethod
     def sanitize_run_results(run_results: Dict, schema_version: str) -> Dict:
-        run_results = deepcopy(run_results)
+        # Sanitized in place, as the run results can be huge
 
         # Temporarily strip off all the extra "compiled", "compiled_code",
         # and "relation_name" fields in results until
@@ -403,11 +552,7 @@ class ArtifactParser:
         self.parse_manifest(manifest_json, run_results)
 
     def parse_run_results(self, run_results_json: Dict) -> RUN_RESULTS_TYPE:
-        metadata = run_results_json.get("metadata", {})
-
-        schema_version = (
-            metadata.get("dbt_schema_version", "").rsplit("/", 1)[-1].split(".")[0]
-        )
+        schema_version = get_schema_version(run_results_json.get("metadata", {}))
         logger.info(f"parsing run_results.json {schema_version} ...")
 
         run_results_json = ArtifactParser.sanitize_run_results(
@@ -425,16 +570,13 @@ class ArtifactParser:
     ):
         manifest_metadata = manifest_json.get("metadata", {})
 
-        schema_version = (
-            manifest_metadata.get("dbt_schema_version", "")
-            .rsplit("/", 1)[-1]
-            .split(".")[0]
-        )
+        schema_version = get_schema_version(manifest_metadata)
         project_name = manifest_metadata.get("project_name", "")
 
         logger.info(f"parsing manifest.json {schema_version} ...")
 
         manifest_json = ArtifactParser.sanitize_manifest(manifest_json, schema_version)
+        manifest_json = ArtifactParser.prune_manifest(manifest_json)
 
         dbt_manifest_class = dbt_version_manifest_class_map.get(schema_version)
         if dbt_manifest_class is None:
@@ -539,17 +681,126 @@ class ArtifactParser:
         for node in virtual_view_nodes:
             self._parse_virtual_view_node(node, source_map, macro_map)
 
+        model_references = {k: ModelReference.from_node(v) for (k, v) in models.items()}
         for _, test in tests.items():
-            self._parse_test(test, run_results, models)
+            self._parse_test(test, run_results, model_references)
 
         for _, metric in metrics.items():
             self._parse_metric(metric, source_map, macro_map)
 
+    def parse_manifest_file(
+        self, manifest_file: str, run_results: Optional[RUN_RESULTS_TYPE]
+    ):
+        """
+        Parse the manifest by streaming it from the file, validating & processing
+        one entry at a time. Takes a few passes over the file, as the nodes are
+        processed in dependency order:
+          1. sources, macros & metrics, and the models & snapshots to reference
+          2. models & snapshots
+          3. tests
+        """
+        manifest_metadata = read_manifest_metadata(manifest_file)
+        schema_version = get_schema_version(manifest_metadata)
+
+        logger.info(f"streaming manifest.json {schema_version} ...")
+
+        dbt_manifest_class = dbt_version_manifest_class_map.get(schema_version)
+        if dbt_manifest_class is None:
+            raise ValueError(f"unsupported manifest schema '{schema_version}'")
+
+        index = self._index_manifest_file(
+            manifest_file,
+            dbt_manifest_class,
+            manifest_metadata.get("project_name", ""),
+        )
+
+        # initialize all virtual views to be used in cross-references
+        for unique_id in index.models:
+            init_virtual_view(
+                self._virtual_views, unique_id, get_model_name_from_unique_id
+            )
+        for unique_id in index.snapshots:
+            init_virtual_view(
+                self._virtual_views, unique_id, get_snapshot_name_from_unique_id
+            )
+
+        # Models are parsed before snapshots, same as when parsed in memory
+        snapshots: List[VIRTUAL_VIEW_NODE_TYPE] = []
+        for key, value in self._iter_nodes(manifest_file, {"model", "snapshot"}):
+            node = _validate_manifest_entry(dbt_manifest_class, "nodes", key, value)
+            if value["resource_type"] == "snapshot":
+                snapshots.append(node)
+            else:
+                self._parse_virtual_view_node(node, index.source_map, index.macro_map)
+
+        for node in snapshots:
+            self._parse_virtual_view_node(node, index.source_map, index.macro_map)
+        snapshots.clear()
+
+        for key, value in self._iter_nodes(manifest_file, {"test"}):
+            ArtifactParser._sanitize_node(key, value)
+            test = _validate_manifest_entry(dbt_manifest_class, "nodes", key, value)
+            if isinstance(test, get_args(TEST_NODE_TYPE)):
+                self._parse_test(test, run_results, index.models)
+
+        for metric in index.metrics:
+            self._parse_metric(metric, index.source_map, index.macro_map)
+
+    def _index_manifest_file(
+        self,
+        manifest_file: str,
+        dbt_manifest_class: MANIFEST_CLASS_TYPE,
+        project_name: str,
+    ) -> "_ManifestIndex":
+        """
+        Parse the sources & macros, and collect the metrics and the models &
+        snapshots to be referenced by the nodes parsed later
+        """
+        index = _ManifestIndex()
+
+        for section, key, value in iter_manifest(
+            manifest_file, STREAMED_MANIFEST_SECTIONS
+        ):
+            assert key is not None
+            if section == "nodes":
+                resource_type = value.get("resource_type")
+                if resource_type == "model":
+                    index.models[key] = ModelReference.from_json(value)
+                elif resource_type == "snapshot":
+                    index.snapshots.append(value["unique_id"])
+                else:
+                    continue
+
+                if project_name and value.get("package_name") != project_name:
+                    self._referenced_virtual_views.add(value["unique_id"])
+                continue
+
+            if section == "metrics":
+                ArtifactParser._sanitize_metric(value)
+
+            entry = _validate_manifest_entry(dbt_manifest_class, section, key, value)
+            if section == "sources":
+                index.source_map[key] = self._parse_source_definition(entry)
+            elif section == "macros":
+                index.macro_map[key] = self._parse_macro(entry)
+            else:
+                index.metrics.append(entry)
+
+        return index
+
+    @staticmethod
+    def _iter_nodes(
+        manifest_file: str, resource_types: Set[str]
+    ) -> Iterator[Tuple[str, Dict]]:
+        for _, key, value in iter_manifest(manifest_file, ["nodes"]):
+            if key is not None and value.get("resource_type") in resource_types:
+                yield key, value
+
     def _parse_test(
         self,
         test: TEST_NODE_TYPE,
         run_results: Optional[RUN_RESULTS_TYPE],
-        models: Dict[str, MODEL_NODE_TYPE],
+        models: Dict[str, ModelReference],
     ) -> None:
         # check test is referring a model
         if test.depends_on is None or not test.depends_on.nodes:
@@ -596,10 +847,10 @@ class ArtifactParser:
     def _parse_test_run_result(
         self,
         test: TEST_NODE_TYPE,
-        model: MODEL_NODE_TYPE,
+        model: ModelReference,
         run_results: RUN_RESULTS_TYPE,
     ) -> None:
-        if model.config is None or model.database is None:
+        if not model.has_config or model.database is None:
             logger.warning(
                 f"Skipping model without config or database, {model.unique_id}"
             )
@@ -728,32 +979,31 @@ class ArtifactParser:
             )
 
     def _parse_macros(self, macros: MACRO_MAP) -> Dict[str, DbtMacro]:
-        macro_map: Dict[str, DbtMacro] = {}
-        for key, macro in macros.items():
-            arguments = (
-                [
-                    DbtMacroArgument(
-                        name=arg.name,
-                        type=arg.type,
-                        description=arg.description,
-                    )
-                    for arg in macro.arguments
-                ]
-                if macro.arguments
-                else []
-            )
-
-            macro_map[key] = DbtMacro(
-                name=macro.name,
-                unique_id=macro.unique_id,
-                package_name=macro.package_name,
-                description=macro.description,
-                arguments=arguments,
-                sql=macro.macro_sql,
-                depends_on_macros=macro.depends_on.macros if macro.depends_on else None,
-            )
+        return {key: self._parse_macro(macro) for key, macro in macros.items()}
+
+    def _parse_macro(self, macro: MACRO_TYPE) -> DbtMacro:
+        arguments = (
+            [
+                DbtMacroArgument(
+                    name=arg.name,
+                    type=arg.type,
+                    description=arg.description,
+                )
+                for arg in macro.arguments
+            ]
+            if macro.arguments
+            else []
+        )
 
-        return macro_map
+        return DbtMacro(
+            name=macro.name,
+            unique_id=macro.unique_id,
+            package_name=macro.package_name,
+            description=macro.description,
+            arguments=arguments,
+            sql=macro.macro_sql,
+            depends_on_macros=macro.depends_on.macros if macro.depends_on else None,
+        )
 
     def _parse_node_meta(
         self, node: VIRTUAL_VIEW_NODE_TYPE, virtual_view: VirtualView
@@ -888,16 +1138,21 @@ class ArtifactParser:
         )
 
     def _parse_sources(self, sources: SOURCE_DEFINITION_MAP) -> Dict[str, EntityId]:
-        source_map: Dict[str, EntityId] = {}
-        for key, source in sources.items():
-            assert source.database is not None
-            source_map[key] = self._get_dataset_entity_id(
-                source.database, source.schema_, source.identifier
-            )
+        return {
+            key: self._parse_source_definition(source)
+            for key, source in sources.items()
+        }
+
+    def _parse_source_definition(self, source: SOURCE_DEFINITION_TYPE) -> EntityId:
+        """Parse a source, and returns the entity ID of its dataset"""
+        assert source.database is not None
+        entity_id = self._get_dataset_entity_id(
+            source.database, source.schema_, source.identifier
+        )
 
-            self._parse_source(source)
+        self._parse_source(source)
 
-        return source_map
+        return entity_id
 
     def _parse_source(self, source: SOURCE_DEFINITION_TYPE) -> None:
         if not source.database or not source.columns:
@@ -39,3 +39,9 @@ class DbtCloudConfig(BaseConfig):
 
     # Discovery API endpoint
     discovery_api_url: str = "https://metadata.cloud.getdbt.com/graphql"
+
+    # Maximum number of concurrent Discovery API requests, across all environments and resource types
+    max_concurrency: int = 5
+
+    # Maximum number of Discovery API requests per minute, shared by all concurrent requests
+    max_requests_per_minute: int = 600
@@ -1,16 +1,18 @@
-from typing import Collection, Dict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Collection, Dict, List, Tuple
 
 import httpx
 
 from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.logger import get_logger
+from metaphor.common.rate_limiter import TokenBucket
 from metaphor.dbt.cloud.client import DbtAdminAPIClient, DbtProject
 from metaphor.dbt.cloud.config import DbtCloudConfig
 from metaphor.dbt.cloud.discovery_api import DiscoveryAPIClient
-from metaphor.dbt.cloud.http import LogTransport
+from metaphor.dbt.cloud.http import LogTransport, RateLimitTransport
 from metaphor.dbt.cloud.parser.common import extract_platform_and_account
-from metaphor.dbt.cloud.parser.env_parser import EnvironmentParser
+from metaphor.dbt.cloud.parser.env_parser import EnvironmentNodes, EnvironmentParser
 from metaphor.dbt.util import should_be_included
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import Dataset, Metric, VirtualView
@@ -38,6 +40,7 @@ class DbtCloudExtractor(BaseExtractor):
         self._environment_ids = config.environment_ids
         self._base_url = config.base_url
         self._discovery_api_url = config.discovery_api_url
+        self._max_concurrency = config.max_concurrency
 
         self._datasets: Dict[str, Dataset] = {}
         self._virtual_views: Dict[str, VirtualView] = {}
@@ -58,20 +61,48 @@ class DbtCloudExtractor(BaseExtractor):
             http_client=httpx.Client(
                 timeout=30,
                 headers=headers,
-                transport=LogTransport(httpx.HTTPTransport()),
+                transport=LogTransport(
+                    RateLimitTransport(
+                        # Keep a connection alive for each concurrent request
+                        httpx.HTTPTransport(
+                            limits=httpx.Limits(
+                                max_connections=config.max_concurrency,
+                                max_keepalive_connections=config.max_concurrency,
+                            )
+                        ),
+                        TokenBucket.per_minute(
+                            config.max_requests_per_minute,
+                            capacity=config.max_concurrency,
+                        ),
+                    )
+                ),
             ),
         )
 
     async def extract(self) -> Collection[ENTITY_TYPES]:
         logger.info("Fetching metadata from DBT cloud")
 
-        projects = self._client.list_projects()
-        for project in projects:
-            if not self._project_ids or project.id in self._project_ids:
+        # Fetch all environments concurrently, then parse them one at a time
+        # in the same order as they're listed
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            environments: List[
+                Tuple[DbtProject, EnvironmentParser, EnvironmentNodes]
+            ] = []
+            projects = self._client.list_projects()
+            for project in projects:
+                if not self._project_ids or project.id in self._project_ids:
+                    try:
+                        environments += self._fetch_project(project, executor)
+                    except Exception as e:
+                        logger.error(f"Error extracting project {project.id}: {e}")
+
+            for project, parser, nodes in environments:
                 try:
-                    await self._extract_project(project)
+                    parser.parse(nodes)
                 except Exception as e:
-                    logger.error(f"Error extracting project {project.id}: {e}")
+                    logger.error(
+                        f"Error extracting environment {nodes.environment_id} of project {project.id}: {e}"
+                    )
 
         datasets = [d for d in self._datasets.values() if should_be_included(d)]
         views = [v for v in self._virtual_views.values() if should_be_included(v)]
@@ -82,13 +113,18 @@ class DbtCloudExtractor(BaseExtractor):
         )
         return datasets + views + metrics
 
-    async def _extract_project(self, project: DbtProject):
+    def _fetch_project(
+        self, project: DbtProject, executor: Executor
+    ) -> List[Tuple[DbtProject, EnvironmentParser, EnvironmentNodes]]:
+        """
+        Start fetching the production environments of a project
+        """
         platform, account = extract_platform_and_account(project)
         project_explore_url = f"{self._base_url}/explore/{self._account_id}/projects/{project.id}/environments/production/details"
 
         logger.info(f"Extracting project: {project.id}")
-        environments = self._client.list_environments(project.id)
-        for environment in environments:
+        environments = []
+        for environment in self._client.list_environments(project.id):
             if (
                 environment.type == "deployment"
                 and environment.deployment_type == "production"
@@ -107,6 +143,10 @@ class DbtCloudExtractor(BaseExtractor):
                     self._virtual_views,
                     self._metrics,
                 )
-                parser.parse(environment.id)
+                environments.append(
+                    (project, parser, parser.fetch(environment.id, executor))
+                )
             else:
                 logger.info(f"Skipping environment {environment.id}")
+
+        return environments
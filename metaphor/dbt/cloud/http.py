@@ -5,6 +5,7 @@ from collections.abc import Iterable
 import httpx
 
 from metaphor.common.logger import get_logger, json_dump_to_debug_file
+from metaphor.common.rate_limiter import TokenBucket
 
 logger = get_logger()
 
@@ -55,3 +56,18 @@ class LogTransport(httpx.BaseTransport):
             stream=response.stream,
             extensions=response.extensions,
         )
+
+
+class RateLimitTransport(httpx.BaseTransport):
+    """
+    Blocks each request until the shared rate limiter allows it, so concurrent
+    requests made through the same client stay within the rate limit.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, rate_limiter: TokenBucket):
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.rate_limiter.acquire()
+        return self.transport.handle_request(request)
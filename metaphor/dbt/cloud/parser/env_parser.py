@@ -1,11 +1,28 @@
 import time
-from typing import Dict, Optional
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 
 from metaphor.common.logger import get_logger
 from metaphor.common.snowflake import normalize_snowflake_account
 from metaphor.dbt.cloud.config import DbtCloudConfig
 from metaphor.dbt.cloud.discovery_api import DiscoveryAPIClient
-from metaphor.dbt.cloud.parser.lineage_parser import LineageParser
+from metaphor.dbt.cloud.discovery_api.generated.get_macros import (
+    GetMacrosEnvironmentDefinitionMacrosEdgesNode as MacroNode,
+)
+from metaphor.dbt.cloud.discovery_api.generated.get_metrics import (
+    GetMetricsEnvironmentDefinitionMetricsEdgesNode as MetricNode,
+)
+from metaphor.dbt.cloud.discovery_api.generated.get_models import (
+    GetModelsEnvironmentAppliedModelsEdgesNode as ModelNode,
+)
+from metaphor.dbt.cloud.discovery_api.generated.get_snapshots import (
+    GetSnapshotsEnvironmentAppliedSnapshotsEdgesNode as SnapshotNode,
+)
+from metaphor.dbt.cloud.discovery_api.generated.get_sources import (
+    GetSourcesEnvironmentAppliedSourcesEdgesNode as SourceNode,
+)
+from metaphor.dbt.cloud.parser.lineage_parser import LineageParser, NodeType
 from metaphor.dbt.cloud.parser.macro_parser import MacroParser
 from metaphor.dbt.cloud.parser.metric_parser import MetricParser
 from metaphor.dbt.cloud.parser.model_parser import ModelParser
@@ -20,6 +37,22 @@ from metaphor.models.metadata_change_event import (
 logger = get_logger()
 
 
+@dataclass
+class EnvironmentNodes:
+    """
+    Pending results of fetching an environment from the Discovery API
+    """
+
+    environment_id: int
+    started_at: float
+    sources: Future[List[SourceNode]]
+    metrics: Future[List[MetricNode]]
+    macros: Future[List[MacroNode]]
+    models: Future[List[ModelNode]]
+    snapshots: Future[List[SnapshotNode]]
+    lineage: Future[List[NodeType]]
+
+
 class EnvironmentParser:
     def __init__(
         self,
@@ -46,26 +79,14 @@ class EnvironmentParser:
         self._virtual_views: Dict[str, VirtualView] = virtual_views
         self._metrics: Dict[str, Metric] = metrics
 
-    def parse(self, environment_id: int):
-        """
-        Fetch and parse a single environment, including nodes and lineage.
-        """
-        start = time.time()
-
-        source_parser = SourceParser(
+        self._source_parser = SourceParser(
             self._discovery_api, self._datasets, self._platform, self._account
         )
-        source_parser.parse(environment_id)
-
-        metric_parser = MetricParser(
+        self._metric_parser = MetricParser(
             self._discovery_api, self._metrics, self._project_explore_base_url
         )
-        metric_parser.parse(environment_id)
-
-        macro_parser = MacroParser(self._discovery_api)
-        macro_map = macro_parser.parse(environment_id)
-
-        model_parser = ModelParser(
+        self._macro_parser = MacroParser(self._discovery_api)
+        self._model_parser = ModelParser(
             self._discovery_api,
             self._config,
             self._platform,
@@ -74,13 +95,54 @@ class EnvironmentParser:
             self._datasets,
             self._virtual_views,
         )
-        model_parser.parse(environment_id)
-
-        lineage_parser = LineageParser(
+        self._lineage_parser = LineageParser(
             self._discovery_api, self._datasets, self._virtual_views, self._metrics
         )
-        lineage_parser.parse(environment_id, macro_map)
+
+    def fetch(self, environment_id: int, executor: Executor) -> EnvironmentNodes:
+        """
+        Start fetching all resource types of a single environment concurrently.
+        Each resource type is still paginated sequentially.
+        """
+        return EnvironmentNodes(
+            environment_id=environment_id,
+            started_at=time.time(),
+            sources=executor.submit(
+                self._source_parser.get_sources_in_environment, environment_id
+            ),
+            metrics=executor.submit(
+                self._metric_parser.get_metrics_in_environment, environment_id
+            ),
+            macros=executor.submit(
+                self._macro_parser.get_macros_in_environment, environment_id
+            ),
+            models=executor.submit(
+                self._model_parser.get_models_in_environment, environment_id
+            ),
+            snapshots=executor.submit(
+                self._model_parser.get_snapshots_in_environment, environment_id
+            ),
+            lineage=executor.submit(
+                self._lineage_parser.get_lineage_in_environment, environment_id
+            ),
+        )
+
+    def parse(self, nodes: EnvironmentNodes) -> None:
+        """
+        Parse the fetched nodes and lineage of a single environment. Resource types
+        are parsed in a fixed order as they may update the same entities.
+        """
+        self._source_parser.parse(nodes.sources.result())
+        self._metric_parser.parse(nodes.metrics.result())
+        macro_map = self._macro_parser.parse(nodes.macros.result())
+        self._model_parser.parse(nodes.models.result(), nodes.snapshots.result())
+
+        lineage_nodes = nodes.lineage.result()
+        logger.info(
+            f"Found {len(lineage_nodes)} lineage nodes in environment {nodes.environment_id}"
+        )
+        self._lineage_parser.parse(lineage_nodes, macro_map)
 
         logger.info(
-            f"Fetched environment {environment_id}. Elapsed time: {time.time() - start} secs."
+            f"Fetched environment {nodes.environment_id}. Elapsed time: {time.time() - nodes.started_at} secs."
         )
@@ -147,7 +147,7 @@ class LineageParser:
             self._parse_model_lineage(lineage, macros)
             return
 
-    def _get_lineage_in_environment(self, environment_id: int) -> List[NodeType]:
+    def get_lineage_in_environment(self, environment_id: int) -> List[NodeType]:
         """
         Fetch lineage in a given environment
         """
@@ -169,16 +169,11 @@ class LineageParser:
 
     def parse(
         self,
-        environment_id: int,
+        lineage_nodes: List[NodeType],
         macros: Dict[str, DbtMacro],
     ) -> None:
         """
-        Fetch and parse lineage in a given environment
+        Parse lineage fetched from an environment
         """
-        lineage_nodes = self._get_lineage_in_environment(environment_id)
-        logger.info(
-            f"Found {len(lineage_nodes)} lineage nodes in environment {environment_id}"
-        )
-
         for lineage_node in lineage_nodes:
             self._parse_lineage(lineage_node, macros)
@@ -34,7 +34,7 @@ class MacroParser:
 
         return macro_map
 
-    def _get_macros_in_environment(self, environment_id: int) -> List[Node]:
+    def get_macros_in_environment(self, environment_id: int) -> List[Node]:
         macro_nodes: List[Node] = []
         after = None
 
@@ -52,9 +52,8 @@ class MacroParser:
 
         return macro_nodes
 
-    def parse(self, environment_id: int) -> Dict[str, DbtMacro]:
+    def parse(self, macros: List[Node]) -> Dict[str, DbtMacro]:
         """
-        Fetch and parse macros in a given environment, results are returned as a dict.
+        Parse macros fetched from an environment, results are returned as a dict.
         """
-        macros = self._get_macros_in_environment(environment_id)
         return self._parse_macros(macros)
@@ -39,7 +39,7 @@ class MetricParser:
         )
         update_entity_system_tags(metric, dbt_metric.tags or [])
 
-    def _get_metrics_in_environment(self, environment_id: int) -> List[Node]:
+    def get_metrics_in_environment(self, environment_id: int) -> List[Node]:
         metric_nodes: List[Node] = []
         after = None
 
@@ -59,10 +59,9 @@ class MetricParser:
 
         return metric_nodes
 
-    def parse(self, environment_id: int) -> None:
+    def parse(self, metrics: List[Node]) -> None:
         """
-        Fetch and parse metrics in a given environment, results are stored in metrics dict.
+        Parse metrics fetched from an environment, results are stored in metrics dict.
         """
-        metrics = self._get_metrics_in_environment(environment_id)
         for metric in metrics:
             self._parse_metric(metric)
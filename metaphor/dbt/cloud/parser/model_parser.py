@@ -320,7 +320,7 @@ class ModelParser:
             self._parse_test(dbt_model, test)
             self._parse_test_execution_result(node, test)
 
-    def _get_models_in_environment(
+    def get_models_in_environment(
         self, environment_id: int
     ) -> List[GetModelsEnvironmentAppliedModelsEdgesNode]:
         """
@@ -343,7 +343,7 @@ class ModelParser:
 
         return model_nodes
 
-    def _get_snapshots_in_environment(
+    def get_snapshots_in_environment(
         self, environment_id: int
     ) -> List[GetSnapshotsEnvironmentAppliedSnapshotsEdgesNode]:
         """
@@ -366,14 +366,16 @@ class ModelParser:
 
         return snapshot_nodes
 
-    def parse(self, environment_id: int) -> None:
+    def parse(
+        self,
+        models: List[GetModelsEnvironmentAppliedModelsEdgesNode],
+        snapshots: List[GetSnapshotsEnvironmentAppliedSnapshotsEdgesNode],
+    ) -> None:
         """
-        Fetch and parse models and snapshots in a given environment
+        Parse models and snapshots fetched from an environment
         """
-        models = self._get_models_in_environment(environment_id)
         for model in models:
             self._parse_model(model)
 
-        snapshots = self._get_snapshots_in_environment(environment_id)
         for snapshot in snapshots:
             self._parse_model(snapshot)
@@ -90,7 +90,7 @@ class SourceParser:
             # remove documentation if it's empty
             dataset.documentation = None
 
-    def _get_sources_in_environment(self, environment_id: int) -> List[Node]:
+    def get_sources_in_environment(self, environment_id: int) -> List[Node]:
         """
         return a list of source nodes
         """
@@ -111,12 +111,10 @@ class SourceParser:
 
         return source_nodes
 
-    def parse(self, environment_id: int) -> None:
+    def parse(self, sources: List[Node]) -> None:
         """
-        Fetch and parse sources in a given environment
-        parsed datasets are stored in datasets dict, also return the data platform
+        Parse sources fetched from an environment
+        parsed datasets are stored in datasets dict
         """
-        sources = self._get_sources_in_environment(environment_id)
-
         for source in sources:
             self._parse_source(source)
@@ -60,3 +60,7 @@ class DbtRunConfig(BaseConfig):
 
     # Maps meta field to additional dbt tags
     meta_key_tags: Optional[str] = None
+
+    # Stream the manifest from the file instead of loading it into memory,
+    # for very large projects
+    stream_manifest: bool = False
@@ -1,4 +1,3 @@
-import json
 from typing import Collection, Dict, List, Set
 
 from metaphor.common.base_extractor import BaseExtractor
@@ -6,7 +5,8 @@ from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.logger import add_debug_file, get_logger
 from metaphor.dbt.artifact_parser import ArtifactParser
 from metaphor.dbt.config import DbtRunConfig
-from metaphor.dbt.util import get_data_platform_from_manifest
+from metaphor.dbt.manifest_reader import read_manifest_metadata
+from metaphor.dbt.util import get_data_platform_from_manifest_json, load_json_file
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import (
     DataPlatform,
@@ -50,15 +50,15 @@ class DbtExtractor(BaseExtractor):
     async def extract(self) -> Collection[ENTITY_TYPES]:
         logger.info("Fetching metadata from DBT repo")
 
-        self._data_platform = get_data_platform_from_manifest(self._manifest)
-
-        with open(self._manifest) as f:
-            manifest_json = json.load(f)
+        if self._config.stream_manifest:
+            manifest_json = {"metadata": read_manifest_metadata(self._manifest)}
+        else:
+            manifest_json = load_json_file(self._manifest)
+        self._data_platform = get_data_platform_from_manifest_json(manifest_json)
 
         run_results_json = None
         if self._run_results is not None:
-            with open(self._run_results) as file:
-                run_results_json = json.load(file)
+            run_results_json = load_json_file(self._run_results)
 
         artifact_parser = ArtifactParser(
             self._config,
@@ -68,7 +68,16 @@ class DbtExtractor(BaseExtractor):
             self._metrics,
             self._referenced_virtual_views,
         )
-        artifact_parser.parse(manifest_json, run_results_json)
+
+        if self._config.stream_manifest:
+            run_results = (
+                None
+                if run_results_json is None
+                else artifact_parser.parse_run_results(run_results_json)
+            )
+            artifact_parser.parse_manifest_file(self._manifest, run_results)
+        else:
+            artifact_parser.parse(manifest_json, run_results_json)
 
         entities: List[ENTITY_TYPES] = []
         entities.extend(self._datasets.values())
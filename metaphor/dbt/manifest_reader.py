@@ -0,0 +1,152 @@
+import json
+from typing import Any, Collection, Dict, Iterator, Optional, TextIO, Tuple
+
+# Number of characters to read from the file at a time
+READ_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+# Characters that can follow a number in valid JSON
+_NUMBER_DELIMITERS = _WHITESPACE + ",}]"
+
+_decoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """
+    Reads JSON values from a file one at a time, keeping only the value being
+    decoded (and a bit more) in memory.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read more from the file, returns False if it's exhausted"""
+        if self._eof:
+            return False
+
+        # Read at least as much as what's pending, so decoding a huge value
+        # takes a logarithmic number of attempts
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character, or "" at the end"""
+        while True:
+            while (
+                self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expecting '{char}' in JSON, found '{found}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value is likely cut off at the end of the buffer
+                if not self._fill():
+                    raise
+                continue
+
+            # A number may continue into the next chunk, e.g. "1." is decoded
+            # as 1 if the fraction is cut off
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and (
+                    end == len(self._buffer)
+                    or self._buffer[end] not in _NUMBER_DELIMITERS
+                )
+                and self._fill()
+            ):
+                continue
+
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """Skip the next value, one entry at a time if it's an object"""
+        if self.peek() == "{":
+            for _ in self.entries():
+                self.skip()
+        else:
+            self.value()
+
+    def entries(self) -> Iterator[str]:
+        """
+        Iterate the keys of an object. The value of each entry must be consumed
+        (with `value`, `skip` or `entries`) before moving on to the next one.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+
+            self.expect("}")
+            return
+
+
+def iter_manifest(
+    manifest_file: str,
+    sections: Collection[str],
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """
+    Stream the selected top-level sections of a manifest.json. The entries of
+    a section that's an object (e.g. "nodes") are yielded one at a time as
+    (section, key, value), other sections as (section, None, value). The rest
+    are skipped one entry at a time, so the memory usage is bound by the
+    largest entry rather than the whole manifest.
+    """
+    with open(manifest_file) as f:
+        stream = _JsonStream(f, chunk_size)
+        for section in stream.entries():
+            if section not in sections:
+                stream.skip()
+            elif stream.peek() == "{":
+                for key in stream.entries():
+                    yield section, key, stream.value()
+            else:
+                yield section, None, stream.value()
+
+
+def read_manifest_metadata(manifest_file: str) -> Dict:
+    """Read the metadata of a manifest.json, stopping as soon as it's found"""
+    with open(manifest_file) as f:
+        stream = _JsonStream(f, READ_CHUNK_SIZE)
+        for section in stream.entries():
+            if section == "metadata":
+                return stream.value()
+            stream.skip()
+    return {}
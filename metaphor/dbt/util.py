@@ -4,6 +4,11 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
 from metaphor.common.entity_id import (
     EntityId,
     dataset_normalized_name,
@@ -327,11 +332,23 @@ def add_data_quality_monitor(
     )
 
 
+def load_json_file(path: str) -> Any:
+    """Load a (potentially huge) JSON artifact, using orjson if it's installed"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path) as f:
+        return json.load(f)
+
+
 def get_data_platform_from_manifest(
     manifest_file: str,
 ):
-    with open(manifest_file) as f:
-        manifest_json = json.load(f)
+    return get_data_platform_from_manifest_json(load_json_file(manifest_file))
+
+
+def get_data_platform_from_manifest_json(manifest_json: Dict) -> DataPlatform:
     manifest_metadata = manifest_json.get("metadata", {})
     platform = manifest_metadata.get("adapter_type", "").upper()
     if platform == "DATABRICKS":
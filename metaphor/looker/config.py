@@ -44,6 +44,10 @@ class LookerRunConfig(BaseConfig):
     # Ignored LookerML model files
     ignored_model_files: Optional[List[str]] = None
 
+    # Number of worker processes used to parse the LookML files. If this is set to 0,
+    # the files are parsed in the main process.
+    lookml_parse_workers: int = 0
+
     # Source code URL for the project directory
     project_source_url: Optional[str] = None
 
@@ -79,6 +79,7 @@ class LookerExtractor(BaseExtractor):
         self._project_source_url = config.project_source_url
         self._include_personal_folders = config.include_personal_folders
         self._explore_view_folder_name = config.explore_view_folder_name
+        self._lookml_parse_workers = config.lookml_parse_workers
         self._folders: Dict[str, Hierarchy] = {}
 
         # Load config using environment variables instead from looker.ini file
@@ -111,6 +112,7 @@ class LookerExtractor(BaseExtractor):
             self._explore_view_folder_name,
             self._project_source_url,
             self._ignored_model_files,
+            self._lookml_parse_workers,
         )
 
         folder_map = self._fetch_folders()
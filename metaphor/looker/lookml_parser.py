@@ -1,11 +1,11 @@
 import functools
-import glob
 import logging
 import operator
 import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from fnmatch import fnmatch
-from typing import Dict, List, Optional, Set, Tuple
+from fnmatch import fnmatch, fnmatchcase
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 try:
     import lkml
@@ -87,21 +87,127 @@ class Model:
 ModelMap = Dict[str, Model]
 
 
-_parsed_files: Dict[str, Dict] = {}
+def _load_lookml_file(path: str) -> Tuple[int, Dict]:
+    """Parse a LookML file, returns its modification time along with the result"""
+    mtime = os.stat(path).st_mtime_ns
+    with open(path) as f:
+        return mtime, lkml.load(f)
 
 
-def _parse_lookml_file(path, base_dir) -> Dict:
+def _match_path(pattern: Sequence[str], path: Sequence[str]) -> bool:
+    """Match the components of a path against a recursive glob pattern"""
+    if not pattern:
+        return not path
 
-    if path in _parsed_files:
-        return _parsed_files[path]
+    if pattern[0] == "**":
+        # "**" matches zero or more directories
+        return any(_match_path(pattern[1:], path[i:]) for i in range(len(path) + 1))
 
-    with open(path) as f:
-        model = lkml.load(f)
-        _parsed_files[path] = model
+    return (
+        len(path) > 0
+        and fnmatchcase(path[0], pattern[0])
+        and _match_path(pattern[1:], path[1:])
+    )
+
+
+class LookMLFiles:
+    """
+    Per-run cache of the LookML files in a project directory. The directory is
+    listed once to resolve all the include patterns, and each file is parsed
+    once, unless it's modified during the run.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self._base_dir = base_dir
+        self._index: Optional[List[Tuple[str, ...]]] = None
+        self._globs: Dict[str, List[str]] = {}
+        self._parsed: Dict[str, Tuple[int, Dict]] = {}
+
+    def _list_files(self) -> List[Tuple[str, ...]]:
+        if self._index is not None:
+            return self._index
+
+        self._index = []
+        for dir_path, dir_names, file_names in os.walk(
+            self._base_dir, followlinks=True
+        ):
+            # Like glob, skip hidden directories & files, e.g. .git
+            dir_names[:] = sorted(d for d in dir_names if not d.startswith("."))
+
+            rel_dir = os.path.relpath(dir_path, self._base_dir)
+            prefix = () if rel_dir == "." else tuple(rel_dir.split(os.sep))
+            self._index.extend(
+                prefix + (file_name,)
+                for file_name in sorted(file_names)
+                if file_name.endswith(".lkml") and not file_name.startswith(".")
+            )
+
+        return self._index
+
+    def glob(self, include_path: str) -> List[str]:
+        """Returns the files matched by an absolute include path"""
+        if not include_path.endswith(".lkml"):
+            include_path = include_path + ".lkml"
+
+        pattern = os.path.normpath(include_path.lstrip("/"))
+        if pattern not in self._globs:
+            components = pattern.split("/")
+            self._globs[pattern] = [
+                os.path.join(self._base_dir, *path)
+                for path in self._list_files()
+                if _match_path(components, path)
+            ]
 
-        sanitized = os.path.relpath(path, base_dir).replace("/", "__")
-        json_dump_to_debug_file(model, f"{sanitized}.json")
-        return model
+        return self._globs[pattern]
+
+    def _add(self, path: str, mtime: int, root: Dict) -> None:
+        self._parsed[path] = (mtime, root)
+
+        sanitized = os.path.relpath(path, self._base_dir).replace("/", "__")
+        json_dump_to_debug_file(root, f"{sanitized}.json")
+
+    def parse(self, path: str) -> Dict:
+        normpath = os.path.normpath(path)
+        cached = self._parsed.get(normpath)
+        if cached is None or cached[0] != os.stat(normpath).st_mtime_ns:
+            self._add(normpath, *_load_lookml_file(normpath))
+
+        return self._parsed[normpath][1]
+
+    def _get_included_files(self, path: str) -> List[str]:
+        return [
+            included_file
+            for include_path in self._parsed[path][1].get("includes", [])
+            for included_file in self.glob(
+                _to_absolute_include(include_path, path, self._base_dir)
+            )
+        ]
+
+    def prefetch(self, paths: List[str], max_workers: int) -> None:
+        """
+        Parse the files, and all the files they include, in a pool of worker
+        processes as parsing is CPU bound. Includes are resolved one level at a
+        time, so only the files that are referenced get parsed.
+        """
+        pending = unique_list([os.path.normpath(path) for path in paths])
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while pending:
+                for path, (mtime, root) in zip(
+                    pending, executor.map(_load_lookml_file, pending)
+                ):
+                    self._add(path, mtime, root)
+
+                pending = unique_list(
+                    [
+                        normpath
+                        for path in pending
+                        for normpath in map(
+                            os.path.normpath, self._get_included_files(path)
+                        )
+                        if normpath not in self._parsed
+                    ]
+                )
 
 
 def _to_dataset_id(source_name: str, connection: LookerConnectionConfig) -> EntityId:
@@ -468,9 +574,11 @@ def _extend_explore(raw_explore: Dict, raw_explores: Dict[str, Dict]) -> Dict:
 
 
 def _resolve_model(raw_model: RawModel) -> RawModel:
+    # Copy the views as the upstream is memoized in them, while the parsed
+    # files (and hence the views) are shared by all models
     resolved_views = {}
     for name, view in raw_model.raw_views.items():
-        resolved_views[name] = _extend_view(view, raw_model.raw_views)
+        resolved_views[name] = dict(_extend_view(view, raw_model.raw_views))
 
     resolved_explores = {}
     for name, explore in raw_model.raw_explores.items():
@@ -504,6 +612,7 @@ def _to_absolute_include(include_path: str, file_path: str, base_dir: str) -> st
 
 def _load_included_file(
     include_path: str,
+    files: LookMLFiles,
     base_dir: str,
     projectSourceUrl: Optional[str],
     raw_views: Dict[str, Dict],
@@ -517,11 +626,7 @@ def _load_included_file(
     corresponding URL in entity_urls. This function will also recursively load any additional
     files includes by each file.
     """
-    glob_pattern = f"{base_dir}/{include_path}"
-    if not glob_pattern.endswith(".lkml"):
-        glob_pattern = glob_pattern + ".lkml"
-
-    for file_path in glob.glob(glob_pattern, recursive=True):
+    for file_path in files.glob(include_path):
         # Skip processed files to avoid circular includes
         normpath = os.path.normpath(file_path)
         if normpath in processed_files:
@@ -531,7 +636,7 @@ def _load_included_file(
         url = _get_entity_url(file_path, base_dir, projectSourceUrl)
         logger.info(f"Processing view file {normpath}")
 
-        root = _parse_lookml_file(file_path, base_dir)
+        root = files.parse(file_path)
         for view in root.get("views", []):
             raw_views[view["name"]] = view
             entity_urls[view["name"]] = url
@@ -548,6 +653,7 @@ def _load_included_file(
 
             _load_included_file(
                 include_path,
+                files,
                 base_dir,
                 projectSourceUrl,
                 raw_views,
@@ -559,6 +665,7 @@ def _load_included_file(
 
 def _load_model(
     model_path: str,
+    files: LookMLFiles,
     base_dir: str,
     connections: Dict[str, LookerConnectionConfig],
     projectSourceUrl: Optional[str],
@@ -566,7 +673,7 @@ def _load_model(
     """
     Loads model file and extract raw Views and Explores
     """
-    model = _parse_lookml_file(model_path, base_dir)
+    model = files.parse(model_path)
     logger.info(f"Processing model {model_path}")
 
     raw_views: Dict[str, Dict] = {}
@@ -581,6 +688,7 @@ def _load_model(
 
         _load_included_file(
             include_path,
+            files,
             base_dir,
             projectSourceUrl,
             raw_views,
@@ -629,24 +737,34 @@ def parse_project(
     explore_view_folder_name,
     projectSourceUrl: Optional[str] = None,
     ignored_model_files: List[str] = [],
+    max_workers: int = 0,
 ) -> Tuple[ModelMap, List[VirtualView]]:
     """
     parse the project under base_dir, returning a Model map and a list of virtual views including
     Looker Explores and Views
     https://docs.looker.com/data-modeling/getting-started/how-project-works
+
+    If max_workers is positive, the LookML files are parsed in a pool of worker processes
     """
     model_map = {}
     virtual_views = []
 
-    for model_path in glob.glob(f"{base_dir}/**/*.model.lkml", recursive=True):
+    files = LookMLFiles(base_dir)
+    model_paths = []
+    for model_path in files.glob("/**/*.model.lkml"):
         if _is_ignored_model_file(model_path, base_dir, ignored_model_files):
             logger.info(f"Ignoring model file {model_path} by config")
-            continue
+        else:
+            model_paths.append(model_path)
+
+    if max_workers > 0 and model_paths:
+        files.prefetch(model_paths, max_workers)
 
+    for model_path in model_paths:
         model_name = os.path.basename(model_path)[0 : -len(".model.lkml")]
 
         raw_model, entity_urls, connection = _load_model(
-            model_path, base_dir, connections, projectSourceUrl
+            model_path, files, base_dir, connections, projectSourceUrl
         )
 
         resolved_model = _resolve_model(raw_model)
@@ -4,10 +4,8 @@ from typing import Collection, Iterator, List, Optional
 from metaphor.common.aws import iterate_logs_from_cloud_watch
 from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.logger import get_logger
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
-from metaphor.common.sql.table_level_lineage.table_level_lineage import (
-    extract_table_level_lineage,
-)
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.query_log import PartialQueryLog, init_query_log
 from metaphor.common.sql.utils import is_valid_queried_datasets
 from metaphor.common.utils import to_utc_datetime_from_timestamp
 from metaphor.database.extractor import GenericDatabaseExtractor
@@ -84,12 +82,14 @@ class MySQLExtractor(GenericDatabaseExtractor):
         if statement_type != "QUERY":
             logger.debug(f"Skip processing statement type: {statement_type}")
 
-        tll = extract_table_level_lineage(
-            sql=query,
-            platform=DataPlatform.MYSQL,
+        analysis = analyze_query(
+            query,
+            DataPlatform.MYSQL,
+            self._query_log_config.process_query,
             account=self._alternative_host or self._config.host,
             default_schema=database if database else None,
         )
+        tll = analysis.lineage
 
         # Skip if parsed sources or targets has invalid data.
         if not is_valid_queried_datasets(
@@ -97,10 +97,10 @@ class MySQLExtractor(GenericDatabaseExtractor):
         ) or not is_valid_queried_datasets(tll.targets, ignore_database=True):
             return None
 
-        return process_and_init_query_log(
+        return init_query_log(
             query=query,
+            processed_sql=analysis.sql,
             platform=DataPlatform.MYSQL,
-            process_query_config=self._query_log_config.process_query,
             query_log=PartialQueryLog(
                 default_schema=database if database else None,
                 user_id=user,
@@ -41,6 +41,13 @@ class BasePostgreSQLRunConfig(BaseConfig):
 
     port: int = 5432
 
+    # Max number of databases to crawl concurrently
+    max_concurrent_databases: int = 4
+
+    # Max number of connections to each database, the catalog queries of a
+    # database are run concurrently on these connections
+    max_connections_per_database: int = 4
+
 
 @dataclass(config=ConnectorConfig)
 class PostgreSQLQueryLogConfig(QueryLogConfig):
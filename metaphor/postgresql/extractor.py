@@ -1,7 +1,19 @@
+import asyncio
 import re
-from typing import Collection, Dict, Iterator, List, Optional, Tuple
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
+from metaphor.common.sql.query_log import PartialQueryLog, init_query_log
 
 try:
     import asyncpg
@@ -16,9 +28,7 @@ from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.fieldpath import build_schema_field
 from metaphor.common.logger import get_logger
 from metaphor.common.models import to_dataset_statistics
-from metaphor.common.sql.table_level_lineage.table_level_lineage import (
-    extract_table_level_lineage,
-)
+from metaphor.common.sql.analysis import analyze_query
 from metaphor.common.utils import safe_float
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import (
@@ -54,6 +64,43 @@ _ignored_schemas = [
 
 LOG_PREFIX_REGEX = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
 
+# See https://www.postgresql.org/docs/current/view-pg-views.html
+VIEW_DEFINITIONS_QUERY = """
+SELECT *
+FROM pg_catalog.pg_views
+WHERE schemaname != 'information_schema' and schemaname !~ '^pg_';
+"""
+
+CONSTRAINTS_QUERY = """
+SELECT nr.nspname AS table_schema, r.relname AS table_name,
+       c.conname AS constraint_name,
+       CASE c.contype WHEN 'f' THEN 'FOREIGN KEY'
+                        WHEN 'p' THEN 'PRIMARY KEY'
+                        WHEN 'u' THEN 'UNIQUE' END
+       AS constraint_type,
+       string_agg(a.attname, ',') AS key_columns,
+       string_agg(af.attname, ',') AS constraint_columns,
+       current_database() AS constraint_db,
+       nf.nspname AS constraint_schema, rf.relname AS constraint_table
+FROM (
+    SELECT cc.conname, unnest(cc.conkey) AS conkey_id, unnest(cc.confkey) AS confkey_id,
+           cc.connamespace, cc.conrelid, cc.confrelid, cc.contype
+    FROM pg_constraint cc
+) AS c
+JOIN pg_namespace nc ON c.connamespace = nc.oid
+JOIN pg_class r ON r.oid = c.conrelid
+JOIN pg_namespace nr ON nr.oid = r.relnamespace
+LEFT OUTER JOIN pg_attribute a ON a.attrelid = c.conrelid AND c.conkey_id = a.attnum
+LEFT OUTER JOIN pg_attribute af ON af.attrelid = c.confrelid AND c.confkey_id = af.attnum
+LEFT JOIN pg_class rf ON rf.oid = af.attrelid
+LEFT JOIN pg_namespace nf ON nf.oid = rf.relnamespace
+WHERE c.contype IN ('f', 'p', 'u')
+      AND r.relkind IN ('r', 'p')
+      AND (NOT pg_is_other_temp_schema(nr.oid))
+GROUP BY table_schema, table_name, constraint_name, constraint_type,
+         constraint_db, constraint_schema, constraint_table;
+"""
+
 
 class BasePostgreSQLExtractor(BaseExtractor):
     _description = "PostgreSQL metadata crawler"
@@ -68,6 +115,8 @@ class BasePostgreSQLExtractor(BaseExtractor):
         self._password = config.password
         self._filter = config.filter.normalize()
         self._port = config.port
+        self._max_concurrent_databases = config.max_concurrent_databases
+        self._max_connections_per_database = config.max_connections_per_database
 
         self._query_log_config = config.query_log
 
@@ -83,6 +132,99 @@ class BasePostgreSQLExtractor(BaseExtractor):
             database=database,
         )
 
+    async def _create_pool(self, database: str) -> asyncpg.Pool:
+        logger.info(f"Connecting to DB {database}")
+        return await asyncpg.create_pool(
+            min_size=1,
+            max_size=self._max_connections_per_database,
+            host=self._host,
+            port=self._port,
+            user=self._user,
+            password=self._password,
+            database=database,
+        )
+
+    async def _crawl_databases(
+        self,
+        databases: List[str],
+        crawl: Callable[[asyncpg.Pool, str], Awaitable[None]],
+    ) -> None:
+        """
+        Crawl the databases concurrently, up to `max_concurrent_databases` at a
+        time, each with its own connection pool. The datasets are then ordered
+        by database, the same as crawling the databases one by one.
+        """
+        async for _ in self._crawl_databases_in_order(databases, crawl):
+            pass
+
+        order = {database: index for index, database in enumerate(databases)}
+        self._datasets = dict(
+            sorted(
+                self._datasets.items(),
+                key=lambda item: order.get(item[1].structure.database, len(order)),
+            )
+        )
+
+    async def _crawl_databases_in_order(
+        self,
+        databases: List[str],
+        crawl: Callable[[asyncpg.Pool, str], Awaitable[None]],
+    ) -> AsyncIterator[str]:
+        """
+        Crawl the databases concurrently like `_crawl_databases`, and yield each
+        database as soon as it and all the databases before it are crawled
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrent_databases)
+
+        async def crawl_database(database: str) -> None:
+            async with semaphore:
+                pool = await self._create_pool(database)
+                try:
+                    await crawl(pool, database)
+                finally:
+                    await pool.close()
+
+        tasks = [
+            asyncio.create_task(crawl_database(database)) for database in databases
+        ]
+        try:
+            for database, task in zip(databases, tasks):
+                await task
+                yield database
+        finally:
+            # Stopped early or failed, don't leave the other crawls running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _pop_datasets(self, database: str) -> List[Dataset]:
+        """Remove the datasets of a crawled database and return them"""
+        names = [
+            name
+            for name, dataset in self._datasets.items()
+            if dataset.structure and dataset.structure.database == database
+        ]
+        return [self._datasets.pop(name) for name in names]
+
+    async def _fetch_database(
+        self, pool: asyncpg.Pool, database: str, redshift: bool = False
+    ) -> None:
+        """Run the catalog queries of a database concurrently, then process them"""
+        queries = [
+            self._tables_query(redshift),
+            self._columns_query(redshift),
+            VIEW_DEFINITIONS_QUERY,
+            CONSTRAINTS_QUERY,
+        ]
+        tables, columns, view_definitions, constraints = await asyncio.gather(
+            *(pool.fetch(query) for query in queries)
+        )
+
+        self._add_tables(database, tables)
+        self._add_columns(database, columns)
+        self._add_view_definitions(database, view_definitions)
+        self._add_constraints(database, constraints)
+
     async def _fetch_databases(self) -> List[str]:
         conn = await self._connect_database(self._database)
         try:
@@ -102,6 +244,11 @@ class BasePostgreSQLExtractor(BaseExtractor):
         catalog: str,
         redshift: bool = False,
     ) -> List[Dataset]:
+        results = await conn.fetch(self._tables_query(redshift))
+        return self._add_tables(catalog, results)
+
+    @staticmethod
+    def _tables_query(redshift: bool = False) -> str:
         parts = [
             """
             SELECT schemaname, tablename AS name, pgd.description, pgc.reltuples::bigint AS row_count,
@@ -136,8 +283,9 @@ class BasePostgreSQLExtractor(BaseExtractor):
             """
             )
         parts.append("ORDER BY schemaname, name;")
-        results = await conn.fetch("\n".join(parts))
+        return "\n".join(parts)
 
+    def _add_tables(self, catalog: str, results: List[asyncpg.Record]) -> List[Dataset]:
         datasets = []
 
         for table in results:
@@ -171,6 +319,16 @@ class BasePostgreSQLExtractor(BaseExtractor):
         catalog: str,
         redshift: bool = False,
     ) -> List[Dataset]:
+        columns = await conn.fetch(self._columns_query(redshift))
+        datasets = self._add_columns(catalog, columns)
+
+        view_definitions = await conn.fetch(VIEW_DEFINITIONS_QUERY)
+        self._add_view_definitions(catalog, view_definitions)
+
+        return datasets
+
+    @staticmethod
+    def _columns_query(redshift: bool = False) -> str:
         parts = [
             """
             SELECT nc.nspname AS table_schema, c.relname AS table_name,
@@ -213,8 +371,11 @@ class BasePostgreSQLExtractor(BaseExtractor):
             """
             )
         parts.append("ORDER BY table_schema, table_name, ordinal_position;")
-        columns = await conn.fetch("\n".join(parts))
+        return "\n".join(parts)
 
+    def _add_columns(
+        self, catalog: str, columns: List[asyncpg.Record]
+    ) -> List[Dataset]:
         datasets = []
         seen = set()
 
@@ -232,15 +393,11 @@ class BasePostgreSQLExtractor(BaseExtractor):
                 datasets.append(dataset)
                 seen.add(normalized_name)
 
-        # Fetch view definitions
-        # See https://www.postgresql.org/docs/current/view-pg-views.html
-        view_definitions = await conn.fetch(
-            """
-            SELECT *
-            FROM pg_catalog.pg_views
-            WHERE schemaname != 'information_schema' and schemaname !~ '^pg_';
-            """
-        )
+        return datasets
+
+    def _add_view_definitions(
+        self, catalog: str, view_definitions: List[asyncpg.Record]
+    ) -> None:
         for view_definition in view_definitions:
             schema = view_definition["schemaname"]
             name = view_definition["viewname"]
@@ -255,41 +412,7 @@ class BasePostgreSQLExtractor(BaseExtractor):
 
             dataset.schema.sql_schema.table_schema = view_definition["definition"]
 
-        return datasets
-
-    async def _fetch_constraints(self, conn: asyncpg.Connection, catalog: str) -> None:
-        constraints = await conn.fetch(
-            """
-            SELECT nr.nspname AS table_schema, r.relname AS table_name,
-                   c.conname AS constraint_name,
-                   CASE c.contype WHEN 'f' THEN 'FOREIGN KEY'
-                                    WHEN 'p' THEN 'PRIMARY KEY'
-                                    WHEN 'u' THEN 'UNIQUE' END
-                   AS constraint_type,
-                   string_agg(a.attname, ',') AS key_columns,
-                   string_agg(af.attname, ',') AS constraint_columns,
-                   current_database() AS constraint_db,
-                   nf.nspname AS constraint_schema, rf.relname AS constraint_table
-            FROM (
-                SELECT cc.conname, unnest(cc.conkey) AS conkey_id, unnest(cc.confkey) AS confkey_id,
-                       cc.connamespace, cc.conrelid, cc.confrelid, cc.contype
-                FROM pg_constraint cc
-            ) AS c
-            JOIN pg_namespace nc ON c.connamespace = nc.oid
-            JOIN pg_class r ON r.oid = c.conrelid
-            JOIN pg_namespace nr ON nr.oid = r.relnamespace
-            LEFT OUTER JOIN pg_attribute a ON a.attrelid = c.conrelid AND c.conkey_id = a.attnum
-            LEFT OUTER JOIN pg_attribute af ON af.attrelid = c.confrelid AND c.confkey_id = af.attnum
-            LEFT JOIN pg_class rf ON rf.oid = af.attrelid
-            LEFT JOIN pg_namespace nf ON nf.oid = rf.relnamespace
-            WHERE c.contype IN ('f', 'p', 'u')
-                  AND r.relkind IN ('r', 'p')
-                  AND (NOT pg_is_other_temp_schema(nr.oid))
-            GROUP BY table_schema, table_name, constraint_name, constraint_type,
-                     constraint_db, constraint_schema, constraint_table;
-            """
-        )
-
+    def _add_constraints(self, catalog: str, constraints: List[asyncpg.Record]) -> None:
         if not constraints:
             return
 
@@ -385,23 +508,33 @@ class PostgreSQLExtractor(BasePostgreSQLExtractor):
     async def extract(self) -> Collection[ENTITY_TYPES]:
         logger.info(f"Fetching metadata from postgreSQL host {self._host}")
 
+        databases = await self._fetch_included_databases()
+        await self._crawl_databases(databases, self._fetch_database)
+
+        return self._datasets.values()
+
+    async def extract_stream(self) -> AsyncGenerator[ENTITY_TYPES, None]:
+        """
+        Yield the datasets of each database as soon as it's crawled, in the same
+        order as `extract`. The yielded datasets are no longer kept in memory.
+        """
+        logger.info(f"Streaming metadata from postgreSQL host {self._host}")
+
+        databases = await self._fetch_included_databases()
+        async for database in self._crawl_databases_in_order(
+            databases, self._fetch_database
+        ):
+            for dataset in self._pop_datasets(database):
+                yield dataset
+
+    async def _fetch_included_databases(self) -> List[str]:
         databases = [
             db
             for db in (await self._fetch_databases())
             if self._filter.include_database(db)
         ]
         logger.info(f"Databases to include: {databases}")
-
-        for db in databases:
-            conn = await self._connect_database(db)
-            try:
-                await self._fetch_tables(conn, db)
-                await self._fetch_columns(conn, db)
-                await self._fetch_constraints(conn, db)
-            finally:
-                await conn.close()
-
-        return self._datasets.values()
+        return databases
 
     def collect_query_logs(self) -> Iterator[QueryLog]:
         previous_line_cache: Dict[str, ParsedLog] = {}
@@ -499,10 +632,10 @@ class PostgreSQLExtractor(BasePostgreSQLExtractor):
             self._extract_duration(parsed.log_body[1]) if log_duration_enabled else None
         )
 
-        tll = extract_table_level_lineage(
-            sql=query,
-            platform=DataPlatform.POSTGRESQL,
-            account=None,
+        analysis = analyze_query(
+            query,
+            DataPlatform.POSTGRESQL,
+            self._query_log_config.process_query,
             default_database=parsed.database,
         )
 
@@ -511,17 +644,17 @@ class PostgreSQLExtractor(BasePostgreSQLExtractor):
         ) -> List[QueriedDataset]:
             return [d for d in datasets if d.database and d.schema]
 
-        return process_and_init_query_log(
+        return init_query_log(
             query=query,
+            processed_sql=analysis.sql,
             platform=DataPlatform.POSTGRESQL,
-            process_query_config=self._query_log_config.process_query,
             query_log=PartialQueryLog(
                 default_database=parsed.database,
                 user_id=parsed.user,
                 duration=duration,
                 start_time=previous_line.log_time,
-                sources=exclude_invalid_dataset(tll.sources),
-                targets=exclude_invalid_dataset(tll.targets),
+                sources=exclude_invalid_dataset(analysis.lineage.sources),
+                targets=exclude_invalid_dataset(analysis.lineage.targets),
             ),
         )
 
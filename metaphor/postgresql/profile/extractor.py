@@ -1,6 +1,6 @@
 import asyncio
 import traceback
-from typing import Collection, List
+from typing import AsyncGenerator, Collection, List
 
 try:
     import asyncpg
@@ -8,6 +8,7 @@ except ImportError:
     print("Please install metaphor[postgresql] extra\n")
     raise
 
+from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.column_statistics import ColumnStatistics
 from metaphor.common.entity_id import dataset_normalized_name
 from metaphor.common.event_util import ENTITY_TYPES
@@ -64,6 +65,10 @@ class PostgreSQLProfileExtractor(PostgreSQLExtractor):
             if self._trim_fields_and_check_empty_dataset(dataset)
         ]
 
+    def extract_stream(self) -> AsyncGenerator[ENTITY_TYPES, None]:
+        # Profiles are trimmed once all databases are done, don't stream them
+        return BaseExtractor.extract_stream(self)
+
     async def _profile_database(self, database: str) -> None:
         pool = await self._create_connection_pool()
 
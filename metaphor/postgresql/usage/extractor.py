@@ -1,6 +1,7 @@
-from typing import Collection
+from typing import AsyncGenerator, Collection
 from warnings import warn
 
+from metaphor.common.base_extractor import BaseExtractor
 from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.postgresql.extractor import PostgreSQLExtractor
 from metaphor.postgresql.usage.config import PostgreSQLUsageRunConfig
@@ -28,3 +29,6 @@ class PostgreSQLUsageExtractor(PostgreSQLExtractor):
     async def extract(self) -> Collection[ENTITY_TYPES]:
         # Deprecated connector, do nothing!
         return []
+
+    def extract_stream(self) -> AsyncGenerator[ENTITY_TYPES, None]:
+        return BaseExtractor.extract_stream(self)
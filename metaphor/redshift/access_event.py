@@ -4,6 +4,9 @@ from typing import AsyncIterator
 
 from asyncpg import Connection, Record
 
+# Number of rows fetched from the server-side cursor at a time
+DEFAULT_PREFETCH = 1000
+
 REDSHIFT_USAGE_SQL_TEMPLATE = """
 WITH queries AS (
     SELECT
@@ -11,6 +14,13 @@ WITH queries AS (
         SUM(LEN(text)) OVER (PARTITION BY query_id) AS length
     FROM
         sys_query_text
+    WHERE
+        query_id IN (
+            SELECT query_id
+            FROM sys_query_history
+            WHERE start_time >= '{start_time}'
+                AND start_time < '{end_time}'
+        )
 ), filtered AS (
     SELECT
         q.query_id,
@@ -47,6 +57,9 @@ WHERE sqh.status = 'success'
 ORDER BY sqh.end_time DESC;
 """
 """
+The query texts are restricted to the queries in the time range before being
+aggregated, so each time slice only scans its own part of sys_query_text.
+
 The condition `length < 65536` is because Redshift's LISTAGG method
 is unable to process the query if it is over 65535 characters long.
 See https://docs.aws.amazon.com/redshift/latest/dg/r_WF_LISTAGG.html#r_WF_LISTAGG-data-types
@@ -89,14 +102,17 @@ class AccessEvent:
         conn: Connection,
         start_date: datetime,
         end_date: datetime,
+        prefetch: int = DEFAULT_PREFETCH,
     ) -> AsyncIterator["AccessEvent"]:
-        results = await conn.fetch(
-            REDSHIFT_USAGE_SQL_TEMPLATE.format(
-                start_time=start_date.isoformat(), end_time=end_date.isoformat()
-            )
+        """
+        Stream the access events in the time range with a server-side cursor,
+        fetching `prefetch` rows at a time.
+        """
+        query = REDSHIFT_USAGE_SQL_TEMPLATE.format(
+            start_time=start_date.isoformat(), end_time=end_date.isoformat()
         )
 
-        for record in results:
-            yield AccessEvent.from_record(record)
-
-        await conn.close()
+        # Cursors can only be used within a transaction
+        async with conn.transaction():
+            async for record in conn.cursor(query, prefetch=prefetch):
+                yield AccessEvent.from_record(record)
@@ -1,27 +1,43 @@
 import asyncio
 import datetime
-from typing import Collection, Iterator, List, Set
+import math
+from collections import deque
+from typing import AsyncIterator, Collection, Deque, Iterator, List, Set, Tuple
+
+import asyncpg
 
 from metaphor.common.constants import BYTES_PER_MEGABYTES
 from metaphor.common.entity_id import dataset_normalized_name
 from metaphor.common.event_util import ENTITY_TYPES
 from metaphor.common.logger import get_logger
 from metaphor.common.models import to_dataset_statistics
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
-from metaphor.common.sql.table_level_lineage.table_level_lineage import (
-    extract_table_level_lineage,
-)
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.query_log import PartialQueryLog, init_query_log
 from metaphor.common.tag_matcher import tag_datasets
-from metaphor.common.utils import start_of_day
+from metaphor.common.utils import start_of_day, time_slices
 from metaphor.models.crawler_run_metadata import Platform
 from metaphor.models.metadata_change_event import DataPlatform, QueriedDataset, QueryLog
-from metaphor.postgresql.extractor import BasePostgreSQLExtractor
+from metaphor.postgresql.extractor import (
+    VIEW_DEFINITIONS_QUERY,
+    BasePostgreSQLExtractor,
+)
 from metaphor.redshift.access_event import AccessEvent
 from metaphor.redshift.config import RedshiftRunConfig
 from metaphor.redshift.utils import exclude_system_databases
 
 logger = get_logger()
 
+# Access events are fetched in time slices of this duration
+ACCESS_EVENT_SLICE_DURATION = datetime.timedelta(days=1)
+
+# Number of access events processed as a batch
+QUERY_LOG_BATCH_SIZE = 1000
+
+_TABLE_STATS_QUERY = """
+SELECT "schema", "table", size, tbl_rows
+FROM pg_catalog.svv_table_info;
+"""
+
 
 class RedshiftExtractor(BasePostgreSQLExtractor):
     """Redshift metadata extractor"""
@@ -57,21 +73,15 @@ class RedshiftExtractor(BasePostgreSQLExtractor):
             else list(self._filter.includes.keys())
         )
 
+        included_databases = []
         for db in databases:
             if not self._filter.include_database(db):
                 logger.info(f"Skipping database {db}")
                 continue
             self._included_databases.add(db)
+            included_databases.append(db)
 
-            conn = await self._connect_database(db)
-            try:
-                await self._fetch_tables(conn, db, True)
-                await self._fetch_columns(conn, db, True)
-                await self._fetch_redshift_table_stats(conn, db)
-            except Exception as ex:
-                logger.exception(ex)
-            finally:
-                await conn.close()
+        await self._crawl_databases(included_databases, self._fetch_redshift_database)
 
         datasets = list(self._datasets.values())
         tag_datasets(datasets, self._tag_matchers)
@@ -89,35 +99,138 @@ class RedshiftExtractor(BasePostgreSQLExtractor):
         except RuntimeError:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-        query_log_count = 0
-        for db in self._included_databases:
-            conn = loop.run_until_complete(self._connect_database(db))
-            aiter = self._fetch_query_logs(conn).__aiter__()
 
-            async def get_next():
+        # Drive the async generator one batch at a time
+        batches = self._fetch_query_log_batches()
+        query_log_count = 0
+        try:
+            while True:
                 try:
-                    query_log = await aiter.__anext__()
-                    return query_log
+                    batch = loop.run_until_complete(batches.__anext__())
                 except StopAsyncIteration:
-                    return None
-
-            while True:
-                query_log = loop.run_until_complete(get_next())
-                if query_log:
-                    yield query_log
-                    query_log_count += 1
-                else:
                     break
+
+                yield from batch
+                query_log_count += len(batch)
+        finally:
+            loop.run_until_complete(batches.aclose())
+
         logger.info(f"Wrote {query_log_count} QueryLog")
 
-    async def _fetch_redshift_table_stats(self, conn, catalog: str) -> None:
-        results = await conn.fetch(
-            """
-            SELECT "schema", "table", size, tbl_rows
-            FROM pg_catalog.svv_table_info;
-            """,
+    async def _fetch_query_log_batches(self) -> AsyncIterator[List[QueryLog]]:
+        for db in self._included_databases:
+            logger.info(f"Fetching query logs from {db}")
+            async for events in self._fetch_access_event_batches(db):
+                yield [
+                    query_log
+                    for event in events
+                    if (query_log := self._process_record(event))
+                ]
+
+    async def _fetch_access_event_batches(
+        self, db: str
+    ) -> AsyncIterator[List[AccessEvent]]:
+        """
+        Fetch the access events of a database in daily time slices, newest
+        first. Up to `max_connections_per_database` slices are streamed
+        concurrently, and the batches are yielded in the order of the slices.
+        """
+        start_date = start_of_day(self._query_log_lookback_days)
+        end_date = datetime.datetime.now(tz=datetime.timezone.utc)
+        slices = time_slices(
+            start_date,
+            end_date,
+            math.ceil((end_date - start_date) / ACCESS_EVENT_SLICE_DURATION),
         )
 
+        # The events within each slice are ordered by end time descending
+        remaining = iter(reversed(slices))
+        pending: Deque[Tuple[asyncio.Task, asyncio.Queue]] = deque()
+
+        pool = await self._create_pool(db)
+
+        def start_next_slice() -> None:
+            time_slice = next(remaining, None)
+            if time_slice is not None:
+                queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+                task = asyncio.create_task(
+                    self._stream_access_events(pool, *time_slice, queue)
+                )
+                pending.append((task, queue))
+
+        try:
+            for _ in range(self._max_connections_per_database):
+                start_next_slice()
+
+            while pending:
+                task, queue = pending[0]
+                while (batch := await queue.get()) is not None:
+                    yield batch
+
+                await task
+                pending.popleft()
+                start_next_slice()
+        finally:
+            # Stopped early, release the connections before closing the pool
+            for task, _ in pending:
+                task.cancel()
+            await asyncio.gather(*(task for task, _ in pending), return_exceptions=True)
+            await pool.close()
+
+    @staticmethod
+    async def _stream_access_events(
+        pool: asyncpg.Pool,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+        queue: asyncio.Queue,
+    ) -> None:
+        """
+        Put the access events in the time slice to the queue in batches, then None.
+        Errors are re-raised after the None, so the consumer sees them when
+        awaiting the task.
+        """
+        try:
+            async with pool.acquire() as conn:
+                batch: List[AccessEvent] = []
+                async for event in AccessEvent.fetch_access_event(
+                    conn, start_date, end_date
+                ):
+                    batch.append(event)
+                    if len(batch) >= QUERY_LOG_BATCH_SIZE:
+                        await queue.put(batch)
+                        batch = []
+
+                if batch:
+                    await queue.put(batch)
+        except Exception:
+            logger.exception(
+                f"Failed to fetch access events from {start_date} to {end_date}"
+            )
+            await queue.put(None)
+            raise
+
+        await queue.put(None)
+
+    async def _fetch_redshift_database(self, pool: asyncpg.Pool, db: str) -> None:
+        """Run the catalog queries of a database concurrently, then process them"""
+        try:
+            tables, columns, view_definitions, table_stats = await asyncio.gather(
+                pool.fetch(self._tables_query(True)),
+                pool.fetch(self._columns_query(True)),
+                pool.fetch(VIEW_DEFINITIONS_QUERY),
+                pool.fetch(_TABLE_STATS_QUERY),
+            )
+
+            self._add_tables(db, tables)
+            self._add_columns(db, columns)
+            self._add_view_definitions(db, view_definitions)
+            self._add_redshift_table_stats(db, table_stats)
+        except Exception as ex:
+            logger.exception(ex)
+
+    def _add_redshift_table_stats(
+        self, catalog: str, results: List[asyncpg.Record]
+    ) -> None:
         for result in results:
             normalized_name = dataset_normalized_name(
                 catalog, result["schema"], result["table"]
@@ -135,17 +248,6 @@ class RedshiftExtractor(BasePostgreSQLExtractor):
             dataset.statistics.record_count = statistics.record_count
             dataset.statistics.data_size_bytes = statistics.data_size_bytes
 
-    async def _fetch_query_logs(self, conn):
-        logger.info("Fetching query logs")
-
-        start_date = start_of_day(self._query_log_lookback_days)
-        end_date = datetime.datetime.now(tz=datetime.timezone.utc)
-
-        async for record in AccessEvent.fetch_access_event(conn, start_date, end_date):
-            query_log = self._process_record(record)
-            if query_log:
-                yield query_log
-
     def _is_related_query_log(self, queried_datasets: List[QueriedDataset]) -> bool:
         for dataset in queried_datasets:
             table_name = dataset_normalized_name(
@@ -160,18 +262,18 @@ class RedshiftExtractor(BasePostgreSQLExtractor):
         if access_event.usename in self._query_log_excluded_usernames:
             return
 
-        tll = extract_table_level_lineage(
-            sql=access_event.querytxt,
-            platform=DataPlatform.REDSHIFT,
-            account=None,
+        analysis = analyze_query(
+            access_event.querytxt,
+            DataPlatform.REDSHIFT,
+            self._query_log_config.process_query,
             query_id=str(access_event.query_id),
             default_database=access_event.database,
         )
 
-        return process_and_init_query_log(
+        return init_query_log(
             query=access_event.querytxt,
+            processed_sql=analysis.sql,
             platform=DataPlatform.REDSHIFT,
-            process_query_config=self._query_log_config.process_query,
             query_log=PartialQueryLog(
                 start_time=access_event.start_time,
                 duration=float(
@@ -180,8 +282,8 @@ class RedshiftExtractor(BasePostgreSQLExtractor):
                 user_id=access_event.usename,
                 rows_read=float(access_event.rows),
                 bytes_read=float(access_event.bytes),
-                sources=tll.sources,
-                targets=tll.targets,
+                sources=analysis.lineage.sources,
+                targets=analysis.lineage.targets,
             ),
             query_id=str(access_event.query_id),
         )
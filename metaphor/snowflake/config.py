@@ -1,5 +1,5 @@
 from dataclasses import field
-from typing import List, Set
+from typing import List, Literal, Set
 
 from pydantic.dataclasses import dataclass
 
@@ -10,7 +10,7 @@ from metaphor.common.tag_matcher import TagMatcher
 from metaphor.snowflake.auth import SnowflakeAuthConfig
 from metaphor.snowflake.utils import DEFAULT_THREAD_POOL_SIZE
 
-# number of query logs to fetch from Snowflake in one batch
+# number of query logs to fetch from Snowflake in one time slice
 DEFAULT_QUERY_LOG_FETCH_SIZE = 100000
 
 # By default ignore queries longer than 100K characters
@@ -18,6 +18,10 @@ DEFAULT_QUERY_LOG_FETCH_SIZE = 100000
 DEFAULT_MAX_QUERY_SIZE = 100_000
 
 
+# Scope of the SHOW queries for streams & iceberg tables
+ShowObjectsScope = Literal["schema", "database", "account"]
+
+
 @dataclass(config=ConnectorConfig)
 class SnowflakeQueryLogConfig:
     # Number of days back of query logs to fetch, if 0, don't fetch query logs
@@ -26,7 +30,9 @@ class SnowflakeQueryLogConfig:
     # Query log filter to exclude certain usernames
     excluded_usernames: Set[str] = field(default_factory=lambda: set())
 
-    # The number of query logs to fetch from Snowflake in one batch
+    # The approximate number of query logs to fetch from Snowflake in one query.
+    # The lookback window is split into time slices of this size, which are
+    # fetched concurrently up to max_concurrency
     fetch_size: int = DEFAULT_QUERY_LOG_FETCH_SIZE
 
     # Queries larger than this size will not be processed
@@ -87,3 +93,8 @@ class SnowflakeConfig(SnowflakeBaseConfig):
     lineage: SnowflakeLineageConfig = field(
         default_factory=lambda: SnowflakeLineageConfig()
     )
+
+    # Fetch streams & iceberg tables with one SHOW query per schema, per database,
+    # or for the whole account. Falls back to a narrower scope if a query fails
+    # or hits the row limit of SHOW
+    show_objects_scope: ShowObjectsScope = "database"
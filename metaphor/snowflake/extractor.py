@@ -1,9 +1,13 @@
 import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
 from typing import (
+    Callable,
     Collection,
     Dict,
     Generator,
+    Iterable,
     Iterator,
     List,
     Literal,
@@ -14,7 +18,11 @@ from typing import (
 )
 
 from metaphor.common.fieldpath import build_schema_field
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
+from metaphor.common.sql.query_log import (
+    PartialQueryLog,
+    QueryLogTask,
+    process_query_logs,
+)
 
 try:
     from snowflake.connector.cursor import DictCursor, SnowflakeCursor
@@ -40,6 +48,7 @@ from metaphor.common.utils import (
     chunks,
     safe_float,
     start_of_day,
+    time_slices,
     to_utc_datetime_from_timestamp,
 )
 from metaphor.models.crawler_run_metadata import Platform
@@ -79,6 +88,7 @@ from metaphor.snowflake.utils import (
     SnowflakeTableType,
     append_column_system_tag,
     append_dataset_system_tag,
+    async_execute_stream,
     check_access_history,
     exclude_username_clause,
     fetch_query_history_count,
@@ -104,6 +114,12 @@ DEFAULT_FILTER: DatasetFilter = DatasetFilter(
 # max number of tables' information to fetch in one query
 TABLE_INFO_FETCH_SIZE = 100
 
+# SHOW commands return at most this many rows
+# See https://docs.snowflake.com/en/sql-reference/sql/show
+SHOW_RESULT_LIMIT = 10_000
+
+ShowObjectType = Literal["STREAMS", "ICEBERG TABLES"]
+
 
 class SnowflakeExtractor(BaseExtractor):
     """Snowflake metadata extractor"""
@@ -130,7 +146,11 @@ class SnowflakeExtractor(BaseExtractor):
         self._streams_count_rows = config.streams.count_rows
         self._config = config
 
+        self._show_objects_scope = config.show_objects_scope
+
         self._datasets: Dict[str, Dataset] = {}  # key: normalized name
+        self._database_schemas: Dict[str, List[str]] = {}
+        self._database_tables: Dict[str, Set[str]] = {}
         self._hierarchies: Dict[str, Hierarchy] = {}
 
     async def extract(self) -> Collection[ENTITY_TYPES]:
@@ -153,32 +173,7 @@ class SnowflakeExtractor(BaseExtractor):
             logger.info(f"Shared inbound databases: {shared_databases}")
 
             self._fetch_database_comment(cursor)
-            for database in databases:
-                tables = self._fetch_tables(cursor, database)
-                if len(tables) == 0:
-                    logger.info(f"Skip empty database {database}")
-                    continue
-
-                logger.info(f"Include {len(tables)} tables from {database}")
-
-                self._fetch_columns(cursor, database)
-                self._fetch_schemas_comment(cursor, database)
-
-                secure_views = self._fetch_secure_views(cursor)
-
-                try:
-                    self._fetch_table_info(
-                        tables, database in shared_databases, secure_views
-                    )
-                except Exception as e:
-                    logger.exception(
-                        f"Failed to fetch table extra info for '{database}'\n{e}"
-                    )
-
-                for schema in self._fetch_schemas(cursor):
-                    if self._streams_enabled:
-                        self._fetch_streams(cursor, database, schema)
-                    self._fetch_iceberg_tables(cursor, database, schema)
+            self._fetch_databases_concurrently(databases, shared_databases)
 
             self._fetch_primary_keys(cursor)
             self._fetch_unique_keys(cursor)
@@ -198,6 +193,201 @@ class SnowflakeExtractor(BaseExtractor):
         entities.extend(self._hierarchies.values())
         return entities
 
+    def _fetch_databases_concurrently(
+        self, databases: List[str], shared_databases: List[str]
+    ) -> None:
+        """
+        Fetch the metadata of the databases over a pool of cursors, bounded by
+        max_concurrency. Each database is fetched as one task, which then fans
+        out into tasks for the extra table info and the objects in each schema.
+        """
+        existing_hierarchies = set(self._hierarchies)
+
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            database_futures = [
+                executor.submit(
+                    self._fetch_database, database, database in shared_databases
+                )
+                for database in databases
+            ]
+
+            followup_futures = []
+            for future in as_completed(database_futures):
+                followup_futures.extend(
+                    executor.submit(task) for task in future.result()
+                )
+
+            for future in followup_futures:
+                future.result()
+
+        self._restore_crawl_order(databases, existing_hierarchies)
+
+        if self._show_objects_scope == "account":
+            self._fetch_account_objects()
+
+    def _restore_crawl_order(
+        self, databases: List[str], existing_hierarchies: Set[str]
+    ) -> None:
+        """
+        Reorder the datasets & hierarchies fetched concurrently as if the
+        databases were crawled one by one: by database, then its tables, then
+        the objects in each schema
+        """
+        database_index = {db.lower(): i for i, db in enumerate(databases)}
+        schema_index = {
+            db.lower(): {schema.lower(): i for i, schema in enumerate(schemas)}
+            for db, schemas in self._database_schemas.items()
+        }
+
+        def dataset_position(name: str) -> Tuple:
+            database, schema, _ = name.split(".", 2)
+            if name in self._database_tables.get(database, set()):
+                return (database_index.get(database, len(databases)), 0)
+
+            schemas = schema_index.get(database, {})
+            return (
+                database_index.get(database, len(databases)),
+                1,
+                schemas.get(schema, len(schemas)),
+            )
+
+        def hierarchy_position(key: str) -> Tuple:
+            if key in existing_hierarchies:
+                return (-1,)
+            return (database_index.get(key.split(".")[0], len(databases)),)
+
+        # sorted() is stable, so the order within each position is kept
+        self._datasets = {
+            name: self._datasets[name]
+            for name in sorted(self._datasets, key=dataset_position)
+        }
+        self._hierarchies = {
+            key: self._hierarchies[key]
+            for key in sorted(self._hierarchies, key=hierarchy_position)
+        }
+
+    def _fetch_database(
+        self, database: str, is_shared_database: bool
+    ) -> List[Callable[[], None]]:
+        """
+        Fetch the tables, columns & schemas of a database, and returns the
+        tasks to fetch the rest of its metadata
+        """
+        with self._conn.cursor() as cursor:
+            tables = self._fetch_tables(cursor, database)
+            if len(tables) == 0:
+                logger.info(f"Skip empty database {database}")
+                return []
+
+            logger.info(f"Include {len(tables)} tables from {database}")
+
+            self._fetch_columns(cursor, database)
+            self._fetch_schemas_comment(cursor, database)
+            secure_views = self._fetch_secure_views(cursor, database)
+            schemas = self._fetch_schemas(cursor, database)
+            self._database_schemas[database] = schemas
+            self._database_tables[database.lower()] = set(tables)
+
+        tasks: List[Callable[[], None]] = [
+            partial(self._fetch_table_info_chunk, chunk, secure_views)
+            for chunk in self._table_info_chunks(tables, is_shared_database)
+        ]
+        if self._show_objects_scope == "schema":
+            tasks.extend(
+                partial(self._fetch_schema_objects, database, schema)
+                for schema in schemas
+            )
+        elif self._show_objects_scope == "database":
+            tasks.append(partial(self._fetch_database_objects, database))
+        return tasks
+
+    def _fetch_schema_objects(self, database: str, schema: str) -> None:
+        with self._conn.cursor() as cursor:
+            if self._streams_enabled:
+                self._fetch_streams(cursor, database, schema)
+            self._fetch_iceberg_tables(cursor, database, schema)
+
+    def _show_object_types(self) -> List[ShowObjectType]:
+        return (["STREAMS"] if self._streams_enabled else []) + ["ICEBERG TABLES"]
+
+    def _fetch_database_objects(self, database: str) -> None:
+        """
+        Fetch the streams & iceberg tables in a database with one SHOW query
+        each, and fall back to per schema queries if that fails
+        """
+        with self._conn.cursor() as cursor:
+            for object_type in self._show_object_types():
+                rows = self._show_objects(cursor, object_type, f"DATABASE {database}")
+                if rows is not None:
+                    self._add_objects(object_type, rows, database)
+                    continue
+
+                for schema in self._database_schemas.get(database, []):
+                    if object_type == "STREAMS":
+                        self._fetch_streams(cursor, database, schema)
+                    else:
+                        self._fetch_iceberg_tables(cursor, database, schema)
+
+    def _fetch_account_objects(self) -> None:
+        """
+        Fetch the streams & iceberg tables of the crawled databases with one SHOW
+        query each for the whole account, and fall back to per database queries
+        if that fails
+        """
+        with self._conn.cursor() as cursor:
+            for object_type in self._show_object_types():
+                rows = self._show_objects(cursor, object_type, "ACCOUNT")
+                if rows is not None:
+                    database_rows: Dict[str, List[Tuple]] = {}
+                    for row in rows:
+                        database_rows.setdefault(row[2].lower(), []).append(row)
+
+                    for database in self._database_schemas:
+                        self._add_objects(
+                            object_type, database_rows.get(database, []), database
+                        )
+                    continue
+
+                for database in self._database_schemas:
+                    rows = self._show_objects(
+                        cursor, object_type, f"DATABASE {database}"
+                    )
+                    if rows is not None:
+                        self._add_objects(object_type, rows, database)
+
+    @staticmethod
+    def _show_objects(
+        cursor: SnowflakeCursor, object_type: ShowObjectType, scope: str
+    ) -> Optional[List[Tuple]]:
+        """
+        Run SHOW for the objects in the scope. Returns None if it fails, or if
+        the result may be truncated by the row limit of SHOW.
+        """
+        try:
+            cursor.execute(f"SHOW {object_type} IN {scope}")
+        except Exception:
+            # Most likely due to a permission issue
+            logger.exception(f"Failed to show {object_type.lower()} in '{scope}'")
+            return None
+
+        rows = cursor.fetchall()
+        if len(rows) >= SHOW_RESULT_LIMIT:
+            logger.warning(
+                f"Too many {object_type.lower()} in '{scope}', results may be truncated"
+            )
+            return None
+
+        logger.info(f"Found {len(rows)} {object_type.lower()} in '{scope}'")
+        return rows  # type: ignore
+
+    def _add_objects(
+        self, object_type: ShowObjectType, rows: List[Tuple], database: str
+    ) -> None:
+        if object_type == "STREAMS":
+            self._add_streams(rows, database)
+        else:
+            self._add_iceberg_tables(rows, database)
+
     def collect_query_logs(self) -> Iterator[QueryLog]:
         self._conn = auth.connect(self._config)
 
@@ -223,9 +413,9 @@ class SnowflakeExtractor(BaseExtractor):
         return [db[0].lower() for db in cursor]
 
     @staticmethod
-    def _fetch_secure_views(cursor: SnowflakeCursor) -> Set[str]:
+    def _fetch_secure_views(cursor: SnowflakeCursor, database: str) -> Set[str]:
         cursor.execute(
-            "select table_catalog, table_schema, table_name, is_secure from information_schema.views WHERE table_schema != 'INFORMATION_SCHEMA'"
+            f"select table_catalog, table_schema, table_name, is_secure from {database}.information_schema.views WHERE table_schema != 'INFORMATION_SCHEMA'"
         )
         set_of_secure_views = set()
         for database, schema, table, is_secure in cursor:
@@ -237,7 +427,7 @@ class SnowflakeExtractor(BaseExtractor):
 
     FETCH_TABLE_QUERY = """
     SELECT table_catalog, table_schema, table_name, table_type, COMMENT, row_count, bytes, created
-    FROM information_schema.tables
+    FROM {database}.information_schema.tables
     WHERE table_schema != 'INFORMATION_SCHEMA'
     ORDER BY table_schema, table_name
     """
@@ -246,13 +436,11 @@ class SnowflakeExtractor(BaseExtractor):
         self, cursor: SnowflakeCursor, database_name: str
     ) -> Dict[str, DatasetInfo]:
         try:
-            cursor.execute("USE " + database_name)
+            cursor.execute(self.FETCH_TABLE_QUERY.format(database=database_name))
         except ProgrammingError:
             logger.exception(f"Invalid or inaccessible database {database_name}")
             return {}
 
-        cursor.execute(self.FETCH_TABLE_QUERY)
-
         tables: Dict[str, DatasetInfo] = {}
         for (
             database,
@@ -292,10 +480,10 @@ class SnowflakeExtractor(BaseExtractor):
 
     def _fetch_columns(self, cursor: SnowflakeCursor, database: str) -> None:
         cursor.execute(
-            """
+            f"""
             SELECT table_schema, table_name, column_name, data_type, character_maximum_length,
               numeric_precision, is_nullable, column_default, comment
-            FROM information_schema.columns
+            FROM {database}.information_schema.columns
             WHERE table_schema != 'INFORMATION_SCHEMA'
             ORDER BY table_schema, table_name, ordinal_position
             """
@@ -328,34 +516,40 @@ class SnowflakeExtractor(BaseExtractor):
 
             dataset.schema.fields.append(field)
 
-    def _fetch_table_info(
-        self,
-        tables: Dict[str, DatasetInfo],
-        is_shared_database: bool,
-        secure_views: Set[str],
-    ) -> None:
+    @staticmethod
+    def _table_info_chunks(
+        tables: Dict[str, DatasetInfo], is_shared_database: bool
+    ) -> List[List[Tuple[str, DatasetInfo]]]:
+        """Chunks of tables in the same schema to fetch extra info for"""
         # shared database doesn't support getting DDL and last update time
         if is_shared_database:
-            return
-
-        dict_cursor: DictCursor = self._conn.cursor(DictCursor)  # type: ignore
+            return []
 
         # Partition table by schema
         schema_tables: Dict[str, List[Tuple[str, DatasetInfo]]] = {}
         for table in tables.items():
             schema_tables.setdefault(table[1].schema, []).append(table)
 
-        for partitioned_tables in schema_tables.values():
-            for chunk in chunks(partitioned_tables, TABLE_INFO_FETCH_SIZE):
-                try:
-                    self._fetch_last_update_time(dict_cursor, chunk, secure_views)
-                except Exception as error:
-                    logger.error(error)
+        return [
+            chunk
+            for partitioned_tables in schema_tables.values()
+            for chunk in chunks(partitioned_tables, TABLE_INFO_FETCH_SIZE)
+        ]
+
+    def _fetch_table_info_chunk(
+        self, chunk: List[Tuple[str, DatasetInfo]], secure_views: Set[str]
+    ) -> None:
+        dict_cursor: DictCursor = self._conn.cursor(DictCursor)  # type: ignore
+
+        try:
+            self._fetch_last_update_time(dict_cursor, chunk, secure_views)
+        except Exception as error:
+            logger.error(error)
 
-                try:
-                    self._fetch_table_ddl(dict_cursor, chunk)
-                except Exception as error:
-                    logger.error(error)
+        try:
+            self._fetch_table_ddl(dict_cursor, chunk)
+        except Exception as error:
+            logger.error(error)
 
         dict_cursor.close()
 
@@ -630,44 +824,73 @@ class SnowflakeExtractor(BaseExtractor):
             end_date,
             has_access_history,
         )
-        batches = math.ceil(count / self._query_log_fetch_size)
-        logger.info(f"Total {count} queries, dividing into {batches} batches")
+        # Partition the time window into slices of roughly fetch_size queries,
+        # so each slice is a single scan without sorting or OFFSET pagination
+        slices = time_slices(
+            start_date, end_date, math.ceil(count / self._query_log_fetch_size)
+        )
+        logger.info(f"Total {count} queries, dividing into {len(slices)} time slices")
 
         queries = (
-            self._batch_query_for_access_logs(start_date, end_date, batches)
+            self._sliced_query_for_access_logs(start_date, end_date, slices)
             if has_access_history
-            else self._batch_query_for_query_logs(start_date, end_date, batches)
+            else self._sliced_query_for_query_logs(slices)
         )
 
-        cursor = self._conn.cursor()
+        def query_log_tasks() -> Iterator[QueryLogTask]:
+            for time_slice, rows in async_execute_stream(
+                self._conn,
+                queries,
+                "query_logs",
+                self._max_concurrency,
+            ):
+                yield from self._parse_query_logs(time_slice, rows)
+
         parsed_query_log_count = 0
-        for batch, query in queries.items():
-            cursor.execute(query.query, query.params)
-            for query_log in self._parse_query_logs(batch, cursor):
-                parsed_query_log_count += 1
-                yield query_log
+        for query_log in process_query_logs(
+            query_log_tasks(),
+            DataPlatform.SNOWFLAKE,
+            self._config.query_log.process_query,
+        ):
+            parsed_query_log_count += 1
+            yield query_log
 
         logger.info(f"Fetched {parsed_query_log_count} query logs")
 
-    def _fetch_schemas(self, cursor: SnowflakeCursor) -> List[str]:
+    def _fetch_schemas(self, cursor: SnowflakeCursor, database: str) -> List[str]:
         cursor.execute(
-            "SELECT schema_name FROM information_schema.schemata WHERE schema_name != 'INFORMATION_SCHEMA'"
+            f"SELECT schema_name FROM {database}.information_schema.schemata WHERE schema_name != 'INFORMATION_SCHEMA'"
         )
         return [schema[0] for schema in cursor]
 
     def _fetch_streams(self, cursor: SnowflakeCursor, database: str, schema: str):
         try:
-            cursor.execute(f"SHOW STREAMS IN {schema}")
+            cursor.execute(f"SHOW STREAMS IN SCHEMA {database}.{schema}")
         except Exception:
             # Most likely due to a permission issue
             logger.exception(f"Failed to show streams in '{schema}'")
             return
 
+        count = self._add_streams(cursor, database, schema)
+        logger.info(f"Found {count} stream tables in {database}.{schema}")
+
+    def _add_streams(
+        self,
+        rows: Iterable[Tuple],
+        database: str,
+        schema: Optional[str] = None,
+    ) -> int:
+        """
+        Add the streams of a crawled database from the results of SHOW STREAMS,
+        using the schema names in the results unless specified
+        """
         count = 0
-        for entry in cursor:
+        for entry in rows:
             (
                 create_on,
                 stream_name,
+                stream_database,
+                stream_schema,
                 comment,
                 source_name,
                 source_type_str,
@@ -677,6 +900,8 @@ class SnowflakeExtractor(BaseExtractor):
             ) = (
                 entry[0],
                 entry[1],
+                database,
+                schema or entry[3],
                 entry[5],
                 entry[6],
                 entry[7],
@@ -686,17 +911,21 @@ class SnowflakeExtractor(BaseExtractor):
             )
 
             row_count = (
-                self._fetch_stream_row_count(f"{database}.{schema}.{stream_name}")
+                self._fetch_stream_row_count(
+                    f"{stream_database}.{stream_schema}.{stream_name}"
+                )
                 if self._streams_count_rows
                 else None
             )
 
             stale = str(stale_) == "true"
 
-            normalized_name = dataset_normalized_name(database, schema, stream_name)
+            normalized_name = dataset_normalized_name(
+                stream_database, stream_schema, stream_name
+            )
             dataset = self._init_dataset(
-                database=database,
-                schema=schema,
+                database=stream_database,
+                schema=stream_schema,
                 table=stream_name,
                 table_type="STREAM",
                 comment=comment,
@@ -740,20 +969,33 @@ class SnowflakeExtractor(BaseExtractor):
             self._datasets[normalized_name] = dataset
             count += 1
 
-        logger.info(f"Found {count} stream tables in {database}.{schema}")
+        return count
 
     def _fetch_iceberg_tables(
         self, cursor: SnowflakeCursor, database: str, schema: str
     ):
         try:
-            cursor.execute(f"SHOW ICEBERG TABLES IN {schema}")
+            cursor.execute(f"SHOW ICEBERG TABLES IN SCHEMA {database}.{schema}")
         except Exception:
             # Most likely due to a permission issue
             logger.exception(f"Failed to show iceberg tables in '{schema}'")
             return
 
+        count = self._add_iceberg_tables(cursor, database, schema)
+        logger.info(f"Found {count} iceberg tables in {database}.{schema}")
+
+    def _add_iceberg_tables(
+        self,
+        rows: Iterable[Tuple],
+        database: str,
+        schema: Optional[str] = None,
+    ) -> int:
+        """
+        Add the iceberg info of a crawled database from the results of SHOW
+        ICEBERG TABLES, using the schema names in the results unless specified
+        """
         count = 0
-        for entry in cursor:
+        for entry in rows:
             (
                 table_name,
                 external_volume_name,
@@ -764,7 +1006,9 @@ class SnowflakeExtractor(BaseExtractor):
                 entry[7],
             )
 
-            normalized_name = dataset_normalized_name(database, schema, table_name)
+            normalized_name = dataset_normalized_name(
+                database, schema or entry[3], table_name
+            )
             dataset = self._datasets.get(normalized_name)
 
             if dataset is None:
@@ -783,7 +1027,7 @@ class SnowflakeExtractor(BaseExtractor):
 
             count += 1
 
-        logger.info(f"Found {count} iceberg tables in {database}.{schema}")
+        return count
 
     def _fetch_stream_row_count(self, stream_name) -> Optional[int]:
         with self._conn.cursor() as cursor:
@@ -800,11 +1044,14 @@ class SnowflakeExtractor(BaseExtractor):
 
         return None
 
-    def _batch_query_for_access_logs(
-        self, start_date: datetime, end_date: datetime, batches: int
-    ):
+    def _sliced_query_for_access_logs(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        slices: List[Tuple[datetime, datetime]],
+    ) -> Dict[str, QueryWithParam]:
         return {
-            x: QueryWithParam(
+            f"{slice_start} - {slice_end}": QueryWithParam(
                 f"""
                 SELECT q.QUERY_ID, q.QUERY_PARAMETERIZED_HASH,
                   q.USER_NAME, QUERY_TEXT, START_TIME, TOTAL_ELAPSED_TIME, CREDITS_USED_CLOUD_SERVICES,
@@ -817,26 +1064,23 @@ class SnowflakeExtractor(BaseExtractor):
                   AND q.START_TIME > %s AND q.START_TIME <= %s
                   AND a.QUERY_START_TIME > %s AND a.QUERY_START_TIME <= %s
                   {exclude_username_clause(self._query_log_excluded_usernames)}
-                ORDER BY q.QUERY_ID
-                LIMIT {self._query_log_fetch_size} OFFSET %s
                 """,
                 (
-                    start_date,
-                    end_date,
+                    slice_start,
+                    slice_end,
                     start_date,
                     end_date,
                     *self._query_log_excluded_usernames,
-                    x * self._query_log_fetch_size,
                 ),
             )
-            for x in range(batches)
+            for slice_start, slice_end in slices
         }
 
-    def _batch_query_for_query_logs(
-        self, start_date: datetime, end_date: datetime, batches: int
-    ):
+    def _sliced_query_for_query_logs(
+        self, slices: List[Tuple[datetime, datetime]]
+    ) -> Dict[str, QueryWithParam]:
         return {
-            x: QueryWithParam(
+            f"{slice_start} - {slice_end}": QueryWithParam(
                 f"""
                 SELECT QUERY_ID, QUERY_PARAMETERIZED_HASH,
                   USER_NAME, QUERY_TEXT, START_TIME, TOTAL_ELAPSED_TIME, CREDITS_USED_CLOUD_SERVICES,
@@ -845,23 +1089,20 @@ class SnowflakeExtractor(BaseExtractor):
                 WHERE EXECUTION_STATUS = 'SUCCESS'
                   AND START_TIME > %s AND START_TIME <= %s
                   {exclude_username_clause(self._query_log_excluded_usernames)}
-                ORDER BY QUERY_ID
-                LIMIT {self._query_log_fetch_size} OFFSET %s
                 """,
                 (
-                    start_date,
-                    end_date,
+                    slice_start,
+                    slice_end,
                     *self._query_log_excluded_usernames,
-                    x * self._query_log_fetch_size,
                 ),
             )
-            for x in range(batches)
+            for slice_start, slice_end in slices
         }
 
     def _parse_query_logs(
-        self, batch: int, cursor: SnowflakeCursor
-    ) -> Generator[QueryLog, None, None]:
-        logger.info(f"query logs batch #{batch}")
+        self, time_slice: str, rows: List[Tuple]
+    ) -> Generator[QueryLogTask, None, None]:
+        logger.info(f"query logs slice {time_slice}: {len(rows)} rows")
         for (
             query_id,
             query_hash,
@@ -878,7 +1119,7 @@ class SnowflakeExtractor(BaseExtractor):
             rows_inserted,
             rows_updated,
             *access_objects,
-        ) in cursor:
+        ) in rows:
             try:
                 sources = (
                     parse_accessed_objects(access_objects[0], self._account)
@@ -898,10 +1139,8 @@ class SnowflakeExtractor(BaseExtractor):
                 # User IDs can be an email address
                 user_id, email = user_id_or_email(username)
 
-                query_log = process_and_init_query_log(
+                yield QueryLogTask(
                     query=query_text,
-                    platform=DataPlatform.SNOWFLAKE,
-                    process_query_config=self._config.query_log.process_query,
                     query_log=PartialQueryLog(
                         account=self._account,
                         start_time=start_time,
@@ -922,8 +1161,6 @@ class SnowflakeExtractor(BaseExtractor):
                     query_id=query_id,
                     query_hash=query_hash,
                 )
-                if query_log:
-                    yield query_log
             except Exception:
                 logger.exception(f"query log processing error, query id: {query_id}")
 
@@ -1056,7 +1293,7 @@ class SnowflakeExtractor(BaseExtractor):
 
     def _fetch_schemas_comment(self, cursor: SnowflakeCursor, database: str) -> None:
         cursor.execute(
-            "SELECT catalog_name, schema_name, comment FROM information_schema.schemata WHERE schema_name != 'INFORMATION_SCHEMA'"
+            f"SELECT catalog_name, schema_name, comment FROM {database}.information_schema.schemata WHERE schema_name != 'INFORMATION_SCHEMA'"
         )
 
         schema_count, comment_count = 0, 0
@@ -1,10 +1,11 @@
 import logging
 import time
+from collections import deque
 from concurrent import futures
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
 
 from snowflake.connector import SnowflakeConnection
 from snowflake.connector.cursor import SnowflakeCursor
@@ -28,6 +29,7 @@ logger.setLevel(logging.INFO)
 
 DEFAULT_THREAD_POOL_SIZE = 10
 DEFAULT_SLEEP_TIME = 0.1  # 0.1 s
+DEFAULT_FETCH_SIZE = 10_000
 
 
 class SnowflakeTableType(Enum):
@@ -147,6 +149,50 @@ def async_execute(
         return results_map
 
 
+def async_execute_stream(
+    conn: SnowflakeConnection,
+    queries: Dict[str, QueryWithParam],
+    query_name: str = "",
+    max_workers: Optional[int] = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+) -> Iterator[Tuple[str, List]]:
+    """
+    Executing snowflake queries using thread pool, and stream the results of
+    each query in batches of at most `fetch_size` rows, in the order of the
+    queries. Up to `max_workers` queries run ahead of the one being consumed,
+    so the results are never fully held in memory.
+    """
+    workers = max_workers if max_workers is not None else DEFAULT_THREAD_POOL_SIZE
+    pending: Deque[Tuple[str, futures.Future]] = deque()
+    remaining = iter(queries.items())
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(pending) < workers:
+                item = next(remaining, None)
+                if item is None:
+                    break
+                key, query = item
+                pending.append((key, executor.submit(async_query, conn, query)))
+
+            if not pending:
+                break
+
+            key, future = pending.popleft()
+            try:
+                cursor = future.result()
+                logger.info(f"Executed {query_name} for {key}")
+            except Exception:
+                logger.exception(f"Error executing {query_name} for {key}")
+                continue
+
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield key, rows
+
+
 def exclude_username_clause(excluded_usernames: Set[str]) -> str:
     """
     Excludes usernames from query history output
@@ -49,8 +49,12 @@ class UnityCatalogRunConfig(BaseConfig):
         default_factory=lambda: UnityCatalogQueryLogConfig()
     )
 
-    # Max number of connection to the database
+    # Max number of concurrent connections to the database
     max_concurrency: int = 10
 
     # The limit to apply when running DESCRIBE HISTORY
     describe_history_limit: int = 100
+
+    # Fetch table properties & last refreshed time in bulk, and only run
+    # SHOW TBLPROPERTIES & DESCRIBE HISTORY for the tables missed
+    bulk_table_metadata: bool = True
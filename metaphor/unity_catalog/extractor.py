@@ -1,7 +1,10 @@
 import json
 import re
 import urllib.parse
-from typing import Collection, Dict, Iterator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from queue import Queue
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
 
 from databricks.sdk.service.iam import ServicePrincipal
 from pydantic import BaseModel
@@ -75,6 +78,9 @@ from metaphor.unity_catalog.queries import (
 from metaphor.unity_catalog.utils import (
     batch_get_last_refreshed_time,
     batch_get_table_properties,
+    borrow_connection,
+    bulk_get_last_refreshed_time,
+    bulk_get_table_properties,
     create_api,
     create_connection,
     create_connection_pool,
@@ -123,6 +129,10 @@ URL_SCHEMA_RE = re.compile(r"{schema}")
 URL_TABLE_RE = re.compile(r"{table}")
 
 
+_SchemaObjects = Tuple[List[Tuple[VolumeInfo, List[VolumeFileInfo]]], List[TableInfo]]
+"""The volumes (with their files) and tables in a schema"""
+
+
 class CatalogSystemTags(BaseModel):
     catalog_tags: List[SystemTag] = []
     schema_name_to_tags: Dict[str, List[SystemTag]] = {}
@@ -151,6 +161,7 @@ class UnityCatalogExtractor(BaseExtractor):
         )
 
         self._describe_history_limit = config.describe_history_limit
+        self._bulk_table_metadata = config.bulk_table_metadata
         self._max_concurrency = config.max_concurrency
 
         self._has_select_permissions = config.has_select_permissions
@@ -163,6 +174,9 @@ class UnityCatalogExtractor(BaseExtractor):
             http_path=config.http_path,
         )
 
+        # Created on demand for concurrent queries
+        self._connection_pool: Optional[Queue] = None
+
         self._service_principals: Dict[str, ServicePrincipal] = {}
 
         self._last_refresh_time_queue: List[str] = []
@@ -181,40 +195,53 @@ class UnityCatalogExtractor(BaseExtractor):
         self._service_principals = list_service_principals(self._api)
         logger.info(f"Found service principals: {self._service_principals}")
 
-        catalogs = list_catalogs(self._connection)
-        for catalog_info in catalogs:
-            catalog = catalog_info.catalog_name
-            if not self._filter.include_database(catalog):
-                logger.info(f"Ignore catalog {catalog} due to filter config")
-                continue
+        catalogs = [
+            catalog_info
+            for catalog_info in list_catalogs(self._connection)
+            if self._include_catalog(catalog_info.catalog_name)
+        ]
 
-            self._init_catalog(catalog_info)
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            # Lineage is fetched once per catalog, concurrently with the schemas
+            lineage_futures: Dict[
+                str, Future[Tuple[TableLineageMap, ColumnLineageMap]]
+            ] = {}
+            schema_futures: List[Tuple[str, Future[_SchemaObjects]]] = []
+
+            for catalog_info in catalogs:
+                catalog = catalog_info.catalog_name
+                self._init_catalog(catalog_info)
+                lineage_futures[catalog] = executor.submit(self._fetch_lineage, catalog)
+
+                for schema_info in list_schemas(self._connection, catalog):
+                    schema = schema_info.schema_name
+                    if not self._filter.include_schema(catalog, schema):
+                        logger.info(
+                            f"Ignore schema {catalog}.{schema} due to filter config"
+                        )
+                        continue
 
-            for schema_info in list_schemas(self._connection, catalog):
-                schema = schema_info.schema_name
-                if not self._filter.include_schema(catalog, schema):
-                    logger.info(
-                        f"Ignore schema {catalog}.{schema} due to filter config"
+                    self._init_schema(schema_info)
+                    schema_futures.append(
+                        (
+                            catalog,
+                            executor.submit(
+                                self._fetch_schema_objects, catalog, schema
+                            ),
+                        )
                     )
-                    continue
-
-                self._init_schema(schema_info)
 
-                table_lineage = list_table_lineage(self._connection, catalog, schema)
-                column_lineage = list_column_lineage(self._connection, catalog, schema)
+            # Process the results in order, in the main thread
+            for catalog, future in schema_futures:
+                table_lineage, column_lineage = lineage_futures[catalog].result()
+                volumes, tables = future.result()
 
-                for volume_info in list_volumes(self._connection, catalog, schema):
+                for volume_info, volume_files in volumes:
                     self._volumes[volume_info.full_name] = volume_info
                     self._init_volume(volume_info)
-                    self._extract_volume_files(volume_info)
-
-                for table_info in list_tables(self._connection, catalog, schema):
-                    table = table_info.table_name
-                    table_name = f"{catalog}.{schema}.{table}"
-                    if not self._filter.include_table(catalog, schema, table):
-                        logger.info(f"Ignore table: {table_name} due to filter config")
-                        continue
+                    self._extract_volume_files(volume_info, volume_files)
 
+                for table_info in tables:
                     dataset = self._init_dataset(table_info)
                     self._populate_lineage(dataset, table_lineage, column_lineage)
 
@@ -230,6 +257,46 @@ class UnityCatalogExtractor(BaseExtractor):
         entities.extend(self._hierarchies.values())
         return entities
 
+    def _include_catalog(self, catalog: str) -> bool:
+        if not self._filter.include_database(catalog):
+            logger.info(f"Ignore catalog {catalog} due to filter config")
+            return False
+        return True
+
+    def _get_connection_pool(self) -> Queue:
+        if self._connection_pool is None:
+            self._connection_pool = create_connection_pool(
+                self._token, self._hostname, self._http_path, self._max_concurrency
+            )
+        return self._connection_pool
+
+    def _fetch_lineage(self, catalog: str) -> Tuple[TableLineageMap, ColumnLineageMap]:
+        with borrow_connection(self._get_connection_pool()) as connection:
+            return (
+                list_table_lineage(connection, catalog),
+                list_column_lineage(connection, catalog),
+            )
+
+    def _fetch_schema_objects(self, catalog: str, schema: str) -> _SchemaObjects:
+        """Fetch the volumes (with their files) and included tables of a schema"""
+        with borrow_connection(self._get_connection_pool()) as connection:
+            volumes = [
+                (volume_info, list_volume_files(connection, volume_info))
+                for volume_info in list_volumes(connection, catalog, schema)
+            ]
+
+            tables = []
+            for table_info in list_tables(connection, catalog, schema):
+                table = table_info.table_name
+                if not self._filter.include_table(catalog, schema, table):
+                    logger.info(
+                        f"Ignore table: {catalog}.{schema}.{table} due to filter config"
+                    )
+                    continue
+                tables.append(table_info)
+
+        return volumes, tables
+
     def _get_table_source_url(
         self, database: str, schema_name: str, table_name: str
     ) -> str:
@@ -516,7 +583,9 @@ class UnityCatalogExtractor(BaseExtractor):
             tags=schema_info.tags,
         )
 
-    def _extract_volume_files(self, volume: VolumeInfo):
+    def _extract_volume_files(
+        self, volume: VolumeInfo, volume_files: List[VolumeFileInfo]
+    ):
         catalog_name = volume.catalog_name
         schema_name = volume.schema_name
         volume_name = volume.volume_name
@@ -532,7 +601,7 @@ class UnityCatalogExtractor(BaseExtractor):
             to_dataset_entity_id_from_logical_id(volume_dataset.logical_id)
         )
 
-        for volume_file_info in list_volume_files(self._connection, volume):
+        for volume_file_info in volume_files:
             volume_file = self._init_volume_file(volume_file_info, volume_entity_id)
             assert volume_dataset.unity_catalog.volume_info.volume_files is not None
 
@@ -666,14 +735,29 @@ class UnityCatalogExtractor(BaseExtractor):
             dataset.system_tags = SystemTags(tags=tags)
 
     def _populate_last_refreshed_time(self):
-        connection_pool = create_connection_pool(
-            self._token, self._hostname, self._http_path, self._max_concurrency
-        )
+        connection_pool = self._get_connection_pool()
+        table_full_names = self._last_refresh_time_queue
+
+        result_map: Dict[str, datetime] = {}
+        if self._bulk_table_metadata:
+            result_map = bulk_get_last_refreshed_time(
+                connection_pool,
+                {name: self._get_last_altered_time(name) for name in table_full_names},
+            )
+            table_full_names = [
+                name for name in table_full_names if name not in result_map
+            ]
+            logger.info(
+                f"Fetched last refreshed time for {len(result_map)} tables in bulk, "
+                f"{len(table_full_names)} left for DESCRIBE HISTORY"
+            )
 
-        result_map = batch_get_last_refreshed_time(
-            connection_pool,
-            self._last_refresh_time_queue,
-            self._describe_history_limit,
+        result_map.update(
+            batch_get_last_refreshed_time(
+                connection_pool,
+                table_full_names,
+                self._describe_history_limit,
+            )
         )
 
         for name, last_refreshed_time in result_map.items():
@@ -685,15 +769,28 @@ class UnityCatalogExtractor(BaseExtractor):
                     last_updated=last_refreshed_time,
                 )
 
+    def _get_last_altered_time(self, name: str) -> Optional[datetime]:
+        dataset = self._datasets.get(name)
+        if dataset is None or dataset.source_info is None:
+            return None
+        return dataset.source_info.last_updated
+
     def _populate_table_properties(self):
-        connection_pool = create_connection_pool(
-            self._token, self._hostname, self._http_path, self._max_concurrency
-        )
+        connection_pool = self._get_connection_pool()
+        table_full_names = self._table_properties_queue
+
+        result_map: Dict[str, Dict[str, str]] = {}
+        if self._bulk_table_metadata:
+            result_map = bulk_get_table_properties(connection_pool, table_full_names)
+            table_full_names = [
+                name for name in table_full_names if name not in result_map
+            ]
+            logger.info(
+                f"Fetched properties for {len(result_map)} tables in bulk, "
+                f"{len(table_full_names)} left for SHOW TBLPROPERTIES"
+            )
 
-        result_map = batch_get_table_properties(
-            connection_pool,
-            self._table_properties_queue,
-        )
+        result_map.update(batch_get_table_properties(connection_pool, table_full_names))
 
         for name, properties in result_map.items():
             dataset = self._datasets.get(name)
@@ -3,6 +3,7 @@ from typing import Collection, Dict, List, Optional, Tuple
 
 from databricks.sql.client import Connection
 
+from metaphor.common.entity_id import dataset_normalized_name
 from metaphor.common.logger import get_logger, json_dump_to_debug_file
 from metaphor.common.utils import start_of_day
 from metaphor.unity_catalog.models import (
@@ -35,6 +36,9 @@ IGNORED_HISTORY_OPERATIONS = {
 }
 """These are the operations that do not modify actual data."""
 
+TABLE_PROPERTIES_PREFIX = "Table Properties: ["
+"""The line listing the table properties in the output of SHOW TABLE EXTENDED"""
+
 
 def list_catalogs(connection: Connection) -> List[CatalogInfo]:
     """
@@ -482,10 +486,10 @@ def list_volume_files(
 
 
 def list_table_lineage(
-    connection: Connection, catalog: str, schema: str, lookback_days=7
+    connection: Connection, catalog: str, lookback_days=7
 ) -> TableLineageMap:
     """
-    Fetch table lineage for a specific schema from system.access.table_lineage table
+    Fetch table lineage for a specific catalog from system.access.table_lineage table
     See https://docs.databricks.com/en/admin/system-tables/lineage.html for more details
     """
 
@@ -499,7 +503,6 @@ def list_table_lineage(
             FROM system.access.table_lineage
             WHERE
                 target_table_catalog = '{catalog}' AND
-                target_table_schema = '{schema}' AND
                 source_table_full_name IS NOT NULL AND
                 event_time > date_sub(now(), {lookback_days})
             GROUP BY
@@ -510,27 +513,23 @@ def list_table_lineage(
         try:
             cursor.execute(query)
         except Exception as error:
-            logger.exception(
-                f"Failed to list table lineage for {catalog}.{schema}: {error}"
-            )
+            logger.exception(f"Failed to list table lineage for {catalog}: {error}")
             return {}
 
         for source_table, target_table in cursor.fetchall():
             lineage = table_lineage.setdefault(target_table.lower(), TableLineage())
             lineage.upstream_tables.append(source_table.lower())
 
-    logger.info(
-        f"Fetched table lineage for {len(table_lineage)} tables in {catalog}.{schema}"
-    )
-    json_dump_to_debug_file(table_lineage, f"table_lineage_{catalog}_{schema}.json")
+    logger.info(f"Fetched table lineage for {len(table_lineage)} tables in {catalog}")
+    json_dump_to_debug_file(table_lineage, f"table_lineage_{catalog}.json")
     return table_lineage
 
 
 def list_column_lineage(
-    connection: Connection, catalog: str, schema: str, lookback_days=7
+    connection: Connection, catalog: str, lookback_days=7
 ) -> ColumnLineageMap:
     """
-    Fetch column lineage for a specific schema from system.access.table_lineage table
+    Fetch column lineage for a specific catalog from system.access.column_lineage table
     See https://docs.databricks.com/en/admin/system-tables/lineage.html for more details
     """
     column_lineage: Dict[str, ColumnLineage] = {}
@@ -545,7 +544,6 @@ def list_column_lineage(
             FROM system.access.column_lineage
             WHERE
                 target_table_catalog = '{catalog}' AND
-                target_table_schema = '{schema}' AND
                 source_table_full_name IS NOT NULL AND
                 event_time > date_sub(now(), {lookback_days})
             GROUP BY
@@ -558,13 +556,9 @@ def list_column_lineage(
         try:
             cursor.execute(query)
         except Exception as error:
-            logger.exception(
-                f"Failed to list column lineage for {catalog}.{schema}: {error}"
-            )
+            logger.exception(f"Failed to list column lineage for {catalog}: {error}")
             return {}
 
-        cursor.execute(query)
-
         for (
             source_table,
             source_column,
@@ -579,10 +573,8 @@ def list_column_lineage(
                 )
             )
 
-    logger.info(
-        f"Fetched column lineage for {len(column_lineage)} tables in {catalog}.{schema}"
-    )
-    json_dump_to_debug_file(column_lineage, f"column_lineage_{catalog}_{schema}.json")
+    logger.info(f"Fetched column lineage for {len(column_lineage)} tables in {catalog}")
+    json_dump_to_debug_file(column_lineage, f"column_lineage_{catalog}.json")
     return column_lineage
 
 
@@ -679,3 +671,93 @@ def get_table_properties(
             properties[row["key"]] = row["value"]
 
     return (table_full_name, properties)
+
+
+def list_table_write_times(
+    connection: Connection,
+    catalog: str,
+    lookback_days: int = 30,
+) -> Dict[str, datetime]:
+    """
+    Fetch the time of the last write to each table in a catalog from
+    system.access.table_lineage
+    See https://docs.databricks.com/en/admin/system-tables/lineage.html
+    """
+    write_times: Dict[str, datetime] = {}
+
+    with connection.cursor() as cursor:
+        query = f"""
+            SELECT
+                target_table_full_name,
+                max(event_time) AS last_write_time
+            FROM system.access.table_lineage
+            WHERE
+                target_table_catalog = %(catalog)s AND
+                target_table_full_name IS NOT NULL AND
+                event_time > date_sub(now(), {lookback_days})
+            GROUP BY target_table_full_name
+        """
+
+        try:
+            cursor.execute(query, {"catalog": catalog})
+        except Exception as error:
+            logger.error(f"Failed to list table write times for {catalog}: {error}")
+            return {}
+
+        for row in cursor.fetchall():
+            write_times[row["target_table_full_name"].lower()] = row["last_write_time"]
+
+    logger.info(f"Fetched write times for {len(write_times)} tables in {catalog}")
+    return write_times
+
+
+def _parse_table_properties(information: str) -> Optional[Dict[str, str]]:
+    """
+    Parse the table properties from the information of SHOW TABLE EXTENDED,
+    e.g. "Table Properties: [key1=value1, key2=value2]". Returns None if
+    they're not listed, or can't be parsed unambiguously.
+    """
+    for line in information.splitlines():
+        if not (line.startswith(TABLE_PROPERTIES_PREFIX) and line.endswith("]")):
+            continue
+
+        content = line[len(TABLE_PROPERTIES_PREFIX) : -1]
+        properties: Dict[str, str] = {}
+        for item in content.split(", ") if content else []:
+            key, separator, value = item.partition("=")
+            if not separator:
+                # A value containing ", ", leave it to SHOW TBLPROPERTIES
+                return None
+            properties[key] = value
+        return properties
+
+    return None
+
+
+def list_table_properties(
+    connection: Connection,
+    catalog: str,
+    schema: str,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Retrieve the properties of all tables in a schema in one query
+    See https://docs.databricks.com/en/sql/language-manual/sql-ref-syntax-aux-show-table.html
+    """
+    properties_map: Dict[str, Dict[str, str]] = {}
+
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(f"SHOW TABLE EXTENDED IN `{catalog}`.`{schema}` LIKE '*'")
+        except Exception as error:
+            logger.error(
+                f"Failed to show table properties for {catalog}.{schema}: {error}"
+            )
+            return {}
+
+        for row in cursor.fetchall():
+            properties = _parse_table_properties(row["information"] or "")
+            if properties is not None:
+                name = dataset_normalized_name(catalog, schema, row["tableName"])
+                properties_map[name] = properties
+
+    return properties_map
@@ -1,7 +1,8 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from queue import Queue
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set
 
 from databricks import sql
 from databricks.sdk import WorkspaceClient
@@ -11,12 +12,10 @@ from databricks.sql.types import Row
 
 from metaphor.common.entity_id import dataset_normalized_name, to_dataset_entity_id
 from metaphor.common.logger import get_logger, json_dump_to_debug_file
+from metaphor.common.sql.analysis import analyze_query
 from metaphor.common.sql.process_query.config import ProcessQueryConfig
-from metaphor.common.sql.query_log import PartialQueryLog, process_and_init_query_log
-from metaphor.common.sql.table_level_lineage.table_level_lineage import (
-    extract_table_level_lineage,
-)
-from metaphor.common.utils import is_email, safe_float
+from metaphor.common.sql.query_log import PartialQueryLog, init_query_log
+from metaphor.common.utils import is_email, safe_float, unique_list
 from metaphor.models.metadata_change_event import (
     DataPlatform,
     Dataset,
@@ -30,10 +29,18 @@ from metaphor.unity_catalog.queries import (
     get_last_refreshed_time,
     get_table_properties,
     list_query_logs,
+    list_table_properties,
+    list_table_write_times,
 )
 
 logger = get_logger()
 
+BULK_REFRESH_TIME_TOLERANCE = timedelta(minutes=5)
+"""
+Max time between the last write to a table and its last alteration, for the
+alteration to be attributed to the write
+"""
+
 
 def batch_get_last_refreshed_time(
     connection_pool: Queue,
@@ -45,12 +52,10 @@ def batch_get_last_refreshed_time(
     with ThreadPoolExecutor(max_workers=connection_pool.maxsize) as executor:
 
         def get_last_refreshed_time_helper(table_full_name: str):
-            connection = connection_pool.get()
-            result = get_last_refreshed_time(
-                connection, table_full_name, describe_history_limit
-            )
-            connection_pool.put(connection)
-            return result
+            with borrow_connection(connection_pool) as connection:
+                return get_last_refreshed_time(
+                    connection, table_full_name, describe_history_limit
+                )
 
         futures = {
             executor.submit(
@@ -84,10 +89,8 @@ def batch_get_table_properties(
     with ThreadPoolExecutor(max_workers=connection_pool.maxsize) as executor:
 
         def get_table_properties_helper(table_full_name: str):
-            connection = connection_pool.get()
-            result = get_table_properties(connection, table_full_name)
-            connection_pool.put(connection)
-            return result
+            with borrow_connection(connection_pool) as connection:
+                return get_table_properties(connection, table_full_name)
 
         futures = {
             executor.submit(
@@ -113,6 +116,68 @@ def batch_get_table_properties(
     return result_map
 
 
+def bulk_get_last_refreshed_time(
+    connection_pool: Queue,
+    last_altered_times: Dict[str, Optional[datetime]],
+) -> Dict[str, datetime]:
+    """
+    Get the last refreshed time of the tables in bulk, with one query per
+    catalog for the last write to each table. A table's last alteration is its
+    last refreshed time if it follows a write, otherwise it may be a metadata
+    change (e.g. OPTIMIZE), and the table is left out for DESCRIBE HISTORY.
+    """
+    catalogs = unique_list(name.split(".")[0] for name in last_altered_times)
+    write_times: Dict[str, datetime] = {}
+
+    def list_table_write_times_helper(catalog: str):
+        with borrow_connection(connection_pool) as connection:
+            return list_table_write_times(connection, catalog)
+
+    with ThreadPoolExecutor(max_workers=connection_pool.maxsize) as executor:
+        for result in executor.map(list_table_write_times_helper, catalogs):
+            write_times.update(result)
+
+    result_map: Dict[str, datetime] = {}
+    for table_full_name, last_altered_time in last_altered_times.items():
+        write_time = write_times.get(table_full_name)
+        if (
+            write_time is not None
+            and last_altered_time is not None
+            and last_altered_time <= write_time + BULK_REFRESH_TIME_TOLERANCE
+        ):
+            result_map[table_full_name] = last_altered_time
+
+    return result_map
+
+
+def bulk_get_table_properties(
+    connection_pool: Queue,
+    table_full_names: List[str],
+) -> Dict[str, Dict[str, str]]:
+    """
+    Get the table properties in bulk, with one query per schema. Tables whose
+    properties can't be parsed are left out for SHOW TBLPROPERTIES.
+    """
+    schemas = unique_list(name.rsplit(".", 1)[0] for name in table_full_names)
+    included = set(table_full_names)
+    result_map: Dict[str, Dict[str, str]] = {}
+
+    def list_table_properties_helper(schema_full_name: str):
+        catalog, schema = schema_full_name.split(".")
+        with borrow_connection(connection_pool) as connection:
+            return list_table_properties(connection, catalog, schema)
+
+    with ThreadPoolExecutor(max_workers=connection_pool.maxsize) as executor:
+        for result in executor.map(list_table_properties_helper, schemas):
+            result_map.update(
+                (name, properties)
+                for name, properties in result.items()
+                if name in included
+            )
+
+    return result_map
+
+
 SPECIAL_CHARACTERS = "&*{}[],=-()+;'\"`"
 """
 The special characters mentioned in Databricks documentation are:
@@ -164,6 +229,18 @@ def create_connection_pool(
     return connection_pool
 
 
+@contextmanager
+def borrow_connection(connection_pool: Queue) -> Iterator[Connection]:
+    """
+    Take a connection from the pool, and put it back once done
+    """
+    connection = connection_pool.get()
+    try:
+        yield connection
+    finally:
+        connection_pool.put(connection)
+
+
 def create_api(host: str, token: str) -> WorkspaceClient:
     return WorkspaceClient(host=host, token=token)
 
@@ -251,10 +328,10 @@ def _to_query_log_with_tll(
     query_id = row["query_id"]
 
     sql = row["query_text"]
-    ttl = extract_table_level_lineage(
+    analysis = analyze_query(
         sql,
-        platform=DataPlatform.UNITY_CATALOG,
-        account=None,
+        DataPlatform.UNITY_CATALOG,
+        process_query_config,
         statement_type=row["query_type"],
         query_id=query_id,
     )
@@ -271,20 +348,20 @@ def _to_query_log_with_tll(
     else:
         user_id = row["email"]
 
-    for source in ttl.sources:
+    for source in analysis.lineage.sources:
         found = find_qualified_dataset(source, datasets)
         if found:
             sources.append(found)
 
-    for target in ttl.targets:
+    for target in analysis.lineage.targets:
         found = find_qualified_dataset(target, datasets)
         if found:
             targets.append(found)
 
-    return process_and_init_query_log(
+    return init_query_log(
         query=sql,
+        processed_sql=analysis.sql,
         platform=DataPlatform.UNITY_CATALOG,
-        process_query_config=process_query_config,
         query_log=PartialQueryLog(
             email=email,
             user_id=user_id,
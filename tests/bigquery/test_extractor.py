@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
@@ -81,8 +82,13 @@ def mock_get_table(mock_build_client, tables):
 
 
 def mock_list_entries(mock_build_log_client, entries):
+    # The log is read in time slices, only return the entries for one of them
+    remaining = [entries]
+    lock = threading.Lock()
+
     def side_effect(page_size, filter_):
-        return entries
+        with lock:
+            return remaining.pop() if remaining else []
 
     mock_build_log_client.return_value.list_entries.side_effect = side_effect
 
@@ -101,7 +107,7 @@ async def test_extractor(
         output=OutputConfig(),
         key_path="fake_file",
         project_ids=["fake_project"],
-        query_log=BigQueryQueryLogConfig(),
+        query_log=BigQueryQueryLogConfig(max_requests_per_minute=60_000),
         lineage=BigQueryLineageConfig(
             enable_lineage_from_log=False,
             enable_view_lineage=False,
@@ -210,11 +216,13 @@ async def test_extractor(
 @patch("metaphor.bigquery.extractor.build_client")
 @patch("metaphor.bigquery.extractor.build_logging_client")
 @patch("metaphor.bigquery.extractor.get_credentials")
+@pytest.mark.parametrize("view_parse_workers", [0, 2])
 @pytest.mark.asyncio
 async def test_extract_view_upstream(
     mock_get_credentials: MagicMock,
     mock_build_logging_client: MagicMock,
     mock_build_client: MagicMock,
+    view_parse_workers: int,
     test_root_dir: str,
 ) -> None:
     config = BigQueryRunConfig(
@@ -223,6 +231,7 @@ async def test_extract_view_upstream(
         key_path="fake_file",
         lineage=BigQueryLineageConfig(
             enable_lineage_from_log=False,
+            view_parse_workers=view_parse_workers,
         ),
     )
     extractor = BigQueryExtractor(config)
@@ -275,6 +284,9 @@ async def test_extract_view_upstream(
 
     assert events == load_json(f"{test_root_dir}/bigquery/data/view_result.json")
 
+    # Each table is only fetched once for both the schema and view lineage
+    assert mock_build_client.return_value.get_table.call_count == 3
+
 
 @patch("metaphor.bigquery.extractor.build_client")
 @patch("metaphor.bigquery.extractor.build_logging_client")
@@ -290,6 +302,7 @@ async def test_log_extractor(
         project_ids=["project1"],
         output=OutputConfig(),
         key_path="fake_file",
+        query_log=BigQueryQueryLogConfig(max_requests_per_minute=60_000),
         lineage=BigQueryLineageConfig(
             enable_view_lineage=False,
             include_self_lineage=True,
@@ -309,3 +322,81 @@ async def test_log_extractor(
     events = [EventUtil.trim_event(e) for e in await extractor.extract()]
 
     assert events == load_json(test_root_dir + "/bigquery/data/result.json")
+
+    # The audit log is read once for both the lineage and query logs
+    list_entries = mock_build_logging_client.return_value.list_entries
+    assert list_entries.call_count == 24
+    assert all(
+        "gserviceaccount" not in c.kwargs["filter_"] for c in list_entries.mock_calls
+    )
+
+    query_logs = list(extractor.collect_query_logs())
+    assert list_entries.call_count == 24
+    assert [log.query_id for log in query_logs] == [
+        "projects/metaphor-data/jobs/7526798f-8072-446d-bdf1-ac1acb4d8591"
+    ]
+
+
+@patch("metaphor.bigquery.extractor.build_client")
+@patch("metaphor.bigquery.extractor.build_logging_client")
+@patch("metaphor.bigquery.extractor.get_credentials")
+@pytest.mark.asyncio
+async def test_extract_multiple_projects(
+    mock_get_credentials: MagicMock,
+    mock_build_logging_client: MagicMock,
+    mock_build_client: MagicMock,
+) -> None:
+    config = BigQueryRunConfig(
+        project_ids=["project1", "project2"],
+        output=OutputConfig(),
+        key_path="fake_file",
+        max_concurrency=3,
+        query_log=BigQueryQueryLogConfig(lookback_days=0),
+        lineage=BigQueryLineageConfig(
+            enable_lineage_from_log=False, enable_view_lineage=False
+        ),
+    )
+    extractor = BigQueryExtractor(config)
+
+    def build_client(project_id, credentials):
+        client = MagicMock()
+        client.project = project_id
+        client.list_datasets.return_value = [
+            mock_dataset("dataset1"),
+            mock_dataset("dataset2"),
+        ]
+        client.list_tables.side_effect = lambda dataset_id: [
+            mock_table(dataset_id, f"{project_id}_table{i}") for i in range(3)
+        ]
+        client.get_table.side_effect = lambda ref: mock_table_full(
+            dataset_id=ref.dataset_id,
+            table_id=ref.table_id,
+            table_type="TABLE",
+            description="",
+        )
+
+        def query(sql, project):
+            # Returns the DDL of the tables in the dataset being queried
+            dataset_id = sql.split(".")[1]
+            result = MagicMock()
+            result.result.return_value = [
+                (f"{project_id}_table{i}", f"DDL {dataset_id}.{i}") for i in range(3)
+            ]
+            return result
+
+        client.query.side_effect = query
+        return client
+
+    mock_build_client.side_effect = build_client
+
+    events = await extractor.extract()
+
+    assert [(e.logical_id.name, e.schema.sql_schema.table_schema) for e in events] == [
+        (
+            f"{project_id}.{dataset_id}.{project_id}_table{i}",
+            f"DDL {dataset_id}.{i}",
+        )
+        for project_id in ["project1", "project2"]
+        for dataset_id in ["dataset1", "dataset2"]
+        for i in range(3)
+    ]
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from google.cloud import bigquery
+
+from metaphor.bigquery.job_query_resolver import JobQueryResolver
+
+
+def test_job_query_resolver():
+    client = MagicMock()
+
+    def get_job(job_id, project):
+        if job_id == "missing":
+            raise ValueError
+        return bigquery.QueryJob(job_id=job_id, query=f"SELECT {job_id}", client=client)
+
+    client.get_job.side_effect = get_job
+    resolver = JobQueryResolver(client, max_workers=2)
+
+    resolver.resolve(
+        [
+            "projects/p/jobs/1",
+            "projects/p/jobs/2",
+            "projects/p/jobs/1",
+            "projects/p/jobs/missing",
+        ]
+    )
+    assert client.get_job.call_count == 3
+    assert resolver.resolved == 2
+    assert resolver.truncated == 1
+
+    # Cached
+    resolver.resolve(["projects/p/jobs/1", "projects/p/jobs/missing"])
+    assert resolver.get("projects/p/jobs/1") == "SELECT 1"
+    assert resolver.get("projects/p/jobs/missing") is None
+    assert client.get_job.call_count == 3
+
+    # Not resolved in a batch
+    assert resolver.get("projects/p/jobs/3") == "SELECT 3"
+    assert client.get_job.call_count == 4
+    assert resolver.resolved == 3
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from metaphor.bigquery.config import BigQueryRunConfig
+from metaphor.bigquery.log_filter import build_list_entries_filter
+from metaphor.bigquery.log_reader import read_job_change_events
+from metaphor.common.base_config import OutputConfig
+from metaphor.common.rate_limiter import TokenBucket
+
+
+def test_build_list_entries_filter():
+    config = BigQueryRunConfig(
+        project_ids=["project1"], output=OutputConfig(), key_path="fake_file"
+    )
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 1, 1, tzinfo=timezone.utc)
+
+    audit_log = build_list_entries_filter("audit_log", config, start, end)
+    assert '/datasets/_"' in audit_log
+    assert 'timestamp>="2024-01-01T00:00:00+00:00"' in audit_log
+    assert 'timestamp<"2024-01-01T01:00:00+00:00"' in audit_log
+
+    config.query_log.exclude_service_accounts = True
+    assert "gserviceaccount" in build_list_entries_filter("query_log", config)
+
+    all_entries = build_list_entries_filter("all", config)
+    assert "gserviceaccount" not in all_entries
+    assert '/datasets/_"' not in all_entries
+
+
+@patch("metaphor.bigquery.log_reader.JobChangeEvent.from_entry", lambda e: e)
+def test_read_job_change_events():
+    config = BigQueryRunConfig(
+        project_ids=["project1"],
+        output=OutputConfig(),
+        key_path="fake_file",
+        max_concurrency=3,
+    )
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+
+    def list_entries(page_size, filter_):
+        # Return the start hour of the slice twice
+        hour = filter_.split('timestamp>="2024-01-01T')[1][:2]
+        return [hour, hour]
+
+    logging_client = MagicMock()
+    logging_client.list_entries.side_effect = list_entries
+    rate_limiter = MagicMock(spec=TokenBucket)
+
+    events = list(
+        read_job_change_events(
+            logging_client, "query_log", config, 2, rate_limiter, start, end
+        )
+    )
+
+    # One slice per hour, merged in order
+    assert events == [f"{hour:02d}" for hour in range(10) for _ in range(2)]
+
+    # One request per slice, then one for the next page
+    assert rate_limiter.acquire.call_count == 20
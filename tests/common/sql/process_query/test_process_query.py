@@ -1,9 +1,11 @@
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import sqlglot
 
 from metaphor.common.sql.dialect import PLATFORM_TO_DIALECT
+from metaphor.common.sql.parse import ParseLimitsConfig, ParseTimeoutError
 from metaphor.common.sql.process_query import process_query
 from metaphor.common.sql.process_query.config import (
     ProcessQueryConfig,
@@ -93,6 +95,33 @@ def test_skip_unparseable_queries():
     assert processed == sql
 
 
+def test_skip_queries_exceeding_parse_limits():
+    sql = "SELECT a, b, c FROM db.sch.tab WHERE a = 1"
+    limited_config = ProcessQueryConfig(
+        redact_literals=RedactPIILiteralsConfig(enabled=True),
+        parse_limits=ParseLimitsConfig(max_tokens=5),
+    )
+
+    with patch(
+        "metaphor.common.sql.parse.maybe_parse", wraps=sqlglot.maybe_parse
+    ) as mock_parse:
+        assert process_query(sql, DataPlatform.SNOWFLAKE, limited_config) == sql
+
+        limited_config.skip_unparsable_queries = True
+        assert process_query(sql, DataPlatform.SNOWFLAKE, limited_config) is None
+
+        mock_parse.assert_not_called()
+
+
+def test_skip_queries_parser_timeout():
+    with patch(
+        "metaphor.common.sql.process_query.process_query.parse_query",
+        side_effect=ParseTimeoutError,
+    ):
+        sql = "SELECT * FROM db.sch.tab WHERE id = 1"
+        assert process_query(sql, DataPlatform.SNOWFLAKE, config) == sql
+
+
 def test_ignore_rollback():
     assert (
         process_query(
@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+import sqlglot
+
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.process_query.config import (
+    ProcessQueryConfig,
+    RedactPIILiteralsConfig,
+)
+from metaphor.models.metadata_change_event import DataPlatform
+
+config = ProcessQueryConfig(
+    redact_literals=RedactPIILiteralsConfig(enabled=True, placeholder_literal="x"),
+)
+
+
+def test_analyze_query_parses_once():
+    with patch(
+        "metaphor.common.sql.parse.maybe_parse", wraps=sqlglot.maybe_parse
+    ) as mock_parse:
+        analysis = analyze_query(
+            "INSERT INTO foo SELECT * FROM bar WHERE id = 1",
+            DataPlatform.SNOWFLAKE,
+            config,
+            default_database="db",
+            default_schema="sc",
+        )
+
+    assert mock_parse.call_count == 1
+    assert analysis.sql == "INSERT INTO foo SELECT * FROM bar WHERE id = 'x'"
+    assert [target.table for target in analysis.lineage.targets] == ["foo"]
+    assert [source.table for source in analysis.lineage.sources] == ["bar"]
+    assert analysis.statement_type == "insert"
+    assert analysis.error is None
+
+
+def test_analyze_query_without_parsing():
+    with patch("metaphor.common.sql.parse.maybe_parse") as mock_parse:
+        analysis = analyze_query(
+            "SELECT 1",
+            DataPlatform.SNOWFLAKE,
+            ProcessQueryConfig(),
+            extract_lineage=False,
+        )
+
+    mock_parse.assert_not_called()
+    assert analysis.sql == "SELECT 1"
+
+
+def test_analyze_query_statement_type_without_lineage():
+    analysis = analyze_query(
+        "SELECT * FROM foo",
+        DataPlatform.UNITY_CATALOG,
+        ProcessQueryConfig(),
+        statement_type="SELECT",
+    )
+    assert analysis.sql == "SELECT * FROM foo"
+    assert analysis.lineage.sources == []
+    assert analysis.statement_type is None
+
+
+def test_analyze_unparsable_query():
+    sql = "INSERT INTO foo SELECT (("
+
+    analysis = analyze_query(sql, DataPlatform.SNOWFLAKE, ProcessQueryConfig())
+    assert analysis.sql == sql
+    assert analysis.error is not None
+
+    analysis = analyze_query(
+        sql,
+        DataPlatform.SNOWFLAKE,
+        ProcessQueryConfig(ignore_command_statement=True, skip_unparsable_queries=True),
+    )
+    assert analysis.sql is None
+    assert analysis.error is not None
+
+
+def test_analyze_query_exceeding_parse_limits():
+    sql = "INSERT INTO foo VALUES " + ", ".join(f"({i})" for i in range(2000))
+    with patch("metaphor.common.sql.parse.maybe_parse") as mock_parse:
+        analysis = analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+
+    mock_parse.assert_not_called()
+    assert analysis.sql == sql
+    assert analysis.error == "INSERT ... VALUES with more than 1000 rows"
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+import sqlglot
+
+from metaphor.common.sql.analysis import analyze_query
+from metaphor.common.sql.cache import QueryCache, QueryCacheConfig
+from metaphor.common.sql.process_query.config import (
+    ProcessQueryConfig,
+    RedactPIILiteralsConfig,
+)
+from metaphor.models.metadata_change_event import DataPlatform
+
+
+def test_query_cache_lru():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    # "b" is the least recently used entry
+    cache.put("c", {"value": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+def test_query_cache_on_disk(tmp_path):
+    cache = QueryCache(max_entries=1, directory=str(tmp_path))
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+
+    # Evicted from memory but still on disk
+    assert cache.get("a") == {"value": 1}
+    cache.flush()
+
+    # Persisted across runs
+    another_cache = QueryCache(max_entries=1, directory=str(tmp_path))
+    assert another_cache.get("b") == {"value": 2}
+    assert another_cache.get("c") is None
+
+
+def test_query_cache_key_versioned():
+    key = QueryCache.make_key("snowflake", "sql")
+    assert QueryCache.make_key("snowflake", "sql") == key
+
+    # Results cached by another version of sqlglot or the connectors are ignored
+    with patch("metaphor.common.sql.cache.CACHE_VERSION", "0.0.0/0.0.0"):
+        assert QueryCache.make_key("snowflake", "sql") != key
+
+
+def test_analyze_query_cached(tmp_path):
+    config = ProcessQueryConfig(
+        redact_literals=RedactPIILiteralsConfig(enabled=True, placeholder_literal="x"),
+        cache=QueryCacheConfig(directory=str(tmp_path)),
+    )
+    sql = "INSERT INTO cached_foo SELECT * FROM cached_bar WHERE id = 1"
+
+    with patch(
+        "metaphor.common.sql.parse.maybe_parse", wraps=sqlglot.maybe_parse
+    ) as mock_parse:
+        first = analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+        second = analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+        assert mock_parse.call_count == 1
+
+        # Different default schema resolves to different tables
+        analyze_query(sql, DataPlatform.SNOWFLAKE, config, default_schema="sc")
+        assert mock_parse.call_count == 2
+
+        # Different config produces a different processed query
+        config.redact_literals.placeholder_literal = "y"
+        third = analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+        assert mock_parse.call_count == 3
+
+    assert first == second
+    assert first.sql == "INSERT INTO cached_foo SELECT * FROM cached_bar WHERE id = 'x'"
+    assert [target.table for target in first.lineage.targets] == ["cached_foo"]
+    assert [source.table for source in first.lineage.sources] == ["cached_bar"]
+    assert third.sql == "INSERT INTO cached_foo SELECT * FROM cached_bar WHERE id = 'y'"
+
+
+def test_analyze_query_cache_disabled():
+    config = ProcessQueryConfig(
+        redact_literals=RedactPIILiteralsConfig(enabled=True),
+        cache=QueryCacheConfig(enabled=False),
+    )
+    sql = "SELECT * FROM uncached WHERE id = 1"
+
+    with patch(
+        "metaphor.common.sql.parse.maybe_parse", wraps=sqlglot.maybe_parse
+    ) as mock_parse:
+        analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+        analyze_query(sql, DataPlatform.SNOWFLAKE, config)
+
+    assert mock_parse.call_count == 2
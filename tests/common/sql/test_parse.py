@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from metaphor.common.sql.parse import (
+    ParseLimitsConfig,
+    ParseTimeoutError,
+    check_parse_limits,
+    parse_query,
+)
+
+
+def _busy_parse(sql, dialect):
+    while True:
+        time.sleep(0.001)
+
+
+def test_check_parse_limits():
+    limits = ParseLimitsConfig(max_length=100, max_tokens=20, max_insert_values_rows=2)
+
+    assert check_parse_limits("SELECT a FROM b", limits) is None
+    assert check_parse_limits("SELECT " + "a" * 100, limits) == (
+        "query too long (107 characters)"
+    )
+    assert check_parse_limits("SELECT a, b, c, d, e, f, g, h, i, j FROM k", limits) == (
+        "query has more than 20 tokens"
+    )
+    assert check_parse_limits("INSERT INTO t VALUES (1), (2)", limits) is None
+    assert check_parse_limits("/* x */ insert t values (1),(2),(3)", limits) == (
+        "INSERT ... VALUES with more than 2 rows"
+    )
+    assert check_parse_limits("SELECT (1), (2), (3)", limits) is None
+
+    assert check_parse_limits("SELECT " + "a" * 100, ParseLimitsConfig(0, 0, 0)) is None
+
+
+def test_parse_query():
+    assert parse_query("SELECT a FROM b", "snowflake").sql() == "SELECT a FROM b"
+
+
+def test_parse_query_timeout():
+    threads = threading.active_count()
+
+    with patch("metaphor.common.sql.parse.maybe_parse", _busy_parse):
+        for _ in range(3):
+            with pytest.raises(ParseTimeoutError):
+                parse_query("SELECT 1", None, timeout=0.05)
+
+        # Also works outside of the main thread
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(parse_query, "SELECT 1", None, 0.05) for _ in range(4)
+            ]
+            for future in futures:
+                with pytest.raises(ParseTimeoutError):
+                    future.result()
+
+    # Only the watchdog thread is left behind
+    assert threading.active_count() <= threads + 1
+
+    # Not interrupted after the parsing is done
+    assert parse_query("SELECT 1", None, timeout=0.05).sql() == "SELECT 1"
+    time.sleep(0.1)
@@ -0,0 +1,44 @@
+import pytest
+
+from metaphor.common.sql.process_query.config import ProcessQueryConfig
+from metaphor.common.sql.query_log import (
+    PartialQueryLog,
+    QueryLogTask,
+    process_query_logs,
+)
+from metaphor.models.metadata_change_event import DataPlatform, QueriedDataset
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_process_query_logs(max_workers: int):
+    config = ProcessQueryConfig(
+        ignore_command_statement=True, max_workers=max_workers, batch_size=3
+    )
+
+    tasks = [
+        QueryLogTask(
+            query=(
+                "CREATE USER foo" if i % 5 == 0 else f"INSERT INTO t{i} SELECT * FROM s"
+            ),
+            query_log=PartialQueryLog(default_database="db", default_schema="sc"),
+            query_id=str(i),
+            extract_lineage=True,
+        )
+        for i in range(20)
+    ]
+
+    query_logs = list(process_query_logs(tasks, DataPlatform.SNOWFLAKE, config))
+
+    # Commands are filtered out, the rest are in the original order
+    assert [query_log.query_id for query_log in query_logs] == [
+        str(i) for i in range(20) if i % 5 != 0
+    ]
+    assert query_logs[0].id == "SNOWFLAKE:1"
+    assert query_logs[0].sources == [
+        QueriedDataset(
+            id="DATASET~2BF7A908A1E1712539FC74330513F954",
+            database="db",
+            schema="sc",
+            table="s",
+        )
+    ]
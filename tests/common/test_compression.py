@@ -0,0 +1,84 @@
+import gzip
+import io
+from unittest.mock import patch
+
+import pytest
+
+from metaphor.common.compression import (
+    CompressedWriter,
+    Compression,
+    check_compression_available,
+    file_suffix,
+)
+
+
+def test_file_suffix():
+    assert file_suffix(None) == ""
+    assert file_suffix(Compression.GZIP) == ".gz"
+    assert file_suffix(Compression.ZSTD) == ".zst"
+
+
+def test_uncompressed_writer():
+    buffer = io.BytesIO()
+    writer = CompressedWriter(buffer, None)
+    writer.write(b"foo")
+    writer.write(b"bar")
+    writer.close()
+
+    assert buffer.getvalue() == b"foobar"
+    assert writer.raw_bytes == writer.compressed_bytes() == 6
+
+
+def test_gzip_writer():
+    buffer = io.BytesIO()
+    writer = CompressedWriter(buffer, Compression.GZIP)
+    for _ in range(1000):
+        writer.write(b"foobar")
+    writer.close()
+
+    assert gzip.decompress(buffer.getvalue()) == b"foobar" * 1000
+    assert writer.raw_bytes == 6000
+    assert writer.compressed_bytes() < writer.raw_bytes
+    assert not buffer.closed
+
+
+def test_zstd_writer():
+    zstandard = pytest.importorskip("zstandard")
+
+    buffer = io.BytesIO()
+    writer = CompressedWriter(buffer, Compression.ZSTD)
+    writer.write(b"foobar" * 1000)
+    writer.close()
+
+    assert (
+        zstandard.ZstdDecompressor().stream_reader(buffer.getvalue()).read()
+        == b"foobar" * 1000
+    )
+    assert not buffer.closed
+
+
+def test_gzip_writer_compressed_bytes():
+    buffer = io.BytesIO()
+    writer = CompressedWriter(buffer, Compression.GZIP)
+    writer.write(b"foobar" * 1000)
+
+    # Upper bound is returned while it's below the limit
+    assert writer.compressed_bytes(limit=10000) == buffer.tell() + 6000
+
+    # Otherwise the encoder is flushed to get the exact size
+    exact = writer.compressed_bytes(limit=100)
+    assert exact == buffer.tell() < 100
+    assert writer.compressed_bytes() == exact
+
+    writer.write(b"foobar")
+    writer.close()
+    assert gzip.decompress(buffer.getvalue()) == b"foobar" * 1001
+
+
+def test_zstd_unavailable():
+    with patch("metaphor.common.compression.zstandard", None):
+        check_compression_available(Compression.GZIP)
+        with pytest.raises(ImportError):
+            check_compression_available(Compression.ZSTD)
+        with pytest.raises(ImportError):
+            CompressedWriter(io.BytesIO(), Compression.ZSTD)
@@ -1,4 +1,8 @@
-from metaphor.common.event_util import EventUtil
+from unittest.mock import patch
+
+import pytest
+
+from metaphor.common.event_util import EventUtil, get_mce_validator
 from metaphor.models.metadata_change_event import (
     API,
     Dashboard,
@@ -69,3 +73,46 @@ def test_trim_event():
     assert event_utils.trim_event(
         Hierarchy(logical_id=HierarchyLogicalID(path=["a", "b"]))
     ) == {"logicalId": {"path": ["a", "b"]}}
+
+
+def test_validator_is_cached():
+    assert EventUtil()._validator is EventUtil()._validator
+    assert get_mce_validator() is EventUtil()._validator
+
+
+def test_validate_messages():
+    event_utils = EventUtil()
+
+    valid = event_utils.build_then_trim(
+        Hierarchy(logical_id=HierarchyLogicalID(path=["a", "b"]))
+    )
+    invalid = {"hierarchy": {"logicalId": {"path": "not a list"}}}
+
+    assert event_utils.validate_messages([valid, invalid]) == [valid]
+    assert event_utils.validate_messages([valid, invalid], max_workers=2) == [valid]
+
+    # The valid messages are the originals, not copies sent back by the workers
+    (validated,) = event_utils.validate_messages([valid, invalid], max_workers=2)
+    assert validated is valid
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_validate_message_stream(max_workers):
+    event_utils = EventUtil()
+
+    valid = [
+        event_utils.build_then_trim(
+            Hierarchy(logical_id=HierarchyLogicalID(path=["a", str(i)]))
+        )
+        for i in range(5)
+    ]
+    invalid = {"hierarchy": {"logicalId": {"path": "not a list"}}}
+    messages = valid[:2] + [invalid] + valid[2:]
+
+    with patch("metaphor.common.event_util.VALIDATION_CHUNK_SIZE", 2):
+        validated = list(
+            event_utils.validate_message_stream(iter(messages), max_workers)
+        )
+
+    assert validated == valid
+    assert all(a is b for a, b in zip(validated, valid))
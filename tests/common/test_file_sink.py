@@ -1,13 +1,22 @@
+import gzip
 import json
 import tempfile
 from datetime import datetime
 from os import path
+from unittest.mock import patch
 from zipfile import ZipFile
 
+import pytest
 from freezegun import freeze_time
 
+from metaphor.common.compression import Compression
 from metaphor.common.event_util import EventUtil
-from metaphor.common.file_sink import FileSink, FileSinkConfig
+from metaphor.common.file_sink import (
+    FileSink,
+    FileSinkConfig,
+    json_array_item_size,
+    to_json_bytes,
+)
 from metaphor.common.logger import add_debug_file
 from metaphor.common.utils import md5_digest
 from metaphor.models.crawler_run_metadata import CrawlerRunMetadata, RunStatus
@@ -25,8 +34,27 @@ def events_from_json(file):
     return [MetadataChangeEvent.from_dict(json) for json in load_json(file)]
 
 
+@pytest.fixture(params=["orjson", "json"])
+def json_library(request):
+    """Run the test with orjson, and with the json module as if it's missing"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        yield request.param
+    else:
+        with patch("metaphor.common.file_sink.orjson", None):
+            yield request.param
+
+
+def test_to_json_bytes(json_library):
+    value = {"name": "caf\u00e9", "values": [1, 2.5, None, True], "nested": {}}
+    assert (
+        to_json_bytes(value)
+        == '{"name":"caf\u00e9","values":[1,2.5,null,true],"nested":{}}'.encode()
+    )
+
+
 @freeze_time("2000-01-01")
-def test_file_sink_no_split(test_root_dir):
+def test_file_sink_no_split(test_root_dir, json_library):
     directory = tempfile.mkdtemp()
 
     messages = [
@@ -47,6 +75,11 @@ def test_file_sink_no_split(test_root_dir):
     assert sink.write_events(messages) is True
     assert messages == events_from_json(f"{directory}/946684800/1-of-1.json")
 
+    # Same bytes with or without orjson
+    events = [EventUtil.trim_event(message) for message in messages]
+    with open(f"{directory}/946684800/1-of-1.json", "rb") as f:
+        assert f.read() == json.dumps(events, separators=(",", ":")).encode()
+
 
 @freeze_time("2000-01-01")
 def test_file_sink_split(test_root_dir):
@@ -90,6 +123,129 @@ def test_file_sink_split(test_root_dir):
     assert messages[4:5] == events_from_json(f"{directory}/946684800/5-of-5.json")
 
 
+@freeze_time("2000-01-01")
+def test_file_sink_split_exact_bytes(test_root_dir, json_library):
+    directory = tempfile.mkdtemp()
+
+    messages = [
+        MetadataChangeEvent(
+            dataset=Dataset(
+                logical_id=DatasetLogicalID(
+                    name=f"foo{i}", platform=DataPlatform.BIGQUERY
+                )
+            )
+        )
+        for i in range(4)
+    ]
+
+    # Exactly two messages fit in each file
+    record_size = json_array_item_size(to_json_bytes(EventUtil.trim_event(messages[0])))
+    sink = FileSink(
+        FileSinkConfig(directory=directory, batch_size_bytes=record_size * 2)
+    )
+    assert sink.write_events(messages) is True
+    assert messages[0:2] == events_from_json(f"{directory}/946684800/1-of-2.json")
+    assert messages[2:4] == events_from_json(f"{directory}/946684800/2-of-2.json")
+
+
+@freeze_time("2000-01-01")
+@pytest.mark.parametrize("validation_processes", [0, 2])
+def test_file_sink_stream_split(test_root_dir, validation_processes, json_library):
+    directory = tempfile.mkdtemp()
+
+    messages = [
+        MetadataChangeEvent(
+            dataset=Dataset(
+                logical_id=DatasetLogicalID(
+                    name=f"foo{i}", platform=DataPlatform.BIGQUERY
+                )
+            )
+        )
+        for i in range(5)
+    ]
+
+    # Limit each file to 2 messages
+    sink = FileSink(
+        FileSinkConfig(
+            directory=directory,
+            batch_size_count=2,
+            batch_size_bytes=1000000,
+            validation_processes=validation_processes,
+        )
+    )
+    assert sink.write_event_stream(iter(messages)) == 5
+    assert messages[0:2] == events_from_json(f"{directory}/946684800/1-of-3.json")
+    assert messages[2:4] == events_from_json(f"{directory}/946684800/2-of-3.json")
+    assert messages[4:5] == events_from_json(f"{directory}/946684800/3-of-3.json")
+
+
+@freeze_time("2000-01-01")
+def test_file_sink_gzip(test_root_dir):
+    directory = tempfile.mkdtemp()
+
+    messages = [
+        MetadataChangeEvent(
+            dataset=Dataset(
+                logical_id=DatasetLogicalID(
+                    name=f"foo{i}", platform=DataPlatform.BIGQUERY
+                )
+            )
+        )
+        for i in range(3)
+    ]
+
+    sink = FileSink(
+        FileSinkConfig(
+            directory=directory, batch_size_count=2, compression=Compression.GZIP
+        )
+    )
+    assert sink.write_events(messages) is True
+
+    def events_from_gzip(file):
+        with gzip.open(file) as f:
+            return [MetadataChangeEvent.from_dict(e) for e in json.loads(f.read())]
+
+    assert messages[0:2] == events_from_gzip(f"{directory}/946684800/1-of-2.json.gz")
+    assert messages[2:3] == events_from_gzip(f"{directory}/946684800/2-of-2.json.gz")
+
+
+@freeze_time("2000-01-01")
+def test_file_sink_compressed_batch_size(test_root_dir):
+    directory = tempfile.mkdtemp()
+
+    # Highly repetitive records compress well below their raw size
+    messages = [
+        MetadataChangeEvent(
+            dataset=Dataset(
+                logical_id=DatasetLogicalID(
+                    name="foo" * 1000, platform=DataPlatform.BIGQUERY
+                )
+            )
+        )
+        for _ in range(10)
+    ]
+    raw_size = json_array_item_size(to_json_bytes(EventUtil.trim_event(messages[0])))
+
+    sink = FileSink(
+        FileSinkConfig(
+            directory=directory,
+            batch_size_bytes=raw_size * 5,
+            compression=Compression.GZIP,
+            compressed_batch_size=True,
+        )
+    )
+    assert sink.write_event_stream(iter(messages)) == 10
+
+    files = sink._storage.list_files(sink.path, ".json.gz")
+    assert files == [f"{sink.path}/1-of-1.json.gz"]
+
+
+def test_file_sink_config_zstd_unavailable():
+    with patch("metaphor.common.compression.zstandard", None):
+        with pytest.raises(ImportError):
+            FileSinkConfig(directory="/tmp", compression=Compression.ZSTD)
+
+
 @freeze_time("2000-01-01")
 def test_sink_metadata(test_root_dir):
     directory = tempfile.mkdtemp()
@@ -185,7 +341,67 @@ def test_query_log_sink_chunk_by_count():
                 assert len(mce["queryLogs"]["logs"]) < 3
 
 
-def test_query_log_sink_chunk_by_size():
+def test_query_log_sink_concurrent_upload():
+    directory = tempfile.mkdtemp()
+
+    sink = FileSink(
+        FileSinkConfig(
+            directory=directory,
+            batch_size_count=1,
+            query_log_batch_size_count=1,
+            upload_concurrency=4,
+        )
+    )
+    with sink.get_query_log_sink() as query_log_sink:
+        for query_id in range(10):
+            query_log_sink.write_query_log(
+                QueryLog(
+                    id=f"{DataPlatform.SNOWFLAKE.name}:{query_id}",
+                    query_id=str(query_id),
+                    platform=DataPlatform.SNOWFLAKE,
+                    sql="select 1",
+                )
+            )
+
+    for i in range(10):
+        with open(f"{sink.path}/query_logs-{i}.json") as f:
+            assert json.loads(f.read())[0]["queryLogs"]["logs"][0]["queryId"] == str(i)
+
+
+def test_query_log_sink_gzip():
+    directory = tempfile.mkdtemp()
+
+    sink = FileSink(
+        FileSinkConfig(
+            directory=directory,
+            batch_size_count=2,
+            query_log_batch_size_count=2,
+            compression=Compression.GZIP,
+        )
+    )
+    with sink.get_query_log_sink() as query_log_sink:
+        for query_id in range(7):
+            query_log_sink.write_query_log(
+                QueryLog(
+                    id=f"{DataPlatform.SNOWFLAKE.name}:{query_id}",
+                    query_id=str(query_id),
+                    platform=DataPlatform.SNOWFLAKE,
+                    sql="select 1",
+                )
+            )
+
+    files = sorted(sink._storage.list_files(sink.path, ".json.gz"))
+    assert len(files) == 2
+
+    query_ids = []
+    for file in files:
+        with gzip.open(file) as f:
+            for mce in json.loads(f.read()):
+                query_ids.extend(log["queryId"] for log in mce["queryLogs"]["logs"])
+    assert query_ids == [str(i) for i in range(7)]
+
+
+def test_query_log_sink_chunk_by_size(json_library):
     directory = tempfile.mkdtemp()
 
     sink = FileSink(FileSinkConfig(directory=directory, batch_size_bytes=300))
@@ -1,7 +1,12 @@
+import os
+
 import pytest
+from git import Actor, Repo
 from pydantic import ValidationError
 
-from metaphor.common.git import GitRepoConfig, _generate_git_url
+from metaphor.common.git import GitRepoConfig, _generate_git_url, clone_repo
+
+author = Actor("test", "test@example.com")
 
 
 def test_sampling_config():
@@ -54,3 +59,117 @@ def test_sampling_config():
             git_url="https://github.com/foo/looker.git",
             username="foo",
         )
+
+    assert (
+        _generate_git_url(
+            GitRepoConfig(
+                git_url="file:///tmp/repo.git",
+                username="foo",
+                password="bar",
+            )
+        )
+        == "file:///tmp/repo.git"
+    )
+
+
+def _commit(repo: Repo, files: dict, message: str) -> None:
+    for path, content in files.items():
+        full_path = os.path.join(str(repo.working_tree_dir), path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    repo.index.add(list(files.keys()))
+    repo.index.commit(message, author=author, committer=author)
+    repo.remotes.origin.push("HEAD:main")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """A local bare repo & a clone to push commits to it"""
+    bare = Repo.init(tmp_path / "upstream.git", bare=True, initial_branch="main")
+    work = Repo.init(tmp_path / "work", initial_branch="main")
+    work.create_remote("origin", bare.git_dir)
+
+    _commit(work, {"README.md": "readme", "other/file.txt": "other"}, "first")
+    _commit(work, {"lookml/model.model.lkml": "model"}, "second")
+    return work
+
+
+def _config(upstream: Repo, **kwargs) -> GitRepoConfig:
+    return GitRepoConfig(
+        git_url=f"file://{upstream.remotes.origin.url}",
+        username="foo",
+        access_token="bar",
+        **kwargs,
+    )
+
+
+def test_clone_repo(upstream, tmp_path):
+    local_dir = str(tmp_path / "clone")
+    path = clone_repo(_config(upstream, project_path="lookml"), local_dir)
+
+    assert path == os.path.join(local_dir, "lookml")
+    assert os.listdir(path) == ["model.model.lkml"]
+
+    # Only the project path is checked out, along with the top-level files
+    assert os.path.exists(os.path.join(local_dir, "README.md"))
+    assert not os.path.exists(os.path.join(local_dir, "other"))
+
+    # Only the latest commit is fetched
+    assert [c.message for c in Repo(local_dir).iter_commits()] == ["second"]
+
+
+def test_clone_full_repo(upstream, tmp_path):
+    local_dir = str(tmp_path / "clone")
+    config = _config(upstream, project_path="lookml", depth=None, sparse_checkout=False)
+    clone_repo(config, local_dir)
+
+    assert os.path.exists(os.path.join(local_dir, "other", "file.txt"))
+    assert [c.message for c in Repo(local_dir).iter_commits()] == ["second", "first"]
+
+
+def test_clone_repo_branch(upstream, tmp_path):
+    upstream.git.checkout("-b", "dev")
+    _commit(upstream, {"lookml/dev.view.lkml": "view"}, "dev")
+    upstream.remotes.origin.push("dev")
+
+    local_dir = str(tmp_path / "clone")
+    path = clone_repo(_config(upstream, project_path="lookml", branch="dev"), local_dir)
+
+    assert sorted(os.listdir(path)) == ["dev.view.lkml", "model.model.lkml"]
+
+
+def test_clone_repo_cache_dir(upstream, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    config = _config(upstream, project_path="lookml", cache_dir=cache_dir)
+
+    path = clone_repo(config)
+    assert path == os.path.join(cache_dir, "lookml")
+
+    # Leave some changes behind, and a marker to tell if the repo is cloned again
+    marker = os.path.join(cache_dir, ".git", "marker")
+    open(marker, "w").close()
+    with open(os.path.join(path, "model.model.lkml"), "w") as f:
+        f.write("changed")
+    open(os.path.join(path, "untracked.view.lkml"), "w").close()
+
+    _commit(upstream, {"lookml/view.view.lkml": "view"}, "third")
+
+    assert clone_repo(config) == path
+    assert os.path.exists(marker)
+    assert sorted(os.listdir(path)) == ["model.model.lkml", "view.view.lkml"]
+    with open(os.path.join(path, "model.model.lkml")) as f:
+        assert f.read() == "model"
+
+    # The checkout is updated if the project path changes
+    config = _config(upstream, project_path="other", cache_dir=cache_dir)
+    assert os.listdir(clone_repo(config)) == ["file.txt"]
+    assert not os.path.exists(path)
+
+
+def test_clone_repo_cache_dir_mismatch(upstream, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    Repo.init(cache_dir)
+
+    with pytest.raises(ValueError):
+        clone_repo(_config(upstream, cache_dir=cache_dir))
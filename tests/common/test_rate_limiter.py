@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from metaphor.common.rate_limiter import TokenBucket
+
+
+def test_token_bucket():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    with patch("metaphor.common.rate_limiter.time.monotonic", lambda: now[0]), patch(
+        "metaphor.common.rate_limiter.time.sleep", sleep
+    ):
+        bucket = TokenBucket.per_minute(30, capacity=2)
+        for _ in range(4):
+            bucket.acquire()
+
+    # The first 2 are from the initial capacity, then one every 2 seconds
+    assert sleeps == [2.0, 2.0]
+    assert now[0] == 4.0
@@ -1,5 +1,7 @@
+import glob
+import os
 import tempfile
-from typing import Collection, Iterator, List
+from typing import AsyncGenerator, Collection, Iterator, List
 
 from metaphor.common.base_config import BaseConfig, OutputConfig
 from metaphor.common.base_extractor import BaseExtractor
@@ -77,6 +79,47 @@ def test_run_connector() -> None:
     assert "ValueError: 2" in dummy_connector.stacktrace
 
 
+def test_run_connector_stream_events() -> None:
+    class DummyStreamConnector(BaseExtractor):
+        @staticmethod
+        def from_config_file(config_file: str) -> "DummyStreamConnector":
+            return DummyStreamConnector(BaseConfig.from_yaml_file(config_file))
+
+        def __init__(self, config: BaseConfig) -> None:
+            super().__init__(config)
+
+        async def extract(self) -> Collection[ENTITY_TYPES]:
+            return []
+
+        async def extract_stream(self) -> AsyncGenerator[ENTITY_TYPES, None]:
+            for i in range(3):
+                yield Dataset(
+                    logical_id=DatasetLogicalID(
+                        name=str(i), platform=DataPlatform.BIGQUERY
+                    )
+                )
+
+    directory = tempfile.mkdtemp()
+    file_sink_config = FileSinkConfig(
+        directory=directory, batch_size_count=2, stream_events=True
+    )
+    events, run_metadata = run_connector(
+        lambda: DummyStreamConnector(BaseConfig(output=OutputConfig())),
+        "dummy_stream_connector",
+        "dummy stream connector",
+        file_sink_config=file_sink_config,
+    )
+    assert run_metadata.status is RunStatus.SUCCESS
+    assert run_metadata.entity_count == 3.0
+    assert events == []
+
+    files = glob.glob(f"{directory}/*/*-of-*.json")
+    assert sorted(os.path.basename(file) for file in files) == [
+        "1-of-2.json",
+        "2-of-2.json",
+    ]
+
+
 def test_run_connector_with_exception_throwing_connector() -> None:
     class FailToInitExtractor(BaseExtractor):
         @staticmethod
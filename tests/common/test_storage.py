@@ -2,7 +2,14 @@ import os
 import tempfile
 from unittest.mock import ANY, MagicMock, patch
 
-from metaphor.common.storage import LocalStorage, S3Storage, S3StorageConfig
+import pytest
+
+from metaphor.common.storage import (
+    ConcurrentFileWriter,
+    LocalStorage,
+    S3Storage,
+    S3StorageConfig,
+)
 
 
 def test_parse_s3_uri():
@@ -50,3 +57,54 @@ def test_s3_storage_configs(mock_assume_role, mock_session_class, test_root_dir)
     )
 
     mock_assume_role.assert_called_with(ANY, "arn")
+
+
+@patch("metaphor.common.storage.boto3.Session")
+def test_s3_storage_delete_files_in_batches(mock_session_class, test_root_dir):
+    storage = S3Storage()
+    mock_client = mock_session_class.return_value.client.return_value
+    mock_client.delete_objects.return_value = {}
+
+    storage.delete_files(
+        [f"s3://foo/{i}.json" for i in range(1500)] + ["s3://bar/baz.json"]
+    )
+
+    assert [
+        (call.kwargs["Bucket"], len(call.kwargs["Delete"]["Objects"]))
+        for call in mock_client.delete_objects.call_args_list
+    ] == [("foo", 1000), ("foo", 500), ("bar", 1)]
+    mock_client.delete_object.assert_not_called()
+
+
+@patch("metaphor.common.storage.open")
+@patch("metaphor.common.storage.boto3.Session")
+def test_s3_storage_multipart_part_size(mock_session_class, mock_open, test_root_dir):
+    S3Storage(multipart_part_size=5 * 1024 * 1024).write_file("s3://foo/bar", "baz")
+
+    assert mock_open.call_args.kwargs["transport_params"]["min_part_size"] == (
+        5 * 1024 * 1024
+    )
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_concurrent_file_writer(max_workers, test_root_dir):
+    directory = tempfile.mkdtemp()
+    storage = LocalStorage()
+
+    with ConcurrentFileWriter(storage, max_workers) as writer:
+        for i in range(10):
+            writer.write_file(f"{directory}/{i}.txt", str(i))
+
+    for i in range(10):
+        with open(f"{directory}/{i}.txt") as f:
+            assert f.read() == str(i)
+
+
+def test_concurrent_file_writer_raises_error(test_root_dir):
+    storage = MagicMock()
+    storage.write_file.side_effect = ValueError("failed")
+
+    with pytest.raises(ValueError):
+        with ConcurrentFileWriter(storage, 4) as writer:
+            for i in range(10):
+                writer.write_file(f"{i}.txt", str(i))
@@ -18,6 +18,7 @@ from metaphor.common.utils import (
     safe_parse_ISO8601,
     safe_str,
     start_of_day,
+    time_slices,
     unique_list,
 )
 
@@ -31,6 +32,22 @@ def test_start_of_day():
     assert start_of_day(30) == datetime(2019, 12, 11, 0, 0, 0, 0, pytz.UTC)
 
 
+def test_time_slices():
+    start = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+    end = datetime(2020, 1, 2, tzinfo=pytz.UTC)
+
+    assert time_slices(start, end, 1) == [(start, end)]
+    assert time_slices(start, end, 0) == [(start, end)]
+    assert time_slices(start, end, 3) == [
+        (start, datetime(2020, 1, 1, 8, tzinfo=pytz.UTC)),
+        (
+            datetime(2020, 1, 1, 8, tzinfo=pytz.UTC),
+            datetime(2020, 1, 1, 16, tzinfo=pytz.UTC),
+        ),
+        (datetime(2020, 1, 1, 16, tzinfo=pytz.UTC), end),
+    ]
+
+
 def test_must_set_exactly_one():
     must_set_exactly_one({"foo": 1}, ["foo"])
     must_set_exactly_one({"foo": 1, "bar": None}, ["foo", "bar"])
@@ -12,11 +12,13 @@ from tests.test_utils import load_json
 
 
 @pytest.mark.asyncio()
+@pytest.mark.parametrize("max_concurrency", [1, 5])
 @patch("metaphor.dbt.cloud.extractor.DiscoveryAPIClient")
 @patch("metaphor.dbt.cloud.extractor.DbtAdminAPIClient")
 async def test_extractor(
     mock_admin_client: MagicMock,
     mock_discovery_client: MagicMock,
+    max_concurrency: int,
     test_root_dir: str,
 ):
     mock_admin_client.return_value = MockAdminClient(test_root_dir)
@@ -27,6 +29,7 @@ async def test_extractor(
             output=OutputConfig(),
             account_id=123,
             service_token="tok",
+            max_concurrency=max_concurrency,
             meta_key_tags="my_tags",
             meta_ownerships=[
                 MetaOwnership(
@@ -1,10 +1,12 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
 
 import httpx
 from testcontainers.general import DockerContainer
 
 from metaphor.common.logger import debug_files
-from metaphor.dbt.cloud.http import LogTransport
+from metaphor.dbt.cloud.http import LogTransport, RateLimitTransport
 
 
 def test_http_client():
@@ -24,3 +26,22 @@ def test_http_client():
 
         # Should log two json file
         assert len(debug_files) == 2
+
+
+def test_rate_limit_transport():
+    rate_limiter = MagicMock()
+    transport = RateLimitTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+        rate_limiter,
+    )
+
+    with httpx.Client(transport=transport) as client:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(
+                executor.map(
+                    lambda _: client.post("https://example.com/graphql"), range(10)
+                )
+            )
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert rate_limiter.acquire.call_count == 10
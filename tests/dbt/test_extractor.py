@@ -105,21 +105,26 @@ async def _test_project(
     run_results = data_dir + "/run_results.json"
     expected = data_dir + "/expected.json"
 
-    config = DbtRunConfig(
-        output=OutputConfig(),
-        account="metaphor",
-        manifest=manifest,
-        run_results=run_results,
-        docs_base_url=docs_base_url,
-        project_source_url=project_source_url,
-        meta_ownerships=[MetaOwnership(meta_key="owner", ownership_type="Maintainer")],
-        meta_tags=[MetaTag(meta_key="pii", tag_type="PII")],
-        meta_key_tags="dbt_tags",
-    )
-    extractor = DbtExtractor(config)
-    events = [EventUtil.trim_event(e) for e in await extractor.extract()]
-
-    assert events == load_json(expected)
+    # Same output whether the manifest is loaded in memory or streamed
+    for stream_manifest in [False, True]:
+        config = DbtRunConfig(
+            output=OutputConfig(),
+            account="metaphor",
+            manifest=manifest,
+            run_results=run_results,
+            docs_base_url=docs_base_url,
+            project_source_url=project_source_url,
+            meta_ownerships=[
+                MetaOwnership(meta_key="owner", ownership_type="Maintainer")
+            ],
+            meta_tags=[MetaTag(meta_key="pii", tag_type="PII")],
+            meta_key_tags="dbt_tags",
+            stream_manifest=stream_manifest,
+        )
+        extractor = DbtExtractor(config)
+        events = [EventUtil.trim_event(e) for e in await extractor.extract()]
+
+        assert events == load_json(expected)
 
 
 def test_sanitize_manifest_empty_docs(test_root_dir):
@@ -154,3 +159,38 @@ def test_sanitize_manifest_strip_null_tests_depends_on(test_root_dir):
             }
         }
     }
+
+
+def test_sanitize_manifest_in_place(test_root_dir):
+    manifest = {
+        "docs": {"foo": "bar"},
+    }
+
+    assert ArtifactParser.sanitize_manifest(manifest, "v10") is manifest
+    assert manifest == {"docs": {}}
+
+
+def test_prune_manifest(test_root_dir):
+    manifest = {
+        "nodes": {
+            "model.example.model": {"resource_type": "model"},
+            "seed.example.seed": {"resource_type": "seed"},
+            "snapshot.example.snapshot": {"resource_type": "snapshot"},
+            "test.example.test": {"resource_type": "test"},
+            "analysis.example.analysis": {"resource_type": "analysis"},
+        },
+        "exposures": {"exposure.example.exposure": {}},
+        "disabled": None,
+        "macros": {"macro.example.macro": {}},
+    }
+
+    assert ArtifactParser.prune_manifest(manifest) == {
+        "nodes": {
+            "model.example.model": {"resource_type": "model"},
+            "snapshot.example.snapshot": {"resource_type": "snapshot"},
+            "test.example.test": {"resource_type": "test"},
+        },
+        "exposures": {},
+        "disabled": None,
+        "macros": {"macro.example.macro": {}},
+    }
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from metaphor.dbt.manifest_reader import iter_manifest, read_manifest_metadata
+
+manifest = {
+    "metadata": {"dbt_schema_version": "v12", "project_name": "test"},
+    "nodes": {
+        "model.test.a": {"name": "a", "columns": {"id": {"tags": ["x", "y"]}}},
+        "model.test.b": {"name": 'b "quoted" {}', "count": 12345678},
+    },
+    "docs": {"doc.test.a": {"block": "[{,}]"}},
+    "sources": {},
+    "selectors": 1.5,
+    "macros": {"macro.test.m": {"value": None, "enabled": True}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_iter_manifest(tmp_path, chunk_size):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(manifest, indent=2))
+
+    assert list(
+        iter_manifest(
+            str(manifest_file), ["nodes", "sources", "selectors", "macros"], chunk_size
+        )
+    ) == [
+        ("nodes", "model.test.a", manifest["nodes"]["model.test.a"]),
+        ("nodes", "model.test.b", manifest["nodes"]["model.test.b"]),
+        ("selectors", None, 1.5),
+        ("macros", "macro.test.m", manifest["macros"]["macro.test.m"]),
+    ]
+
+
+def test_read_manifest_metadata(tmp_path):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(manifest))
+
+    assert read_manifest_metadata(str(manifest_file)) == manifest["metadata"]
+
+    # Not necessarily the first section
+    manifest_file.write_text(json.dumps({"nodes": {"a": 1}, "metadata": {"b": 2}}))
+    assert read_manifest_metadata(str(manifest_file)) == {"b": 2}
+
+
+def test_iter_manifest_invalid(tmp_path):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text('{"nodes": {"a": [1, 2}}')
+
+    with pytest.raises(ValueError):
+        list(iter_manifest(str(manifest_file), ["nodes"]))
+
+
+def test_iter_manifest_number_across_chunks(tmp_path):
+    content = json.dumps(
+        {
+            "exposures": {"exposure.a": {"created_at": 1712345678.123456}},
+            "unit_tests": {"unit_test.a": {"created_at": 1.5e-07}},
+            "nodes": {"model.test.a": {"created_at": 1712345678.5}},
+        }
+    )
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(content)
+
+    # Cut the numbers by the first chunk boundary at every offset
+    for chunk_size in range(1, len(content) + 1):
+        assert list(iter_manifest(str(manifest_file), ["nodes"], chunk_size)) == [
+            ("nodes", "model.test.a", {"created_at": 1712345678.5})
+        ]
@@ -4,6 +4,7 @@ from metaphor.common.entity_id import to_person_entity_id
 from metaphor.dbt.config import MetaOwnership, MetaTag
 from metaphor.dbt.util import (
     get_data_platform_from_manifest,
+    get_data_platform_from_manifest_json,
     get_dbt_tags_from_meta,
     get_metaphor_tags_from_meta,
     get_ownerships_from_meta,
@@ -174,6 +175,10 @@ def test_get_data_platform_from_manifest(test_root_dir: str) -> None:
     platform = get_data_platform_from_manifest(manifest_path)
     assert platform is DataPlatform.UNITY_CATALOG
 
+    manifest_json = {"metadata": {"adapter_type": "snowflake"}}
+    platform = get_data_platform_from_manifest_json(manifest_json)
+    assert platform is DataPlatform.SNOWFLAKE
+
 
 def test_parse_date_time_from_result() -> None:
     assert parse_date_time_from_result(None) is None
@@ -1,6 +1,13 @@
+import glob
+import os
+from unittest.mock import patch
+
+import lkml
+import pytest
+
 from metaphor.common.entity_id import EntityId
 from metaphor.looker.config import LookerConnectionConfig
-from metaphor.looker.lookml_parser import Explore, Model, parse_project
+from metaphor.looker.lookml_parser import Explore, LookMLFiles, Model, parse_project
 from metaphor.models.metadata_change_event import (
     AssetStructure,
     DataPlatform,
@@ -1097,3 +1104,78 @@ def test_explore_extension(test_root_dir):
             source_info=SourceInfo(),
         ),
     ]
+
+
+@pytest.mark.parametrize(
+    "include_path",
+    [
+        "/views/view1.view",
+        "/*.view",
+        "/**/*.view",
+        "/views/**/*.view.lkml",
+        "/views/*/view?.view",
+        "/views/../view[24].view",
+        "//views//nested/*",
+        "/**",
+        "/missing/*.view",
+    ],
+)
+def test_lookml_files_glob(test_root_dir, include_path):
+    base_dir = f"{test_root_dir}/looker/complex_includes"
+    glob_pattern = f"{base_dir}/{include_path}"
+    if not glob_pattern.endswith(".lkml"):
+        glob_pattern = glob_pattern + ".lkml"
+
+    assert sorted(LookMLFiles(base_dir).glob(include_path)) == sorted(
+        os.path.normpath(path) for path in glob.glob(glob_pattern, recursive=True)
+    )
+
+
+def test_parse_each_file_once(tmp_path):
+    (tmp_path / "views").mkdir()
+    (tmp_path / "views" / "view1.view.lkml").write_text("view: view1 {}")
+    (tmp_path / "views" / "view2.view.lkml").write_text(
+        'include: "view1.view"\nview: view2 {}'
+    )
+    for model in ["model1", "model2"]:
+        (tmp_path / f"{model}.model.lkml").write_text(
+            'connection: "snowflake"\ninclude: "/views/*.view"\n'
+            "explore: explore1 { view_name: view2 }"
+        )
+
+    with patch("metaphor.looker.lookml_parser.lkml.load", wraps=lkml.load) as load:
+        models_map, virtual_views = parse_project(
+            str(tmp_path), connection_map, VIEW_EXPLORE_FOLDER
+        )
+
+    assert sorted(models_map.keys()) == ["model1", "model2"]
+    assert sorted(v.logical_id.name for v in virtual_views) == [
+        "model1.explore1",
+        "model1.view1",
+        "model1.view2",
+        "model2.explore1",
+        "model2.view1",
+        "model2.view2",
+    ]
+    assert load.call_count == 4
+
+
+def test_parse_modified_file(tmp_path):
+    view_file = tmp_path / "view1.view.lkml"
+    view_file.write_text("view: view1 {}")
+
+    files = LookMLFiles(str(tmp_path))
+    assert files.parse(str(view_file)) == {"views": [{"name": "view1"}]}
+
+    view_file.write_text("view: view2 {}")
+    os.utime(view_file, ns=(0, 0))
+    assert files.parse(str(view_file)) == {"views": [{"name": "view2"}]}
+
+
+@pytest.mark.parametrize("project", ["complex_includes", "view_extension", "join"])
+def test_parse_project_with_workers(test_root_dir, project):
+    base_dir = f"{test_root_dir}/looker/{project}"
+
+    assert parse_project(
+        base_dir, connection_map, VIEW_EXPLORE_FOLDER, max_workers=2
+    ) == parse_project(base_dir, connection_map, VIEW_EXPLORE_FOLDER)
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -319,3 +320,139 @@ def test_collect_query_logs(
     assert log_events == load_json(
         f"{test_root_dir}/postgresql/expected_logs_execute.json"
     )
+
+
+def _catalog_rows(query: str) -> list:
+    """Rows of a database with a single table s.t for the catalog queries"""
+    if "pg_constraint" in query:
+        return [
+            {
+                "table_schema": "s",
+                "table_name": "t",
+                "constraint_type": "PRIMARY KEY",
+                "key_columns": "id",
+            }
+        ]
+    if "pg_attribute" in query:
+        return [
+            {
+                "table_schema": "s",
+                "table_name": "t",
+                "column_name": "id",
+                "data_type": "integer",
+                "format": "integer",
+                "description": None,
+                "not_null": True,
+            }
+        ]
+    if "pg_views" in query and "pg_tables" not in query:
+        return []
+    return [
+        {
+            "schemaname": "s",
+            "name": "t",
+            "description": None,
+            "row_count": 1,
+            "table_size": 1,
+            "table_type": "TABLE",
+        }
+    ]
+
+
+@patch("metaphor.postgresql.extractor.asyncpg.create_pool", new_callable=AsyncMock)
+@patch(
+    "metaphor.postgresql.extractor.PostgreSQLExtractor._fetch_databases",
+    new_callable=AsyncMock,
+)
+@pytest.mark.asyncio
+async def test_extract_databases_concurrently(
+    mocked_fetch_databases: MagicMock,
+    mocked_create_pool: MagicMock,
+):
+    databases = ["db1", "db2", "db3"]
+    mocked_fetch_databases.return_value = databases
+
+    running, max_running = 0, 0
+
+    def create_pool(database, **_):
+        async def fetch(query):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return _catalog_rows(query)
+
+        pool = AsyncMock()
+        pool.fetch.side_effect = fetch
+        return pool
+
+    mocked_create_pool.side_effect = create_pool
+
+    extractor = PostgreSQLExtractor(dummy_config(max_concurrent_databases=2))
+    events = list(await extractor.extract())
+
+    assert [e.logical_id.name for e in events] == ["db1.s.t", "db2.s.t", "db3.s.t"]
+    assert all(e.schema.sql_schema.primary_key == ["id"] for e in events)
+    assert all(len(e.schema.fields) == 1 for e in events)
+
+    # 2 databases, with 4 concurrent queries each
+    assert max_running == 8
+    assert mocked_create_pool.call_count == 3
+
+
+@patch("metaphor.postgresql.extractor.asyncpg.create_pool", new_callable=AsyncMock)
+@patch(
+    "metaphor.postgresql.extractor.PostgreSQLExtractor._fetch_databases",
+    new_callable=AsyncMock,
+)
+@pytest.mark.asyncio
+async def test_extract_stream(
+    mocked_fetch_databases: MagicMock,
+    mocked_create_pool: MagicMock,
+):
+    databases = ["db1", "db2", "db3"]
+    mocked_fetch_databases.return_value = databases
+
+    # The first database is the slowest to crawl
+    delays = {"db1": 0.05, "db2": 0.01, "db3": 0.01}
+    crawled = []
+
+    def create_pool(database, **_):
+        async def fetch(query):
+            await asyncio.sleep(delays[database])
+            if "pg_tables" in query:
+                crawled.append(database)
+            return _catalog_rows(query)
+
+        pool = AsyncMock()
+        pool.fetch.side_effect = fetch
+        return pool
+
+    mocked_create_pool.side_effect = create_pool
+
+    extractor = PostgreSQLExtractor(dummy_config(max_concurrent_databases=1))
+    streamed = []
+    async for dataset in extractor.extract_stream():
+        # Each database is yielded once it's crawled, before the next is done
+        assert crawled[-1] == dataset.structure.database
+        streamed.append(EventUtil.trim_event(dataset))
+
+    # Nothing is kept after being yielded
+    assert extractor._datasets == {}
+
+    extractor = PostgreSQLExtractor(dummy_config(max_concurrent_databases=2))
+    streamed_concurrently = [
+        EventUtil.trim_event(dataset) async for dataset in extractor.extract_stream()
+    ]
+
+    extractor = PostgreSQLExtractor(dummy_config(max_concurrent_databases=2))
+    extracted = [EventUtil.trim_event(dataset) for dataset in await extractor.extract()]
+
+    assert [d["logicalId"]["name"] for d in extracted] == [
+        "db1.s.t",
+        "db2.s.t",
+        "db3.s.t",
+    ]
+    assert streamed == extracted
+    assert streamed_concurrently == extracted
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from typing import List
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -7,7 +8,8 @@ import pytest
 from metaphor.common.base_config import OutputConfig
 from metaphor.common.event_util import EventUtil
 from metaphor.models.metadata_change_event import DataPlatform
-from metaphor.redshift.access_event import AccessEvent
+from metaphor.postgresql.config import QueryLogConfig
+from metaphor.redshift.access_event import REDSHIFT_USAGE_SQL_TEMPLATE, AccessEvent
 from metaphor.redshift.config import RedshiftRunConfig
 from metaphor.redshift.extractor import RedshiftExtractor
 from tests.test_utils import load_json, wrap_query_log_stream_to_event
@@ -71,8 +73,8 @@ def test_collect_query_logs(test_root_dir: str) -> None:
     ]
 
     class AsyncIterator:
-        def __init__(self) -> None:
-            self.iter = iter(access_events)
+        def __init__(self, events=access_events) -> None:
+            self.iter = iter(events)
 
         def __aiter__(self):
             return self
@@ -86,12 +88,16 @@ def test_collect_query_logs(test_root_dir: str) -> None:
     included_dbs = {ae.database for ae in access_events}
 
     with patch(
-        "metaphor.postgresql.extractor.BasePostgreSQLExtractor._connect_database"
-    ) as mock_connect_database, patch(
+        "metaphor.postgresql.extractor.BasePostgreSQLExtractor._create_pool",
+        new_callable=AsyncMock,
+    ) as mock_create_pool, patch(
         "metaphor.redshift.access_event.AccessEvent.fetch_access_event"
     ) as mock_fetch_access_event:
-        mock_connect_database.return_value = MagicMock()
-        mock_fetch_access_event.return_value = AsyncIterator()
+        mock_create_pool.return_value = MagicMock(close=AsyncMock())
+        # Only return the events for the first time slice
+        mock_fetch_access_event.side_effect = [AsyncIterator()] + [
+            AsyncIterator([]) for _ in range(10)
+        ]
 
         extractor = RedshiftExtractor(dummy_config())
         extractor._included_databases = included_dbs
@@ -100,3 +106,84 @@ def test_collect_query_logs(test_root_dir: str) -> None:
         query_logs = wrap_query_log_stream_to_event(extractor.collect_query_logs())
         expected = f"{test_root_dir}/redshift/query_logs.json"
         assert query_logs == load_json(expected)
+
+
+@pytest.mark.asyncio
+async def test_fetch_access_event_batches() -> None:
+    running, max_running = 0, 0
+
+    async def fetch_access_event(conn, start_date, end_date):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield (start_date, i)
+        running -= 1
+
+    extractor = RedshiftExtractor(
+        dummy_config(
+            query_log=QueryLogConfig(lookback_days=4),
+            max_connections_per_database=2,
+        )
+    )
+
+    with patch(
+        "metaphor.postgresql.extractor.BasePostgreSQLExtractor._create_pool",
+        new_callable=AsyncMock,
+    ) as mock_create_pool, patch(
+        "metaphor.redshift.access_event.AccessEvent.fetch_access_event",
+        fetch_access_event,
+    ), patch(
+        "metaphor.redshift.extractor.QUERY_LOG_BATCH_SIZE", 2
+    ):
+        pool = MagicMock(close=AsyncMock())
+        mock_create_pool.return_value = pool
+        batches = [batch async for batch in extractor._fetch_access_event_batches("db")]
+
+    # 5 daily slices, each in 2 batches
+    assert [len(batch) for batch in batches] == [2, 1] * 5
+    events = [event for batch in batches for event in batch]
+    start_dates = [start_date for start_date, _ in events]
+    assert start_dates == sorted(start_dates, reverse=True)
+    assert max_running == 2
+    pool.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_access_event_batches_error() -> None:
+    async def fetch_access_event(conn, start_date, end_date):
+        yield (start_date, 0)
+        raise RuntimeError("connection lost")
+
+    extractor = RedshiftExtractor(
+        dummy_config(
+            query_log=QueryLogConfig(lookback_days=4),
+            max_connections_per_database=2,
+        )
+    )
+
+    with patch(
+        "metaphor.postgresql.extractor.BasePostgreSQLExtractor._create_pool",
+        new_callable=AsyncMock,
+    ) as mock_create_pool, patch(
+        "metaphor.redshift.access_event.AccessEvent.fetch_access_event",
+        fetch_access_event,
+    ):
+        pool = MagicMock(close=AsyncMock())
+        mock_create_pool.return_value = pool
+        with pytest.raises(RuntimeError):
+            _ = [batch async for batch in extractor._fetch_access_event_batches("db")]
+
+    pool.close.assert_awaited_once()
+
+
+def test_usage_sql_time_range() -> None:
+    query = REDSHIFT_USAGE_SQL_TEMPLATE.format(
+        start_time="2024-01-01T00:00:00", end_time="2024-01-02T00:00:00"
+    )
+    queries_cte = query[: query.index("), filtered AS")]
+
+    # The time range is applied before aggregating the query texts
+    assert "start_time >= '2024-01-01T00:00:00'" in queries_cte
+    assert "start_time < '2024-01-02T00:00:00'" in queries_cte
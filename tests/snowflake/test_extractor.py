@@ -1,5 +1,6 @@
 import json
 from datetime import datetime, timezone
+from functools import partial
 from typing import Optional
 from unittest.mock import MagicMock, patch
 
@@ -11,7 +12,9 @@ from metaphor.common.filter import DatasetFilter
 from metaphor.models.metadata_change_event import (
     AssetPlatform,
     DataPlatform,
+    Dataset,
     DatasetLogicalID,
+    Hierarchy,
     HierarchyLogicalID,
     MaterializationType,
     QueriedDataset,
@@ -189,7 +192,7 @@ def test_fetch_secure(mock_connect: MagicMock):
         )
     )
 
-    secure_views = extractor._fetch_secure_views(mock_cursor)
+    secure_views = extractor._fetch_secure_views(mock_cursor, database)
 
     assert len(secure_views) == 1
     assert f"{database}.{schema}.{table_name}" in secure_views
@@ -225,7 +228,7 @@ def test_fetch_table_info(mock_connect: MagicMock):
     )
     extractor._datasets[normalized_name] = dataset
 
-    extractor._fetch_table_info({normalized_name: table_info}, False, set())
+    extractor._fetch_table_info_chunk([(normalized_name, table_info)], set())
 
     assert dataset.schema.sql_schema.table_schema == "ddl"
     assert dataset.source_info.last_updated == datetime(
@@ -258,12 +261,96 @@ def test_fetch_table_info_error_handling(mock_connect: MagicMock):
     )
     extractor._datasets[normalized_name] = dataset
 
-    extractor._fetch_table_info({normalized_name: table_info}, False, set())
+    extractor._fetch_table_info_chunk([(normalized_name, table_info)], set())
 
     assert dataset.schema.sql_schema.table_schema is None
     assert dataset.source_info.last_updated is None
 
 
+def test_table_info_chunks():
+    tables = {
+        f"db.{schema}.table{i}": DatasetInfo(
+            database="db", schema=schema, name=f"table{i}", type=table_type
+        )
+        for schema in ["sc1", "sc2"]
+        for i in range(150)
+    }
+
+    chunks = SnowflakeExtractor._table_info_chunks(tables, False)
+    assert [len(chunk) for chunk in chunks] == [100, 50, 100, 50]
+    assert {table.schema for _, table in chunks[1]} == {"sc1"}
+
+    assert SnowflakeExtractor._table_info_chunks(tables, True) == []
+
+
+@patch("metaphor.snowflake.auth.connect")
+def test_fetch_databases_concurrently(mock_connect: MagicMock):
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    fetched = []
+
+    def fetch_database(database: str, is_shared_database: bool):
+        fetched.append((database, is_shared_database))
+        return [partial(fetched.append, f"{database} task{i}") for i in range(2)]
+
+    extractor._fetch_database = fetch_database  # type: ignore
+    extractor._fetch_databases_concurrently(["db1", "db2"], ["db2"])
+
+    assert sorted(fetched, key=str) == sorted(
+        [
+            ("db1", False),
+            ("db2", True),
+            "db1 task0",
+            "db1 task1",
+            "db2 task0",
+            "db2 task1",
+        ],
+        key=str,
+    )
+
+
+@patch("metaphor.snowflake.auth.connect")
+def test_restore_crawl_order(mock_connect: MagicMock):
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    extractor._database_schemas = {"DB1": ["SC2", "SC1"], "DB2": ["SC1"]}
+    extractor._database_tables = {
+        "db1": {"db1.sc1.table", "db1.sc2.table"},
+        "db2": {"db2.sc1.table"},
+    }
+    extractor._hierarchies = {"db2": Hierarchy(), "db1": Hierarchy()}
+    existing_hierarchies = set(extractor._hierarchies)
+
+    # Inserted in the order the concurrent tasks happen to finish
+    for name in [
+        "db2.sc1.table",
+        "db1.sc1.table",
+        "db1.sc2.table",
+        "db2.sc1.stream",
+        "db1.sc1.stream",
+        "db1.sc2.stream",
+    ]:
+        extractor._datasets[name] = Dataset()
+    for key in ["db2.sc1", "db1.sc2", "db1.sc1"]:
+        extractor._hierarchies[key] = Hierarchy()
+
+    extractor._restore_crawl_order(["DB1", "DB2"], existing_hierarchies)
+
+    assert list(extractor._datasets) == [
+        "db1.sc1.table",
+        "db1.sc2.table",
+        "db1.sc2.stream",
+        "db1.sc1.stream",
+        "db2.sc1.table",
+        "db2.sc1.stream",
+    ]
+    assert list(extractor._hierarchies) == [
+        "db2",
+        "db1",
+        "db1.sc2",
+        "db1.sc1",
+        "db2.sc1",
+    ]
+
+
 @patch("metaphor.snowflake.auth.connect")
 def test_fetch_table_info_with_unknown_type(mock_connect: MagicMock):
     extractor = SnowflakeExtractor(make_snowflake_config())
@@ -495,6 +582,7 @@ def test_fetch_shared_databases(mock_connect: MagicMock):
 
 
 @pytest.mark.asyncio
+@patch("metaphor.snowflake.utils.async_query")
 @patch("metaphor.snowflake.extractor.check_access_history")
 @patch("metaphor.snowflake.extractor.fetch_query_history_count")
 @patch("metaphor.snowflake.auth.connect")
@@ -502,15 +590,20 @@ async def test_collect_query_logs(
     mock_connect: MagicMock,
     mock_fetch_query_history_count: MagicMock,
     mock_check_access_history: MagicMock,
+    mock_async_query: MagicMock,
 ):
     mock_check_access_history.return_value = True
     mock_fetch_query_history_count.return_value = 1
 
     class MockCursor:
-        def execute(self, _query, _params=None):
-            pass
+        fetched = False
+
+        def fetchmany(self, _size):
+            rows = [] if self.fetched else list(self.rows())
+            self.fetched = True
+            return rows
 
-        def __iter__(self):
+        def rows(self):
             for obj in [
                 (
                     "id1",  # QUERY_ID
@@ -869,11 +962,13 @@ async def test_collect_query_logs(
     config.collect_tags = False
 
     extractor = SnowflakeExtractor(config)
-    conn_instance = MagicMock()
-    conn_instance.cursor.return_value = MockCursor()
-    mock_connect.return_value = conn_instance
+    mock_connect.return_value = MagicMock()
+    mock_async_query.return_value = MockCursor()
     query_logs = list(extractor.collect_query_logs())
 
+    # A single time slice for the whole lookback window
+    assert mock_async_query.call_count == 1
+
     assert len(query_logs) == 1
     log0 = query_logs[0]
     assert log0.query_id == "id1"
@@ -933,7 +1028,7 @@ def test_fetch_schemas(mock_connect: MagicMock) -> None:
     values = [("schema1"), ("schema2"), ("schema3")]
     mock_cursor.__iter__.return_value = iter(values)
     extractor = SnowflakeExtractor(make_snowflake_config())
-    schemas = extractor._fetch_schemas(mock_cursor)
+    schemas = extractor._fetch_schemas(mock_cursor, database)
     assert schemas == [x[0] for x in values]
 
 
@@ -1017,6 +1112,141 @@ def test_fetch_streams(mock_connect: MagicMock) -> None:
     )
 
 
+def _stream_row(database: str, schema: str, name: str) -> tuple:
+    return (
+        None,
+        name,
+        database,
+        schema,
+        "owner",
+        "comment",
+        f"{database}.{schema}.SOURCE",
+        "Table",
+        "dont care",
+        "DELTA",
+        "false",
+        "DEFAULT",
+        None,
+    )
+
+
+def _iceberg_row(database: str, schema: str, name: str) -> tuple:
+    return (None, name, database, schema, "owner", "volume", "SNOWFLAKE", "MANAGED")
+
+
+@patch("metaphor.snowflake.auth.connect")
+def test_fetch_database_objects(mock_connect: MagicMock) -> None:
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    extractor._datasets["db.sc1.iceberg"] = extractor._init_dataset(
+        "DB", "SC1", "ICEBERG", table_type, "", None, None
+    )
+    extractor._database_schemas["db"] = ["SC1", "SC2"]
+
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        [_stream_row("DB", "SC1", "S1"), _stream_row("DB", "SC2", "S2")],
+        [_iceberg_row("DB", "SC1", "ICEBERG")],
+    ]
+    extractor._conn = MagicMock()
+    extractor._conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    extractor._fetch_database_objects("db")
+
+    assert [call.args[0] for call in mock_cursor.execute.call_args_list] == [
+        "SHOW STREAMS IN DATABASE db",
+        "SHOW ICEBERG TABLES IN DATABASE db",
+    ]
+    assert sorted(extractor._datasets) == ["db.sc1.iceberg", "db.sc1.s1", "db.sc2.s2"]
+    assert extractor._datasets["db.sc2.s2"].structure.database == "db"
+    assert extractor._datasets[
+        "db.sc1.iceberg"
+    ].snowflake_iceberg_info == SnowflakeIcebergInfo(
+        external_volume_name="volume",
+        iceberg_table_type=SnowflakeIcebergTableType.MANAGED,
+    )
+
+
+@patch("metaphor.snowflake.auth.connect")
+@patch("metaphor.snowflake.extractor.SHOW_RESULT_LIMIT", 2)
+def test_fetch_database_objects_fallback(mock_connect: MagicMock) -> None:
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    extractor._database_schemas["db"] = ["SC1", "SC2"]
+
+    mock_cursor = MagicMock()
+    # Too many streams in the database, fall back to each schema
+    mock_cursor.fetchall.side_effect = [
+        [_stream_row("DB", "SC1", "S1"), _stream_row("DB", "SC2", "S2")],
+        [],
+    ]
+    mock_cursor.__iter__.side_effect = [
+        iter([_stream_row("DB", "SC1", "S1")]),
+        iter([_stream_row("DB", "SC2", "S2")]),
+    ]
+    extractor._conn = MagicMock()
+    extractor._conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    extractor._fetch_database_objects("db")
+
+    assert [call.args[0] for call in mock_cursor.execute.call_args_list] == [
+        "SHOW STREAMS IN DATABASE db",
+        "SHOW STREAMS IN SCHEMA db.SC1",
+        "SHOW STREAMS IN SCHEMA db.SC2",
+        "SHOW ICEBERG TABLES IN DATABASE db",
+    ]
+    assert sorted(extractor._datasets) == ["db.sc1.s1", "db.sc2.s2"]
+    assert extractor._datasets["db.sc2.s2"].structure.database == "db"
+
+
+@patch("metaphor.snowflake.auth.connect")
+def test_fetch_account_objects(mock_connect: MagicMock) -> None:
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    extractor._streams_enabled = False
+    extractor._database_schemas["db"] = ["SC"]
+    for database in ["DB", "OTHER"]:
+        extractor._datasets[f"{database.lower()}.sc.iceberg"] = extractor._init_dataset(
+            database, "SC", "ICEBERG", table_type, "", None, None
+        )
+
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.return_value = [
+        _iceberg_row("DB", "SC", "ICEBERG"),
+        _iceberg_row("OTHER", "SC", "ICEBERG"),
+    ]
+    extractor._conn = MagicMock()
+    extractor._conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    extractor._fetch_account_objects()
+
+    mock_cursor.execute.assert_called_once_with("SHOW ICEBERG TABLES IN ACCOUNT")
+    assert extractor._datasets["db.sc.iceberg"].snowflake_iceberg_info is not None
+    assert extractor._datasets["other.sc.iceberg"].snowflake_iceberg_info is None
+
+
+@patch("metaphor.snowflake.auth.connect")
+def test_fetch_account_streams(mock_connect: MagicMock) -> None:
+    extractor = SnowflakeExtractor(make_snowflake_config())
+    extractor._database_schemas = {"db1": ["SC"], "db2": ["SC"]}
+
+    mock_cursor = MagicMock()
+    mock_cursor.fetchall.side_effect = [
+        [
+            _stream_row("DB2", "SC", "S2"),
+            _stream_row("OTHER", "SC", "S3"),
+            _stream_row("DB1", "SC", "S1"),
+        ],
+        [],
+    ]
+    extractor._conn = MagicMock()
+    extractor._conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    extractor._fetch_account_objects()
+
+    # Grouped by the crawled databases, named the same way as the tables
+    assert list(extractor._datasets) == ["db1.sc.s1", "db2.sc.s2"]
+    assert extractor._datasets["db1.sc.s1"].structure.database == "db1"
+    assert extractor._datasets["db2.sc.s2"].structure.database == "db2"
+
+
 @patch("metaphor.snowflake.auth.connect")
 def test_fetch_tags_override(mock_connect: MagicMock) -> None:
     mock_cursor = MagicMock()
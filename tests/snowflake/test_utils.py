@@ -1,7 +1,41 @@
-from metaphor.snowflake.utils import to_quoted_identifier
+from unittest.mock import MagicMock, patch
+
+from metaphor.snowflake.utils import (
+    QueryWithParam,
+    async_execute_stream,
+    to_quoted_identifier,
+)
 
 
 def test_to_quoted_identifier():
     assert to_quoted_identifier([None, "", "a", "b", "c"]) == '"a"."b"."c"'
 
     assert to_quoted_identifier(["db", "sc", 'ta"@BLE']) == '"db"."sc"."ta""@BLE"'
+
+
+@patch("metaphor.snowflake.utils.async_query")
+def test_async_execute_stream(mock_async_query: MagicMock):
+    def make_cursor(rows):
+        cursor = MagicMock()
+        cursor.fetchmany.side_effect = [
+            rows[i : i + 2] for i in range(0, len(rows), 2)
+        ] + [[]]
+        return cursor
+
+    def async_query(conn, query: QueryWithParam):
+        if query.query == "bad":
+            raise Exception("query failed")
+        return make_cursor([(query.query, i) for i in range(3)])
+
+    mock_async_query.side_effect = async_query
+    queries = {key: QueryWithParam(key) for key in ["a", "bad", "b"]}
+
+    results = list(
+        async_execute_stream(MagicMock(), queries, max_workers=2, fetch_size=2)
+    )
+    assert results == [
+        ("a", [("a", 0), ("a", 1)]),
+        ("a", [("a", 2)]),
+        ("b", [("b", 0), ("b", 1)]),
+        ("b", [("b", 2)]),
+    ]
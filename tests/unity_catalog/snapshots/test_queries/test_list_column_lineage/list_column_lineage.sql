@@ -7,7 +7,6 @@
             FROM system.access.column_lineage
             WHERE
                 target_table_catalog = 'catalog' AND
-                target_table_schema = 'schema' AND
                 source_table_full_name IS NOT NULL AND
                 event_time > date_sub(now(), 7)
             GROUP BY
@@ -5,7 +5,6 @@
             FROM system.access.table_lineage
             WHERE
                 target_table_catalog = 'c' AND
-                target_table_schema = 's' AND
                 source_table_full_name IS NOT NULL AND
                 event_time > date_sub(now(), 7)
             GROUP BY
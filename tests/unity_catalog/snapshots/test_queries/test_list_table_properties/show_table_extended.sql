@@ -0,0 +1 @@
+SHOW TABLE EXTENDED IN `c`.`s` LIKE '*'
\ No newline at end of file
@@ -0,0 +1,11 @@
+
+            SELECT
+                target_table_full_name,
+                max(event_time) AS last_write_time
+            FROM system.access.table_lineage
+            WHERE
+                target_table_catalog = %(catalog)s AND
+                target_table_full_name IS NOT NULL AND
+                event_time > date_sub(now(), 30)
+            GROUP BY target_table_full_name
+        
\ No newline at end of file
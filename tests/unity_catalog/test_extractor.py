@@ -37,6 +37,8 @@ def dummy_config():
 mock_time = datetime(2020, 1, 1, tzinfo=timezone.utc)
 
 
+@patch("metaphor.unity_catalog.extractor.bulk_get_last_refreshed_time")
+@patch("metaphor.unity_catalog.extractor.bulk_get_table_properties")
 @patch("metaphor.unity_catalog.extractor.batch_get_last_refreshed_time")
 @patch("metaphor.unity_catalog.extractor.create_connection_pool")
 @patch("metaphor.unity_catalog.extractor.create_connection")
@@ -67,6 +69,8 @@ async def test_extractor(
     mock_create_connection: MagicMock,
     mock_create_connection_pool: MagicMock,
     mock_batch_get_last_refreshed_time: MagicMock,
+    mock_bulk_get_table_properties: MagicMock,
+    mock_bulk_get_last_refreshed_time: MagicMock,
     test_root_dir: str,
 ):
     mock_list_service_principals.return_value = {
@@ -262,10 +266,13 @@ async def test_extractor(
         )
     ]
 
-    mock_batch_get_table_properties.return_value = {
+    # Resolved in bulk, the rest are fetched per table
+    mock_bulk_get_table_properties.return_value = {
         "catalog.schema.table": {
             "delta.lastCommitTimestamp": "1664444422000",
         },
+    }
+    mock_batch_get_table_properties.return_value = {
         "catalog.schema.view": {
             "view.catalogAndNamespace.numParts": "2",
             "view.sqlConfig.spark.sql.hive.convertCTAS": "true",
@@ -284,8 +291,10 @@ async def test_extractor(
         },
     }
 
-    mock_batch_get_last_refreshed_time.return_value = {
+    mock_bulk_get_last_refreshed_time.return_value = {
         "catalog.schema.table": mock_time,
+    }
+    mock_batch_get_last_refreshed_time.return_value = {
         "catalog2.schema.table2": mock_time,
     }
 
@@ -297,6 +306,19 @@ async def test_extractor(
     expected = f"{test_root_dir}/unity_catalog/expected.json"
     assert events == load_json(expected)
 
+    # Lineage is fetched once per catalog, over a single shared connection pool
+    mock_list_table_lineage.assert_called_once()
+    mock_list_column_lineage.assert_called_once()
+    mock_create_connection_pool.assert_called_once()
+
+    # Only the tables missed in bulk are queried one by one
+    assert "catalog.schema.table" not in (
+        mock_batch_get_table_properties.call_args.args[1]
+    )
+    assert mock_batch_get_last_refreshed_time.call_args.args[1] == [
+        "catalog2.schema.table2"
+    ]
+
     query_logs = wrap_query_log_stream_to_event(extractor.collect_query_logs())
     expected_query_logs = f"{test_root_dir}/unity_catalog/query_logs.json"
     assert query_logs == load_json(expected_query_logs)
@@ -24,6 +24,8 @@ from metaphor.unity_catalog.queries import (
     list_query_logs,
     list_schemas,
     list_table_lineage,
+    list_table_properties,
+    list_table_write_times,
     list_tables,
     list_volume_files,
     list_volumes,
@@ -381,7 +383,7 @@ def test_list_table_lineage(
         mock_cursor,
     )
 
-    table_lineage = list_table_lineage(mock_connection, "c", "s")
+    table_lineage = list_table_lineage(mock_connection, "c")
 
     assert table_lineage == {
         "c.s.t3": TableLineage(upstream_tables=["c.s.t1", "c.s.t2"]),
@@ -393,7 +395,7 @@ def test_list_table_lineage(
 
     # Exception handling
     mock_connection = mock_sql_connection([], Exception("some error"))
-    table_lineage = list_table_lineage(mock_connection, "c", "s")
+    table_lineage = list_table_lineage(mock_connection, "c")
     assert table_lineage == {}
 
 
@@ -417,7 +419,7 @@ def test_list_column_lineage(
         mock_cursor,
     )
 
-    column_lineage = list_column_lineage(mock_connection, "catalog", "schema")
+    column_lineage = list_column_lineage(mock_connection, "catalog")
 
     assert column_lineage == {
         "c.s.t3": ColumnLineage(
@@ -442,7 +444,7 @@ def test_list_column_lineage(
 
     # Exception handling
     mock_connection = mock_sql_connection([], Exception("some error"))
-    column_lineage = list_column_lineage(mock_connection, "c", "s")
+    column_lineage = list_column_lineage(mock_connection, "c")
     assert column_lineage == {}
 
 
@@ -550,3 +552,86 @@ def test_get_table_properties(
     mock_connection = mock_sql_connection([], Exception("some error"))
     result = get_table_properties(mock_connection, "db.schema.table")
     assert result is None
+
+
+def test_list_table_write_times(
+    test_root_dir: str,
+    snapshot: Snapshot,
+):
+
+    mock_cursor = MagicMock()
+
+    mock_connection = mock_sql_connection(
+        [
+            [
+                {
+                    "target_table_full_name": "c.s.Table",
+                    "last_write_time": datetime(2020, 1, 1),
+                },
+            ]
+        ],
+        None,
+        mock_cursor,
+    )
+
+    result = list_table_write_times(mock_connection, "c")
+
+    assert result == {"c.s.table": datetime(2020, 1, 1)}
+
+    args = mock_cursor.execute.call_args_list[0].args
+    snapshot.assert_match(args[0], "list_table_write_times.sql")
+    assert args[1] == {"catalog": "c"}
+
+    # Exception handling
+    mock_connection = mock_sql_connection([], Exception("some error"))
+    result = list_table_write_times(mock_connection, "c")
+    assert result == {}
+
+
+def test_list_table_properties(
+    test_root_dir: str,
+    snapshot: Snapshot,
+):
+
+    mock_cursor = MagicMock()
+
+    mock_connection = mock_sql_connection(
+        [
+            [
+                {
+                    "tableName": "table1",
+                    "information": "Catalog: c\nTable Properties: [key1=value1, key2=a=b]\nType: MANAGED",
+                },
+                {
+                    "tableName": "table2",
+                    "information": "Catalog: c\nTable Properties: []",
+                },
+                {
+                    # Ambiguous, as a value contains ", "
+                    "tableName": "table3",
+                    "information": "Table Properties: [key1=a, b]",
+                },
+                {
+                    "tableName": "table4",
+                    "information": "Catalog: c",
+                },
+            ]
+        ],
+        None,
+        mock_cursor,
+    )
+
+    result = list_table_properties(mock_connection, "c", "s")
+
+    assert result == {
+        "c.s.table1": {"key1": "value1", "key2": "a=b"},
+        "c.s.table2": {},
+    }
+
+    args = mock_cursor.execute.call_args_list[0].args
+    snapshot.assert_match(args[0], "show_table_extended.sql")
+
+    # Exception handling
+    mock_connection = mock_sql_connection([], Exception("some error"))
+    result = list_table_properties(mock_connection, "c", "s")
+    assert result == {}
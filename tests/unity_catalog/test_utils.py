@@ -22,6 +22,8 @@ from metaphor.unity_catalog.models import Tag
 from metaphor.unity_catalog.utils import (
     batch_get_last_refreshed_time,
     batch_get_table_properties,
+    bulk_get_last_refreshed_time,
+    bulk_get_table_properties,
     escape_special_characters,
     find_qualified_dataset,
     get_last_refreshed_time,
@@ -268,6 +270,58 @@ def test_batch_get_table_properties():
     assert result_map == {"a.b.c": {"prop1": "value1"}, "d.e.f": {"prop2": "value2"}}
 
 
+def test_bulk_get_last_refreshed_time():
+
+    connection_pool = mock_connection_pool(
+        [
+            [
+                {
+                    "target_table_full_name": "a.b.c",
+                    "last_write_time": datetime(2020, 1, 1, 12, 0),
+                },
+                {
+                    "target_table_full_name": "a.b.d",
+                    "last_write_time": datetime(2020, 1, 1, 12, 0),
+                },
+            ],
+            [],
+        ],
+    )
+
+    result_map = bulk_get_last_refreshed_time(
+        connection_pool,
+        {
+            # Altered by the last write
+            "a.b.c": datetime(2020, 1, 1, 12, 1),
+            # Altered long after the last write
+            "a.b.d": datetime(2020, 1, 2),
+            # No write in the lookback window
+            "e.f.g": datetime(2020, 1, 1),
+        },
+    )
+
+    assert result_map == {"a.b.c": datetime(2020, 1, 1, 12, 1)}
+
+
+def test_bulk_get_table_properties():
+
+    connection_pool = mock_connection_pool(
+        [
+            [
+                {"tableName": "c", "information": "Table Properties: [k1=v1]"},
+                {"tableName": "x", "information": "Table Properties: [k2=v2]"},
+            ],
+            [
+                {"tableName": "f", "information": "Type: MANAGED"},
+            ],
+        ],
+    )
+
+    result_map = bulk_get_table_properties(connection_pool, ["a.b.c", "d.e.f"])
+
+    assert result_map == {"a.b.c": {"k1": "v1"}}
+
+
 def test_list_service_principals():
 
     sp1 = ServicePrincipal(application_id="sp1", display_name="SP1")